@@ -1,22 +1,11 @@
 # 檔案路徑：assistant_core/ai_diagnosis_agent.py
 
-import os
-from dotenv import load_dotenv
-from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel
-
-# === 初始化 Gemini 模型 ===
-load_dotenv()
-client = AsyncOpenAI(
-    base_url=os.getenv("GOOGLE_GEMINI_ENDPOINT"),
-    api_key=os.getenv("GOOGLE_GEMINI_API_KEY")
-)
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=client
-)
+from assistant_core.llm_client import lazy_agent
+from rag_tools import context_packer as packer
+from rag_tools.knowledge_lookup import format_entry, lookup_knowledge
 
 # === 建立 AI 智能診斷 Agent ===
-ai_diagnosis_agent = Agent(
+get_ai_diagnosis_agent = lazy_agent(
     name="AIDiagnosisAgent",
     instructions="""
 你是一位台灣高中國文科的資深診斷型教師，善於針對學測國文素養題，依據題目文本、題幹、選項、學生答案、正確答案、主題與關鍵詞、解析，給出全方位的「錯題診斷與學習回饋」。
@@ -37,5 +26,28 @@ ai_diagnosis_agent = Agent(
 - 只回應上述三大區塊，勿額外說明。
 回覆時僅能使用繁體中文，不可出現非中文亂碼、其他語系或莫名的特殊符號，專有名詞也請以中文解釋。
 """,
-    model=model
 )
+
+PROMPT_BUDGET = 1800       # 診斷 prompt 的 token 預算（不含系統指示）
+KNOWLEDGE_HITS = 5
+
+def build_diagnosis_context(question, student_answer, correct_answer, budget=PROMPT_BUDGET):
+    """
+    診斷 prompt：題目各欄位、閱讀文本、解析與相關教材（rag_tools 檢索），
+    依 token 預算打包，回傳 PackedContext（見 rag_tools/context_packer.py）
+    """
+    options_text = "\n".join(f"({k}) {v}" for k, v in question.options.items())
+    meta = "\n".join(f"{label}：{value}" for label, value in (
+        ("題號", question.id), ("題組標題", question.group_title), ("分類", question.category),
+        ("主題", question.topic), ("關鍵詞", question.keywords)) if value)
+    query = " ".join(filter(None, [question.content, question.keywords, question.topic]))
+    knowledge = [format_entry(item) for item in lookup_knowledge(query, KNOWLEDGE_HITS)]
+    return packer.pack([
+        packer.fixed("【題目資訊】", meta),
+        packer.passage("【閱讀文本】", question.reading_text, query=(question.content or "") + options_text, share=0.45),
+        packer.fixed("【題幹】", question.content),
+        packer.fixed("【選項】", options_text),
+        packer.fixed("【作答】", f"學生答案：{student_answer}\n正確答案：{correct_answer}"),
+        packer.passage("【解析】", question.explanation, query=options_text, share=0.35),
+        packer.snippets("【相關教材】", knowledge, share=1.0),
+    ], budget)
@@ -1,19 +1,9 @@
-import os
 import re
 import asyncio
-from dotenv import load_dotenv
-from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel, Runner
-
-# === 初始化 Gemini 模型 ===
-load_dotenv()
-client = AsyncOpenAI(
-    base_url=os.getenv("GOOGLE_GEMINI_ENDPOINT"),
-    api_key=os.getenv("GOOGLE_GEMINI_API_KEY")
-)
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=client
-)
+from assistant_core.llm_client import lazy_agent
+from rag_tools import context_packer as packer
+from rag_tools.context_packer import PackedContext
+from rag_tools.knowledge_lookup import format_entry, lookup_knowledge
 
 LANGUAGE_INSTRUCTION = """
 你是一位親切且善於引導學生深入思考的 AI 國文老師。
@@ -23,42 +13,56 @@ LANGUAGE_INSTRUCTION = """
 請依據學生每輪內容個別化回應，三輪互動後以鼓勵語總結。
 """
 
-coach_agent = Agent(
+get_coach_agent = lazy_agent(
     name="InteractiveCoach",
     instructions=LANGUAGE_INSTRUCTION,
-    model=model
 )
 
-def build_prompt(
+PROMPT_BUDGET = 1500       # 教練 prompt 的 token 預算（不含系統指示）
+KNOWLEDGE_HITS = 5
+
+def build_context(
     question_info: dict,
     chat_history: list,
     user_input: str,
     style: str = "引導式（預設）",
     student_ans: str = None,
     correct_ans: str = None,
-    summary: str = ""
-) -> str:
-    """組裝完整 prompt"""
-    ctx = []
+    summary: str = "",
+    budget: int = PROMPT_BUDGET
+) -> PackedContext:
+    """
+    組裝 prompt：題目、相關教材（rag_tools 檢索）、對話歷程與學生摘要，
+    依 token 預算打包（見 rag_tools/context_packer.py）
+    """
+    sections = []
     if question_info:
-        if question_info.get("閱讀素材"):
-            ctx.append(f"【閱讀素材/題組說明】\n{question_info['閱讀素材']}")
-        if question_info.get("題幹"):
-            ctx.append(f"【題目】\n{question_info['題幹']}")
-        opts = question_info.get("選項", {})
+        stem = question_info.get("題幹") or ""
+        opts = question_info.get("選項", {}) or {}
+        options_text = "\n".join([f"({k}) {v}" for k, v in opts.items()])
+        sections.append(packer.passage("【閱讀素材/題組說明】", question_info.get("閱讀素材"),
+                                       query=stem + options_text + user_input))
+        sections.append(packer.fixed("【題目】", stem))
         if opts:
-            ctx.append("【選項】\n" + "\n".join([f"({k}) {v}" for k, v in opts.items()]))
-        ctx.append(f"【正確答案】{question_info.get('正解') or correct_ans or ''}")
+            sections.append(packer.fixed("【選項】", options_text))
+        answer = f"{question_info.get('正解') or correct_ans or ''}"
         if student_ans:
-            ctx.append(f"【學生上次作答】{student_ans}")
-
-    dialogue = "".join([f"{speaker}：{msg}\n" for speaker, msg in chat_history])
-    dialogue += f"學生（本輪輸入）：{user_input}\n"
+            answer += f"\n【學生上次作答】{student_ans}"
+        sections.append(packer.fixed("【正確答案】", answer))
+        query = " ".join(filter(None, [stem, question_info.get("關鍵詞"), question_info.get("主題"), user_input]))
+    else:
+        query = user_input
+    knowledge = [format_entry(item) for item in lookup_knowledge(query, KNOWLEDGE_HITS)]
+    sections.append(packer.snippets("【相關教材】", knowledge, share=0.25))
+    sections.append(packer.history("【歷程對話】", [f"{speaker}：{msg}" for speaker, msg in chat_history], share=0.6))
+    sections.append(packer.fixed("", f"學生（本輪輸入）：{user_input}"))
+    sections.append(packer.passage("【學生近期摘要】", summary, share=1.0))
+    sections.append(packer.fixed("【教練風格】", style))
+    return packer.pack(sections, budget)
 
-    prompt = "\n".join(ctx)
-    prompt += f"\n\n【歷程對話】\n{dialogue}"
-    prompt += f"\n【學生近期摘要】\n{summary}\n【教練風格】{style}"
-    return prompt
+def build_prompt(*args, **kwargs) -> str:
+    """組裝完整 prompt（參數同 build_context）"""
+    return build_context(*args, **kwargs).text
 
 def is_traditional_chinese(text: str, min_ratio: float = 0.7) -> bool:
     """
@@ -75,22 +79,27 @@ def run_coach_dialogue(
     style: str = "引導式（預設）",
     student_ans: str = None,
     correct_ans: str = None,
-    summary: str = ""
+    summary: str = "",
+    context: PackedContext = None
 ) -> str:
     """
     多輪 AI 教練對話邏輯，回傳教練完整回答。
+    context 為已打包的 build_context() 結果（呼叫端要顯示 token 用量時先自行打包）。
     """
-    prompt = build_prompt(
-        question_info, chat_history, user_input, style, student_ans, correct_ans, summary
-    )
+    if context is None:
+        context = build_context(
+            question_info, chat_history, user_input, style, student_ans, correct_ans, summary
+        )
+    prompt = context.text
 
+    from agents import Runner
     try:
         asyncio.get_event_loop()
     except RuntimeError:
         asyncio.set_event_loop(asyncio.new_event_loop())
 
     for _ in range(2):  # 最多重生一次
-        result = Runner.run_sync(coach_agent, input=prompt)
+        result = Runner.run_sync(get_coach_agent(), input=prompt)
         output = result.final_output.strip()
         if is_traditional_chinese(output):
             return output
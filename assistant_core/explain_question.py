@@ -1,34 +1,15 @@
-import os
 import json
 import pandas as pd
-from dotenv import load_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel
+from assistant_core.llm_client import lazy_agent
 from helpers.json_to_sqlite import insert_questions_to_db
+from data_store.db import QUESTION_BANK, resolve_path
 from pathlib import Path
-import asyncio
+from assistant_core import llm_client
 from models.student_model import StudentModel
 
-# === 初始化 Gemini 模型 ===
-load_dotenv()
-api_key = os.getenv("GOOGLE_GEMINI_API_KEY")
-endpoint = os.getenv("GOOGLE_GEMINI_ENDPOINT")
-
-if not api_key or not endpoint:
-    raise ValueError("❌ 請設定 GOOGLE_GEMINI_API_KEY 與 GOOGLE_GEMINI_ENDPOINT 環境變數")
-
-client = AsyncOpenAI(
-    base_url=endpoint,
-    api_key=api_key
-)
-
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=client
-)
-
 # ✅ 僅首次執行時初始化題庫
 json_path = "data_store/114_國綜.json"
-sqlite_path = "data_store/question_bank.sqlite"
+sqlite_path = resolve_path(QUESTION_BANK)
 if not Path(sqlite_path).exists() and Path(json_path).exists():
     try:
         insert_questions_to_db(json_path)
@@ -39,7 +20,7 @@ else:
     print("✅ 資料庫已存在，略過題庫初始化")
 
 # === 題目解析 Agent 設定 ===
-explain_question_agent = Agent(
+get_explain_question_agent = lazy_agent(
     name="ExplainQuestionAgent",
     instructions="""
 你是一位熟悉臺灣學測國文素養題型的 AI 教師。
@@ -56,9 +37,9 @@ explain_question_agent = Agent(
 
 請以條列方式清楚回答，不需加前後說明詞。
 """,
-    model=model
 )
 
 def explain_question(prompt: str) -> str:
-    result = asyncio.run(Runner.run(explain_question_agent, input=prompt))
+    from agents import Runner
+    result = llm_client.run(Runner.run(get_explain_question_agent(), input=prompt))
     return result.final_output
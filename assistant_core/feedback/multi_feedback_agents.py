@@ -1,21 +1,8 @@
-from agents import Agent, OpenAIChatCompletionsModel, AsyncOpenAI, Runner
-import os
-from dotenv import load_dotenv
+from assistant_core.llm_client import lazy_agent
 import asyncio
 
-# === 初始化 Gemini API client ===
-load_dotenv()
-client = AsyncOpenAI(
-    base_url=os.getenv("GOOGLE_GEMINI_ENDPOINT"),
-    api_key=os.getenv("GOOGLE_GEMINI_API_KEY")
-)
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=client
-)
-
 # === 多 Agent 定義 ===
-explainer_agent = Agent(
+get_explainer_agent = lazy_agent(
     name="ExplainerAgent",
     instructions="""
 你是一位資深國文教師，請你針對題目與選項，解釋正解的原因，條理清楚、易於學生理解。
@@ -24,10 +11,9 @@ explainer_agent = Agent(
 2. 為何正解正確
 3. 每個選項的解析與誤導點
 """,
-    model=model
 )
 
-misconception_agent = Agent(
+get_misconception_agent = lazy_agent(
     name="MisconceptionAgent",
     instructions="""
 你是一位學生作答分析師，擅長從學生選錯的選項推測其理解錯誤的來源，並給出心理錯誤類型與導正建議。
@@ -36,10 +22,9 @@ misconception_agent = Agent(
 2. 錯誤可能來自的語文或思考誤區
 3. 如何引導學生修正認知
 """,
-    model=model
 )
 
-coach_agent = Agent(
+get_coach_agent = lazy_agent(
     name="CoachAgent",
     instructions="""
 你是一位 AI 國文學習教練，請根據本題特性，提供學生後續練習與補強建議，可延伸至課本內容、文化知識、閱讀方法等。
@@ -48,10 +33,9 @@ coach_agent = Agent(
 2. 推薦學習方法
 3. 建議閱讀或補充資料
 """,
-    model=model
 )
 
-summarizer_agent = Agent(
+get_summarizer_agent = lazy_agent(
     name="SummarizerAgent",
     instructions="""
 你是一位教學顧問，請根據三位教師（解析者、錯誤分析者、教練）的建議，整理出學生應掌握的重點。
@@ -61,26 +45,24 @@ summarizer_agent = Agent(
 3. 下一步建議：可做什麼延伸學習？
 語氣務必親切、具引導性，適合學生閱讀。
 """,
-    model=model
 )
 
 agents = {
-    "🎓 教學解析": explainer_agent,
-    "👀 錯誤分析": misconception_agent,
-    "🧭 學習建議": coach_agent
+    "🎓 教學解析": get_explainer_agent,
+    "👀 錯誤分析": get_misconception_agent,
+    "🧭 學習建議": get_coach_agent
 }
 
-summarizer = summarizer_agent
-
 # ✅ 不用 block element 版本
 async def run_agent_discussion(prompt: str, streamlit_container):
+    from agents import Runner
     # 1. 依序顯示三個 AI 回饋（不在任何 status/spinner 內）
     ai_outputs = []
-    for title, agent in agents.items():
+    for title, get_agent in agents.items():
         # 提示正在回應
         streamlit_container.info(f"{title} 回應中...")
         try:
-            result = await Runner.run(agent, input=prompt)
+            result = await Runner.run(get_agent(), input=prompt)
             streamlit_container.markdown(f"### {title}")
             streamlit_container.code(result.final_output, language="markdown")
             ai_outputs.append((title, result.final_output))
@@ -92,7 +74,7 @@ async def run_agent_discussion(prompt: str, streamlit_container):
     summary_input = "\n\n".join([f"{title}：\n{text}" for title, text in ai_outputs])
     streamlit_container.info("🧠 回饋總結產生中...")
     try:
-        summary_result = await Runner.run(summarizer, input=summary_input)
+        summary_result = await Runner.run(get_summarizer_agent(), input=summary_input)
         streamlit_container.markdown("## 🧠 回饋總結")
         streamlit_container.code(summary_result.final_output, language="markdown")
     except Exception as e:
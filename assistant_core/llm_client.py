@@ -0,0 +1,141 @@
+# 檔案路徑：learning_assistant/assistant_core/llm_client.py
+
+# 所有 agent 共用的 LLM 連線與模型（Gemini 的 OpenAI 相容端點），模型名稱與端點設定只在這裡。
+#
+# - 延遲初始化：第一次建立 agent 時才 import agents SDK（約 2.5 秒）、讀取 .env，
+#   main.py 匯入各介面模組時不再付出這個成本
+# - 各模組以 lazy_agent() 宣告 agent，第一次呼叫時才建立，之後重複使用同一個
+# - 同一事件迴圈內的請求共用一個 AsyncOpenAI client 與其連線池（keep-alive），不再每個模組各開一個；
+#   httpx 的連線綁定建立它的事件迴圈，而 Runner.run_sync（沿用同一迴圈）與 asyncio.run（每次新迴圈）
+#   在專案中混用，因此 client 與以它建立的 OpenAIChatCompletionsModel 依事件迴圈各建一份
+# - agent 使用的模型只實作 SDK 公開的 Model 介面，每次請求時轉給目前迴圈的那一份，
+#   不依賴 SDK 內部屬性
+# - 以新迴圈執行的請求改用 run(coro) 取代 asyncio.run：迴圈結束前在同一迴圈內關閉它的 client；
+#   其他途徑已關閉的迴圈無法再執行 aclose（連線的傳輸層屬於該迴圈），client 只從快取移除，
+#   socket 待物件回收時釋放
+#
+# 設定（環境變數或 .env）：GOOGLE_GEMINI_ENDPOINT、GOOGLE_GEMINI_API_KEY
+
+import asyncio
+import os
+import threading
+
+MODEL_NAME = "gemini-2.0-flash"
+ENDPOINT_ENV = "GOOGLE_GEMINI_ENDPOINT"
+API_KEY_ENV = "GOOGLE_GEMINI_API_KEY"
+
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+KEEPALIVE_EXPIRY = 60.0   # 秒；多輪教練對話兩次提問間隔通常在一分鐘內，連線可直接沿用
+
+_lock = threading.RLock()
+_env_loaded = False
+_clients = {}             # 事件迴圈（無執行中迴圈時為 None）→ AsyncOpenAI
+_models = {}              # 事件迴圈 → OpenAIChatCompletionsModel
+_model = None
+
+def _load_env():
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+def _new_client():
+    import httpx
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    _load_env()
+    endpoint, api_key = os.getenv(ENDPOINT_ENV), os.getenv(API_KEY_ENV)
+    if not api_key or not endpoint:
+        raise ValueError(f"❌ 請設定 {API_KEY_ENV} 與 {ENDPOINT_ENV} 環境變數")
+    limits = httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    return AsyncOpenAI(
+        base_url=endpoint,
+        api_key=api_key,
+        http_client=DefaultAsyncHttpxClient(limits=limits),
+    )
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+def _evict(loop):
+    _models.pop(loop, None)
+    return _clients.pop(loop, None)
+
+def get_client():
+    """目前事件迴圈的共用 AsyncOpenAI client；未設定端點或 API key 時丟出 ValueError"""
+    loop = _running_loop()
+    with _lock:
+        for closed in [l for l in _clients if l is not None and l.is_closed()]:
+            _evict(closed)           # 連線屬於已關閉的迴圈，無法再用，也無法再 aclose
+        client = _clients.get(loop)
+        if client is None:
+            client = _clients[loop] = _new_client()
+        return client
+
+async def close_client():
+    """關閉目前事件迴圈的 client 與連線池（迴圈結束前呼叫）"""
+    with _lock:
+        client = _evict(_running_loop())
+    if client is not None:
+        await client.close()
+
+def run(coro):
+    """取代 asyncio.run：在新迴圈執行 coro，迴圈結束前關閉該迴圈的 client"""
+    async def main():
+        try:
+            return await coro
+        finally:
+            await close_client()
+    return asyncio.run(main())
+
+def _loop_model():
+    """目前事件迴圈的 OpenAIChatCompletionsModel（以公開參數 openai_client 指定該迴圈的 client）"""
+    from agents import OpenAIChatCompletionsModel
+
+    client = get_client()
+    loop = _running_loop()
+    with _lock:
+        model = _models.get(loop)
+        if model is None:
+            model = _models[loop] = OpenAIChatCompletionsModel(model=MODEL_NAME, openai_client=client)
+        return model
+
+def get_model():
+    """agent 共用的模型：每次請求時轉給目前事件迴圈的 OpenAIChatCompletionsModel"""
+    global _model
+    with _lock:
+        if _model is None:
+            from agents.models.interface import Model
+
+            class LoopModel(Model):
+                async def get_response(self, *args, **kwargs):
+                    return await _loop_model().get_response(*args, **kwargs)
+
+                async def stream_response(self, *args, **kwargs):
+                    async for event in _loop_model().stream_response(*args, **kwargs):
+                        yield event
+
+            _model = LoopModel()
+        return _model
+
+def lazy_agent(name, instructions, **options):
+    """回傳取得 agent 的函式：第一次呼叫時才以共用模型建立 Agent，之後回傳同一個"""
+    agent = None
+
+    def get():
+        nonlocal agent
+        with _lock:
+            if agent is None:
+                from agents import Agent
+                agent = Agent(name=name, instructions=instructions, model=get_model(), **options)
+            return agent
+    return get
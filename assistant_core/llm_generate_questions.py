@@ -1,30 +1,10 @@
-import os
 import json
 import re
-from dotenv import load_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel
-import asyncio
-
-# === 初始化 Gemini 模型 ===
-load_dotenv()
-api_key = os.getenv("GOOGLE_GEMINI_API_KEY")
-endpoint = os.getenv("GOOGLE_GEMINI_ENDPOINT")
-
-if not api_key or not endpoint:
-    raise ValueError("❌ 請設定 GOOGLE_GEMINI_API_KEY 與 GOOGLE_GEMINI_ENDPOINT 環境變數")
-
-client = AsyncOpenAI(
-    base_url=endpoint,
-    api_key=api_key
-)
-
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=client
-)
+from assistant_core import llm_client
+from assistant_core.llm_client import lazy_agent
 
 # === AI 產題 Agent ===
-question_gen_agent = Agent(
+get_question_gen_agent = lazy_agent(
     name="QuestionGenerationAgent",
     instructions="""
 你是一位資深國文老師，請根據給定閱讀文本，產生指定數量的素養導向單選題，每題格式必須為：
@@ -32,7 +12,6 @@ question_gen_agent = Agent(
 每一題「必須同時」包含「題幹」、「選項」、「正解」三個欄位，且選項必須有A、B、C、D四個選項。
 請以純 JSON list 輸出，每題一個 dict，**禁止加上```json或```標記**，不得省略任何欄位。
 """,
-    model=model
 )
 
 def extract_json_from_llm_output(output):
@@ -50,6 +29,7 @@ def generate_questions_with_llm(reading_text, num_questions=5):
     用 Gemini LLM 產生素養導向小題（同步呼叫，適用 Streamlit）
     回傳: (questions_list, llm_raw_output)
     """
+    from agents import Runner
     prompt = f"""
 請根據以下閱讀文本，產生 {num_questions} 題素養導向單選題，附標準答案。
 閱讀文本：
@@ -62,7 +42,7 @@ def generate_questions_with_llm(reading_text, num_questions=5):
 ]
 """
     try:
-        result = asyncio.run(Runner.run(question_gen_agent, input=prompt))
+        result = llm_client.run(Runner.run(get_question_gen_agent(), input=prompt))
         output = result.final_output
         output_json = extract_json_from_llm_output(output)
         questions = json.loads(output_json)
@@ -1,24 +1,12 @@
 # 檔案路徑：assistant_core/populate_explanations.py
 
-import sqlite3
 import json
-import os
-from dotenv import load_dotenv
-from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel, Runner
-
-DB_PATH = "data_store/question_bank.sqlite"
+from assistant_core.llm_client import lazy_agent
+from data_store.bank_cache import bump_bank_version
+from data_store.db import QUESTION_BANK, get_connection, transaction
 
 # === 初始化 LLM/Agent（以 Gemini 為例，OpenAI 亦可依實際切換） ===
-load_dotenv()
-client = AsyncOpenAI(
-    base_url=os.getenv("GOOGLE_GEMINI_ENDPOINT"),
-    api_key=os.getenv("GOOGLE_GEMINI_API_KEY")
-)
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=client
-)
-explanation_agent = Agent(
+get_explanation_agent = lazy_agent(
     name="ExplanationAgent",
     instructions="""
 你是一位資深國文科AI老師，負責為學測國文素養題產生詳細解析。請依以下格式生成答案：
@@ -28,18 +16,18 @@ explanation_agent = Agent(
 4. 給學生一條類型題型的學習建議。
 請使用條列式，回應風格簡明專業。
 """,
-    model=model
 )
 
 def populate_explanations():
     # 加 event loop 保險，解決 Streamlit 多執行緒下 "no current event loop" 問題
     import asyncio
+    from agents import Runner
     try:
         asyncio.get_event_loop()
     except RuntimeError:
         asyncio.set_event_loop(asyncio.new_event_loop())
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(QUESTION_BANK)
     c = conn.cursor()
     c.execute("SELECT id, content, options, answer FROM questions WHERE explanation IS NULL OR explanation = ''")
     rows = c.fetchall()
@@ -66,11 +54,12 @@ def populate_explanations():
 3. 常見錯誤選項混淆原因
 4. 類型學習建議（條列式）
 """
-            result = Runner.run_sync(explanation_agent, input=prompt)
+            result = Runner.run_sync(get_explanation_agent(), input=prompt)
             explanation = result.final_output.strip()
 
             if explanation:
-                c.execute("UPDATE questions SET explanation = ? WHERE id = ?", (explanation, qid))
+                with transaction(QUESTION_BANK):
+                    conn.execute("UPDATE questions SET explanation = ? WHERE id = ?", (explanation, qid))
                 updated += 1
             else:
                 failed += 1
@@ -78,6 +67,5 @@ def populate_explanations():
             failed += 1
             print(f"補齊解析失敗（題號 {qid}）：{e}")
 
-    conn.commit()
-    conn.close()
+    bump_bank_version()
     return updated, failed
@@ -1,24 +1,12 @@
 # 檔案路徑：assistant_core/populate_keywords.py
 
-import sqlite3
-import os
 import json
-from dotenv import load_dotenv
-from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel, Runner
-
-DB_PATH = "data_store/question_bank.sqlite"
+from assistant_core.llm_client import lazy_agent
+from data_store.bank_cache import bump_bank_version
+from data_store.db import QUESTION_BANK, get_connection, transaction
 
 # === 初始化 LLM/Agent ===
-load_dotenv()
-client = AsyncOpenAI(
-    base_url=os.getenv("GOOGLE_GEMINI_ENDPOINT"),
-    api_key=os.getenv("GOOGLE_GEMINI_API_KEY")
-)
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=client
-)
-keywords_agent = Agent(
+get_keywords_agent = lazy_agent(
     name="KeywordsAgent",
     instructions="""
 你是一位台灣高中國文素養導向命題專家。
@@ -29,17 +17,17 @@ keywords_agent = Agent(
 
 請務必遵照格式，直接回傳關鍵詞。
 """,
-    model=model
 )
 
 def populate_keywords():
     import asyncio
+    from agents import Runner
     try:
         asyncio.get_event_loop()
     except RuntimeError:
         asyncio.set_event_loop(asyncio.new_event_loop())
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(QUESTION_BANK)
     cursor = conn.cursor()
     cursor.execute("SELECT id, group_id, content, options FROM questions WHERE keywords IS NULL OR keywords = ''")
     rows = cursor.fetchall()
@@ -74,21 +62,21 @@ def populate_keywords():
 請根據上述內容，僅回傳3-5個國文素養關鍵詞（逗號分隔），勿說明。
 """
 
-            result = Runner.run_sync(keywords_agent, input=prompt)
+            result = Runner.run_sync(get_keywords_agent(), input=prompt)
             # 只取第一行且去除標點、多餘符號
             keywords = result.final_output.strip().replace("，", ",").replace("。", "")
             keywords = keywords.split("\n")[0].split("：")[-1].strip()
             # 保證3-5個以逗號分隔的詞
             if keywords and 2 <= keywords.count(",") <= 4:
-                cursor.execute("UPDATE questions SET keywords = ? WHERE id = ?", (keywords, qid))
+                with transaction(QUESTION_BANK):
+                    conn.execute("UPDATE questions SET keywords = ? WHERE id = ?", (keywords, qid))
                 updated += 1
             else:
                 failed += 1
         except Exception as e:
             failed += 1
             print(f"補齊關鍵詞失敗（題號 {qid}）：{e}")
-    conn.commit()
-    conn.close()
+    bump_bank_version()
     return updated, failed
 
 if __name__ == "__main__":
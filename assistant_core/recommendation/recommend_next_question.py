@@ -1,63 +1,238 @@
-import sqlite3
+# 檔案路徑：learning_assistant/assistant_core/recommendation/recommend_next_question.py
+
+# 個人化推薦再練題目：
+# - 題庫索引：主題 / 關鍵詞 → 題號 array，經由 bank_cache 快取，題庫變動時自動重建
+# - 學生檔案：已作答（seen）、已掌握（最近一次答對，mastered）集合與最近答錯的主題/關鍵詞權重，
+#   以 answer_log.id 為水位增量更新（同 StudentModel），快取於行程內；
+#   主題權重另加上知識追蹤的未掌握程度（data_store/knowledge_tracing.py）
+# - 推薦：依最近答錯主題/關鍵詞的權重分配名額，在對應題號 array 中隨機抽出未作答的題目；
+#   每次推薦的成本只與 k 有關，與題庫大小、作答紀錄筆數無關
+# - 難度配對：每個名額抽 CANDIDATES 道未作答候選，取校準難度最接近「答對率約 TARGET_P」的一題
+# - 練習卷排序：依校準難度由易到難，未校準的題目才沿用題庫的 difficulty
+
+import math
 import random
+import threading
+from array import array
+from collections import OrderedDict, defaultdict, deque
+from data_store import calibration, knowledge_tracing
+from data_store.bank_cache import get_cached
+from data_store.db import QUESTION_BANK, USER_LOG, get_connection
+from data_store.question_loader import get_questions_by_ids
 
-DB_PATH = "data_store/question_bank.sqlite"
-USER_LOG_PATH = "data_store/user_log.sqlite"
-
-# === 推薦再練題目 ===
-def recommend_next_question_by_topic():
-    # 從 user_log 抓取最近錯題的主題
-    conn = sqlite3.connect(USER_LOG_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT question_id FROM answer_log
-        WHERE is_correct = 0
-        ORDER BY timestamp DESC
-        LIMIT 1
-    """)
-    row = cursor.fetchone()
-    conn.close()
-
-    if not row:
-        return None  # 沒有錯題紀錄
-
-    recent_qid = row[0]
-
-    # 取得該題主題
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT topic FROM questions WHERE id = ?", (recent_qid,))
-    topic_row = cursor.fetchone()
-    if not topic_row:
-        return None
+RECENT_ERRORS = 20       # 計算弱點權重時參考的最近答錯題數
+DECAY = 0.85             # 越早的錯題權重越低：第 i 新的錯題權重 DECAY ** i
+KEYWORD_FACTOR = 0.5     # 關鍵詞權重相對於主題的比例
+MASTERY_FACTOR = 0.5     # 主題未掌握程度（1 - 掌握機率）的權重
+EXPLORE_RATIO = 0.2      # 練習卷中不限主題的題目比例
+MAX_TRIES = 32           # 每個名額的隨機重試次數
+MAX_PROFILES = 2000      # 行程內快取的學生檔案數
+CANDIDATES = 4           # 每個名額比較難度的未作答候選數
+TARGET_P = 0.7           # 推薦題目的預期答對率
+UNCALIBRATED_GAP = 1.0   # 尚未校準的題目視為與目標難度相差此值
+
+# === 題庫索引 ===
+class RecommendationIndex:
+    __slots__ = ("all_ids", "by_topic", "by_keyword")
+
+    def __init__(self, all_ids, by_topic, by_keyword):
+        self.all_ids = all_ids          # array('q')
+        self.by_topic = by_topic        # 主題 → array('q')
+        self.by_keyword = by_keyword    # 關鍵詞 → array('q')
+
+def _load_index():
+    by_topic, by_keyword = defaultdict(lambda: array("q")), defaultdict(lambda: array("q"))
+    all_ids = array("q")
+    c = get_connection(QUESTION_BANK).execute("SELECT id, topic, keywords FROM questions ORDER BY id")
+    for qid, topic, keywords in c:
+        all_ids.append(qid)
+        if topic:
+            by_topic[topic].append(qid)
+        for kw in (keywords or "").replace("，", ",").split(","):
+            kw = kw.strip()
+            if kw:
+                by_keyword[kw].append(qid)
+    return RecommendationIndex(all_ids, dict(by_topic), dict(by_keyword))
+
+def get_index():
+    return get_cached("recommendation.index", _load_index)
+
+# === 學生檔案 ===
+class UserProfile:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.watermark = 0
+        self.seen = set()                       # 作答過的題號（int）
+        self.mastered = set()                   # 最近一次作答答對的題號
+        self.recent_errors = deque(maxlen=RECENT_ERRORS)   # 最近答錯的題號，新的在右
+        self.features = {}                      # 題號 → (主題, 關鍵詞 tuple)，只存最近錯題
+        self.topic_weights = {}
+        self.keyword_weights = {}
+        self.ability = 0.0                      # 校準能力 θ（data_store/calibration.py）
+        self.mastery = {}                       # 主題 → 掌握機率（data_store/knowledge_tracing.py）
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """納入水位之後的新作答，回傳新增筆數"""
+        with self.lock:
+            rows = get_connection(USER_LOG).execute("""
+                SELECT id, question_id, is_correct FROM answer_log
+                WHERE user_id = ? AND id > ? ORDER BY id
+            """, (self.user_id, self.watermark)).fetchall()
+            if not rows:
+                return 0
+            for _, qid, is_correct in rows:
+                try:
+                    qid = int(qid)
+                except (TypeError, ValueError):
+                    continue
+                self.seen.add(qid)
+                if is_correct:
+                    self.mastered.add(qid)
+                else:
+                    self.mastered.discard(qid)
+                    self.recent_errors.append(qid)
+            self.watermark = rows[-1][0]
+            self.ability = calibration.get_ability(self.user_id)
+            self.mastery = knowledge_tracing.mastery_vector(self.user_id, "topic")
+            self._update_weights()
+            return len(rows)
+
+    def _update_weights(self):
+        missing = [qid for qid in self.recent_errors if qid not in self.features]
+        if missing:
+            for qid, q in get_questions_by_ids(missing).items():
+                self.features[qid] = (q.topic, tuple(q.keyword_list()))
+        self.features = {qid: self.features[qid] for qid in self.recent_errors if qid in self.features}
+        topics, keywords = defaultdict(float), defaultdict(float)
+        for i, qid in enumerate(reversed(self.recent_errors)):
+            topic, kws = self.features.get(qid, (None, ()))
+            weight = DECAY ** i
+            if topic:
+                topics[topic] += weight
+            for kw in kws:
+                keywords[kw] += weight * KEYWORD_FACTOR
+        for topic, p in self.mastery.items():
+            if p < knowledge_tracing.MASTERED:
+                topics[topic] += MASTERY_FACTOR * (1 - p)
+        self.topic_weights, self.keyword_weights = dict(topics), dict(keywords)
 
-    topic = topic_row[0]
+_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
 
-    # 推薦同主題但不同題號的題目
-    cursor.execute("""
-        SELECT * FROM questions
-        WHERE topic = ? AND id != ?
-        ORDER BY RANDOM()
-        LIMIT 1
-    """, (topic, recent_qid))
-    question = cursor.fetchone()
-    conn.close()
+def get_profile(user_id):
+    """取得學生檔案（最近使用的 MAX_PROFILES 位保留在快取），並納入新作答"""
+    with _profiles_lock:
+        profile = _profiles.get(user_id)
+        if profile is None:
+            profile = _profiles[user_id] = UserProfile(user_id)
+            if len(_profiles) > MAX_PROFILES:
+                _profiles.popitem(last=False)
+        else:
+            _profiles.move_to_end(user_id)
+    profile.refresh()
+    return profile
 
-    if not question:
+def clear_profiles():
+    with _profiles_lock:
+        _profiles.clear()
+
+# === 推薦 ===
+def _weighted_pools(index, profile):
+    """[(權重, 題號 array, 推薦理由)]；沒有錯題紀錄時為整個題庫"""
+    pools = [(w, index.by_topic[t], f"主題：{t}") for t, w in profile.topic_weights.items() if t in index.by_topic]
+    pools += [(w, index.by_keyword[k], f"關鍵詞：{k}") for k, w in profile.keyword_weights.items() if k in index.by_keyword]
+    return pools or [(1.0, index.all_ids, "隨機")]
+
+def _draw(pool, rng, taken, profile, difficulties):
+    """
+    從 pool 隨機抽一題：優先未作答（候選中取校準難度最接近目標者），
+    其次作答過但尚未掌握；都沒有時回傳 None
+    """
+    if not pool:
         return None
+    fallback, candidates = None, []
+    for _ in range(MAX_TRIES):
+        qid = pool[rng.randrange(len(pool))]
+        if qid in taken or qid in profile.mastered:
+            continue
+        if qid not in profile.seen:
+            candidates.append(qid)
+            if len(candidates) >= CANDIDATES:
+                break
+        else:
+            fallback = fallback or qid
+    if not candidates:
+        return fallback
+    # P(答對) = TARGET_P 時的難度：b = θ - logit(TARGET_P)
+    target = profile.ability - math.log(TARGET_P / (1 - TARGET_P))
+    return min(candidates, key=lambda qid: abs(difficulties[qid] - target) if qid in difficulties else UNCALIBRATED_GAP)
+
+def _pick(user_id, k, rng, explore_ratio):
+    index = get_index()
+    profile = get_profile(user_id)
+    rng = rng or random.Random()
+    difficulties = calibration.item_difficulties()
+    pools = _weighted_pools(index, profile)
+    weights = [w for w, _, _ in pools]
+    explore = (1.0, index.all_ids, "延伸練習")
+    picked, taken = [], set()
+    # 每個名額依權重選一個來源；抽不到時再試其他來源，最多 k * 4 次
+    for _ in range(k * 4):
+        if len(picked) >= k:
+            break
+        use_explore = explore_ratio and rng.random() < explore_ratio
+        _, pool, reason = explore if use_explore else rng.choices(pools, weights)[0]
+        qid = _draw(pool, rng, taken, profile, difficulties)
+        if qid is not None:
+            taken.add(qid)
+            picked.append((qid, reason))
+    return picked
+
+def recommend_ids(user_id, k=5, rng=None):
+    """[(題號, 推薦理由)]，依最近答錯主題/關鍵詞加權；不含已掌握的題目"""
+    return _pick(user_id, k, rng, explore_ratio=0)
+
+def recommend(user_id, k=5, rng=None):
+    """[(Question, 推薦理由)]"""
+    picked = recommend_ids(user_id, k, rng)
+    questions = get_questions_by_ids([qid for qid, _ in picked])
+    return [(questions[qid], reason) for qid, reason in picked if qid in questions]
+
+def build_practice_set(user_id, size=20, rng=None, explore_ratio=EXPLORE_RATIO):
+    """
+    產生一份練習卷：[(Question, 推薦理由)]，依難度由易到難排列。
+    約 explore_ratio 比例的題目不限主題，避免只練弱點。
+    """
+    picked = _pick(user_id, size, rng, explore_ratio)
+    questions = get_questions_by_ids([qid for qid, _ in picked])
+    items = [(questions[qid], reason) for qid, reason in picked if qid in questions]
+    difficulties = calibration.item_difficulties()
+    items.sort(key=lambda item: _difficulty_key(item[0], difficulties))
+    return items
+
+def _difficulty_key(q, difficulties):
+    """
+    排序鍵：已校準的題目用校準難度 b 換算的等級，同等級內再依 b 排列；
+    未校準的題目才沿用題庫（LLM 標註）的 difficulty，排在同等級已校準題目之後
+    """
+    b = difficulties.get(q.id)
+    if b is None:
+        return (_difficulty(q), 1, 0.0, q.id)
+    return (calibration.difficulty_level(b), 0, b, q.id)
+
+def _difficulty(q):
+    try:
+        return int(q.difficulty)
+    except (TypeError, ValueError):
+        return 99   # 未標難度排最後
+
+def build_practice_sets(user_ids, size=20, seed=None):
+    """整班產生練習卷：{user_id: [(Question, 推薦理由)]}"""
+    rng = random.Random(seed)
+    return {user_id: build_practice_set(user_id, size, rng) for user_id in user_ids}
 
-    return {
-        "題號": question[0],
-        "出處": question[1],
-        "題幹": question[2],
-        "選項": {
-            "A": question[3],
-            "B": question[4],
-            "C": question[5],
-            "D": question[6]
-        },
-        "正解": question[7],
-        "主題": question[8],
-        "段落標題": question[9],
-        "關鍵詞": question[10].split(", ") if question[10] else []
-    }
+# 相容舊介面：回傳一題推薦題目的中文鍵名 dict，沒有可推薦題目時回傳 None
+def recommend_next_question_by_topic(user_id):
+    picked = recommend(user_id, k=1)
+    return picked[0][0].as_dict() if picked else None
@@ -1,21 +1,8 @@
-from agents import Agent, Runner, OpenAIChatCompletionsModel, AsyncOpenAI
-import os
-from dotenv import load_dotenv
+from assistant_core.llm_client import lazy_agent
 import asyncio
 
-# === 初始化 Gemini API client ===
-load_dotenv()
-client = AsyncOpenAI(
-    base_url=os.getenv("GOOGLE_GEMINI_ENDPOINT"),
-    api_key=os.getenv("GOOGLE_GEMINI_API_KEY")
-)
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=client
-)
-
 # === 定義 Agent ===
-assessor_agent = Agent(
+get_assessor_agent = lazy_agent(
     name="AssessorAgent",
     instructions="""
 你是一位國文素養診斷師，請根據學生作答情況判斷是否需要錯誤分析，或可以直接給出學習建議。
@@ -24,33 +11,31 @@ assessor_agent = Agent(
 - 處理建議：請以 JSON 格式提供下一步動作，例如：
   {"handoff_to": "MisconceptionAgent"} 或 {"handoff_to": "CoachAgent"}
 """,
-    model=model
 )
 
-misconception_agent = Agent(
+get_misconception_agent = lazy_agent(
     name="MisconceptionAgent",
     instructions="""
 你是一位錯誤分析師，請針對學生的誤選進行心理層面與知識層面分析，並建議修正策略。
 """,
-    model=model
 )
 
-coach_agent = Agent(
+get_coach_agent = lazy_agent(
     name="CoachAgent",
     instructions="""
 你是一位國文學習教練，請提供此題類型的後續補強建議與資源推薦。
 """,
-    model=model
 )
 
 agent_lookup = {
-    "MisconceptionAgent": misconception_agent,
-    "CoachAgent": coach_agent
+    "MisconceptionAgent": get_misconception_agent,
+    "CoachAgent": get_coach_agent
 }
 
 # === 主控流程 ===
 async def run_handoff_workflow(prompt: str):
-    assessor_result = await Runner.run(assessor_agent, input=prompt)
+    from agents import Runner
+    assessor_result = await Runner.run(get_assessor_agent(), input=prompt)
     assessor_text = assessor_result.final_output
 
     import re, json
@@ -64,7 +49,7 @@ async def run_handoff_workflow(prompt: str):
             pass
 
     if next_agent and next_agent in agent_lookup:
-        next_result = await Runner.run(agent_lookup[next_agent], input=prompt)
+        next_result = await Runner.run(agent_lookup[next_agent](), input=prompt)
         return {
             "診斷結果": assessor_text,
             "後續處理 ({})".format(next_agent): next_result.final_output
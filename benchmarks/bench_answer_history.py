@@ -0,0 +1,93 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_answer_history.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_answer_history
+#
+# 學習歷程頁「作答紀錄 + 題目欄位」在不同題庫大小下的成本（該生作答 ANSWERS 筆）：
+# 1. 改寫前：questions / question_groups 整表讀進 DataFrame，再以 pandas merge 合併
+# 2. ATTACH 題庫後在 SQL 內 JOIN（data_store.answer_history.get_user_history）
+# 峰值記憶體以 tracemalloc 另跑一次量測；改寫後的峰值不應隨題庫大小增加。
+
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from data_store import answer_history, db
+from data_store.answer_log_writer import INSERT_SQL
+from init_db import create_database
+
+BANK_SIZES = (10_000, 50_000, 200_000)
+ANSWERS = 500
+
+def build_bank(path, n):
+    create_database(path)
+    rng = random.Random(n)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO question_groups (id, title, reading_text, category) VALUES (?, ?, ?, ?)",
+                     ((g, f"題組{g}", "閱讀文本" * 200, "閱讀") for g in range(1, n // 20 + 1)))
+    conn.executemany(
+        "INSERT INTO questions (id, group_id, content, options, answer, explanation, topic, difficulty, question_type, keywords) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ((i, i // 20 or None, "題幹" * 60, json.dumps({"A": "選項甲" * 10, "B": "選項乙" * 10}, ensure_ascii=False), "A",
+          "解析" * 100, rng.choice(["修辭", "成語", "文意"]), rng.randint(1, 5), "單選", "比喻,借代") for i in range(1, n + 1))
+    )
+    conn.commit()
+    conn.close()
+
+def fill_log(n_questions):
+    rng = random.Random(7)
+    with db.transaction(db.USER_LOG) as conn:
+        conn.executemany(INSERT_SQL, (
+            (f"2025-05-{rng.randint(1, 28):02d}T10:00:00", 1, str(q), "B", "A", 0, q // 20 or None, q)
+            for q in (rng.randint(1, n_questions) for _ in range(ANSWERS))
+        ))
+
+def legacy_joined_logs(user_id):
+    conn_log = db.get_connection(db.USER_LOG)
+    conn_qb = db.get_connection(db.QUESTION_BANK)
+    log_df = pd.read_sql_query("SELECT * FROM answer_log WHERE user_id = ? ORDER BY timestamp DESC", conn_log, params=(user_id,))
+    q_df = pd.read_sql_query("SELECT * FROM questions", conn_qb)
+    g_df = pd.read_sql_query("SELECT id as group_id, title, reading_text, category FROM question_groups", conn_qb)
+    log_df['question_id'] = log_df['question_id'].astype(str)
+    q_df['id'] = q_df['id'].astype(str)
+    merged = pd.merge(log_df, q_df, left_on='question_id', right_on='id', how='left', suffixes=('', '_q'))
+    return pd.merge(merged, g_df, left_on='group_id', right_on='group_id', how='left', suffixes=('', '_g'))
+
+def joined_logs(user_id):
+    return pd.DataFrame(answer_history.get_user_history(user_id), columns=answer_history.HISTORY_COLUMNS)
+
+def measure(fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+def main():
+    print(f"{'題庫題數':>10} {'改寫前':>22} {'SQL JOIN':>22}")
+    for n in BANK_SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            db.close_connections()
+            db.DB_PATHS[db.QUESTION_BANK] = os.path.join(tmp, "bank.sqlite")
+            db.DB_PATHS[db.USER_LOG] = os.path.join(tmp, "user_log.sqlite")
+            build_bank(db.DB_PATHS[db.QUESTION_BANK], n)
+            fill_log(n)
+
+            old_df, old_t, old_mem = measure(lambda: legacy_joined_logs(1))
+            new_df, new_t, new_mem = measure(lambda: joined_logs(1))
+            cols = ["timestamp", "question_id", "content", "topic", "title", "category"]
+            old_cmp = old_df[cols].sort_values(["timestamp", "question_id"]).reset_index(drop=True)
+            new_cmp = new_df[cols].sort_values(["timestamp", "question_id"]).reset_index(drop=True)
+            assert old_cmp.equals(new_cmp), "合併結果不一致"
+            print(f"{n:>10,} {old_t * 1000:>8.1f} ms {old_mem:>7.1f} MB {new_t * 1000:>8.1f} ms {new_mem:>7.1f} MB")
+            db.close_connections()
+
+if __name__ == "__main__":
+    main()
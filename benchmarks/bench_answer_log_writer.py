@@ -0,0 +1,93 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_answer_log_writer.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_answer_log_writer
+#
+# 模擬全班同時按「提交作答」：STUDENTS 個執行緒各自送出 ANSWERS_EACH 筆作答，
+# 比較改寫前「每次提交開連線、插入、commit」與背景批次寫入器的吞吐量與失敗數。
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from data_store import answer_log_writer, db
+from database.migrations import migrate
+
+STUDENTS = 40
+ANSWERS_EACH = 50
+
+def make_log_db(path, wal):
+    conn = sqlite3.connect(path)
+    if wal:
+        conn.execute("PRAGMA journal_mode = WAL")
+    migrate(conn, db.USER_LOG)
+    conn.close()
+
+def run_threads(target):
+    threads = [threading.Thread(target=target, args=(uid,)) for uid in range(1, STUDENTS + 1)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+def bench_legacy(path):
+    """改寫前 task_view.save_log 的做法（rollback journal，每筆各自連線提交）"""
+    errors = []
+
+    def student(uid):
+        for i in range(ANSWERS_EACH):
+            try:
+                conn = sqlite3.connect(path)
+                conn.execute(answer_log_writer.INSERT_SQL,
+                             (datetime.now().isoformat(), uid, str(i), "A", "B", 0, None, None))
+                conn.commit()
+                conn.close()
+            except sqlite3.OperationalError as e:
+                errors.append(e)
+
+    elapsed = run_threads(student)
+    return elapsed, errors
+
+def bench_writer(path):
+    db.DB_PATHS[db.USER_LOG] = path
+
+    def student(uid):
+        for i in range(ANSWERS_EACH):
+            answer_log_writer.log_answer(uid, str(i), "A", "B")
+
+    start = time.perf_counter()
+    submit = run_threads(student)
+    answer_log_writer.flush()
+    total = time.perf_counter() - start
+    answer_log_writer.shutdown()
+    return submit, total
+
+def count_rows(path):
+    conn = sqlite3.connect(path)
+    n = conn.execute("SELECT COUNT(*) FROM answer_log").fetchone()[0]
+    conn.close()
+    return n
+
+def main():
+    total_rows = STUDENTS * ANSWERS_EACH
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.sqlite")
+        make_log_db(legacy_path, wal=False)
+        elapsed, errors = bench_legacy(legacy_path)
+        print(f"逐筆提交（rollback journal）：{STUDENTS} 人 × {ANSWERS_EACH} 筆，"
+              f"{elapsed:.2f}s，{count_rows(legacy_path) / elapsed:,.0f} 筆/秒，"
+              f"寫入 {count_rows(legacy_path)}/{total_rows}，database is locked {len(errors)} 次")
+
+        writer_path = os.path.join(tmp, "writer.sqlite")
+        make_log_db(writer_path, wal=True)
+        submit, total = bench_writer(writer_path)
+        stats = answer_log_writer.stats()
+        print(f"批次寫入器（WAL + group commit）：{STUDENTS} 人 × {ANSWERS_EACH} 筆，"
+              f"提交端 {submit:.3f}s，全部落盤 {total:.3f}s，{count_rows(writer_path) / total:,.0f} 筆/秒，"
+              f"寫入 {count_rows(writer_path)}/{total_rows}，批次 {stats['batches']}，失敗 {stats['errors']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_bulk_importer.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_bulk_importer
+#
+# 產生 20 萬題的題庫檔（題組 × 4 小題與單題各半），比較：
+# 1. 改寫前 import_from_json：json.load 整份檔案後逐題 INSERT
+# 2. bulk_importer.import_file：串流解析 + 分批 executemany（JSON 陣列與 JSONL）
+# 並模擬匯入中途失敗後續傳，確認題組與題目沒有重複。
+
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from data_store import bank_cache, bulk_importer, db
+from init_db import create_database
+
+N_QUESTIONS = 200_000
+SUBS_PER_GROUP = 4
+
+def make_items():
+    options = {k: f"選項{k}的敘述內容" for k in "ABCD"}
+    n_groups = N_QUESTIONS // 2 // SUBS_PER_GROUP
+    for g in range(n_groups):
+        yield {
+            "group": {"title": f"題組{g}", "reading_text": "閱讀文本" * 50, "category": "閱讀理解"},
+            "questions": [{"題幹": f"題組{g} 小題{s}：下列敘述何者正確？", "選項": options, "正解": "A",
+                           "解析": "依據文本第二段。", "主題": "閱讀理解"} for s in range(SUBS_PER_GROUP)],
+        }
+    for i in range(N_QUESTIONS // 2):
+        yield {"content": f"單題{i}：下列敘述何者正確？", "options": options, "answer": "B",
+               "explanation": "依據定義。", "topic": "材料性質", "difficulty": 2, "keywords": ["晶體", "缺陷"]}
+
+def write_files(tmp):
+    json_path = os.path.join(tmp, "bank.json")
+    jsonl_path = os.path.join(tmp, "bank.jsonl")
+    with open(json_path, "w", encoding="utf-8") as fa, open(jsonl_path, "w", encoding="utf-8") as fl:
+        fa.write("[\n")
+        for i, item in enumerate(make_items()):
+            line = json.dumps(item, ensure_ascii=False)
+            fa.write(("" if i == 0 else ",\n") + line)
+            fl.write(line + "\n")
+        fa.write("\n]\n")
+    return json_path, jsonl_path
+
+def use_bank(path):
+    db.close_connections()
+    create_database(path)
+    db.DB_PATHS[db.QUESTION_BANK] = path
+    bank_cache.clear_cache()
+
+def legacy_import(json_path):
+    """改寫前 question_group_loader.import_from_json（整份載入、逐題 INSERT）"""
+    with open(json_path, encoding="utf-8") as f:
+        json_data = json.load(f)
+    with db.transaction(db.QUESTION_BANK) as conn:
+        c = conn.cursor()
+        for item in json_data:
+            if 'group' in item and 'questions' in item:
+                group = item['group']
+                c.execute('INSERT INTO question_groups (title, reading_text, category) VALUES (?, ?, ?)',
+                          (group.get('title'), group.get('reading_text'), group.get('category')))
+                group_id = c.lastrowid
+                for q in item['questions']:
+                    c.execute('''INSERT INTO questions (group_id, content, options, answer, explanation, topic, difficulty, question_type)
+                                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                              (group_id, q['題幹'], json.dumps(q.get('選項') or {}), q.get('正解'),
+                               q.get('explanation'), q.get('topic'), q.get('difficulty', 1), q.get('question_type', '單選')))
+            else:
+                c.execute('''INSERT INTO questions (content, options, answer, explanation, topic, difficulty, question_type)
+                             VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                          (item['content'], json.dumps(item.get('options') or {}), item.get('answer'),
+                           item.get('explanation'), item.get('topic'), item.get('difficulty', 1), item.get('question_type', '單選')))
+    return len(json_data)
+
+def counts():
+    conn = db.get_connection(db.QUESTION_BANK)
+    return (conn.execute("SELECT COUNT(*) FROM question_groups").fetchone()[0],
+            conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0])
+
+def run(fn, reset):
+    """先計時（不開 tracemalloc，避免追蹤成本扭曲速度），再重建資料庫量測峰值記憶體"""
+    reset()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    rows = counts()
+    reset()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024, rows
+
+class Crash(Exception):
+    pass
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path, jsonl_path = write_files(tmp)
+        print(f"題庫檔：{N_QUESTIONS:,} 題，JSON {os.path.getsize(json_path) / 1024 / 1024:.1f} MB")
+
+        _, elapsed, peak, rows = run(lambda: legacy_import(json_path),
+                                     lambda: use_bank(os.path.join(tmp, f"legacy{time.time_ns()}.sqlite")))
+        print(f"改寫前 import_from_json：{elapsed:6.2f}s，{N_QUESTIONS / elapsed:>9,.0f} 題/秒，峰值 {peak:6.1f} MB，{rows}")
+
+        for label, path in (("JSON 陣列", json_path), ("JSONL", jsonl_path)):
+            stats, elapsed, peak, rows = run(lambda: bulk_importer.import_file(path),
+                                             lambda: use_bank(os.path.join(tmp, f"bulk{time.time_ns()}.sqlite")))
+            print(f"串流匯入（{label}）：{elapsed:10.2f}s，{stats['questions'] / elapsed:>9,.0f} 題/秒，峰值 {peak:6.1f} MB，{rows}")
+
+        # 中途失敗後續傳
+        use_bank(os.path.join(tmp, "resume.sqlite"))
+        seen = []
+
+        def crash_after_three(stats):
+            seen.append(stats["questions"])
+            if len(seen) == 3:
+                raise Crash()
+
+        try:
+            bulk_importer.import_file(json_path, progress=crash_after_three)
+        except Crash:
+            print(f"模擬中斷：已寫入 {counts()}")
+        stats = bulk_importer.import_file(json_path)
+        again = bulk_importer.import_file(json_path)
+        groups, questions = counts()
+        assert (groups, questions) == (N_QUESTIONS // 2 // SUBS_PER_GROUP, N_QUESTIONS), (groups, questions)
+        print(f"續傳完成：{bulk_importer.format_stats(stats)}；總計 {groups:,} 題組、{questions:,} 題（無重複）；"
+              f"再次匯入同一檔案 already_done={again['already_done']}")
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
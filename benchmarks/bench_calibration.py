@@ -0,0 +1,107 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_calibration.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_calibration
+#
+# 以已知的學生能力 θ 與題目難度 b（Rasch 模型）模擬 STUDENTS × ANSWERS_EACH 筆作答，量測：
+# 1. refit() 全量重估的時間，以及估計值與真值的相關係數
+# 2. 新增 NEW_ROWS 筆作答後 catch_up() 線上更新的速度，更新後估計值仍與真值一致
+# 3. 校準難度換算的 1/2/3 等級與真值等級的一致率，以及依難度抽題改用校準等級
+# 另比較題庫原本（LLM 猜測、隨機）的難度等級與真值等級的一致率。
+
+import math
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from data_store import bank_cache, calibration, db, question_sampler
+from data_store.answer_log_writer import INSERT_SQL
+from init_db import create_database
+
+STUDENTS = 2000
+ANSWERS_EACH = 500
+QUESTIONS = 3000
+NEW_ROWS = 50_000
+
+def build_bank(path, rng):
+    create_database(path)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO questions (id, content, options, answer, difficulty, question_type) VALUES (?, ?, '{}', 'A', ?, '單選')",
+                     ((i, f"題幹{i}", rng.randint(1, 3)) for i in range(1, QUESTIONS + 1)))
+    conn.commit()
+    conn.close()
+
+def answers(n, seed, theta, b):
+    rng = random.Random(seed)
+    for i in range(n):
+        user_id = rng.randint(1, STUDENTS)
+        qid = rng.randint(1, QUESTIONS)
+        ok = rng.random() < 1.0 / (1.0 + math.exp(b[qid - 1] - theta[user_id - 1]))
+        yield (f"2025-05-{1 + i % 28:02d}T08:00:00", user_id, str(qid), "A" if ok else "B", "A", int(ok), None, None)
+
+def estimates():
+    conn = db.get_connection(db.USER_LOG)
+    b = dict(conn.execute("SELECT question_id, difficulty FROM item_params"))
+    theta = dict(conn.execute("SELECT user_id, ability FROM student_ability"))
+    return (np.array([b.get(q, 0.0) for q in range(1, QUESTIONS + 1)]),
+            np.array([theta.get(u, 0.0) for u in range(1, STUDENTS + 1)]))
+
+def corr(x, y):
+    return float(np.corrcoef(x, y)[0, 1])
+
+def main():
+    rng = random.Random(1)
+    theta = [rng.gauss(0, 1) for _ in range(STUDENTS)]
+    b = [rng.gauss(0, 1.5) for _ in range(QUESTIONS)]
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATHS[db.QUESTION_BANK] = os.path.join(tmp, "bank.sqlite")
+        db.DB_PATHS[db.USER_LOG] = os.path.join(tmp, "user_log.sqlite")
+        build_bank(db.DB_PATHS[db.QUESTION_BANK], rng)
+        bank_cache.clear_cache()
+        with db.transaction(db.USER_LOG) as conn:
+            conn.executemany(INSERT_SQL, answers(STUDENTS * ANSWERS_EACH, 2, theta, b))
+
+        stats = calibration.refit()
+        b_hat, theta_hat = estimates()
+        refit_b, refit_theta = corr(b_hat, b), corr(theta_hat, theta)
+        assert refit_b > 0.98 and refit_theta > 0.9, (refit_b, refit_theta)
+
+        with db.transaction(db.USER_LOG) as conn:
+            conn.executemany(INSERT_SQL, answers(NEW_ROWS, 3, theta, b))
+        start = time.perf_counter()
+        processed = calibration.catch_up()
+        online_t = time.perf_counter() - start
+        assert processed == NEW_ROWS
+        b_online, theta_online = estimates()
+        online_b, online_theta = corr(b_online, b), corr(theta_online, theta)
+        assert online_b > 0.97 and online_theta > 0.85, (online_b, online_theta)
+        assert calibration.catch_up() == 0
+
+        true_levels = [calibration.difficulty_level(x) for x in b]
+        levels, _ = calibration.item_levels()
+        calibrated_agree = np.mean([levels.get(q) == true_levels[q - 1] for q in range(1, QUESTIONS + 1)])
+        bank_levels = dict(db.get_connection(db.QUESTION_BANK).execute("SELECT id, difficulty FROM questions"))
+        bank_agree = np.mean([bank_levels[q] == true_levels[q - 1] for q in range(1, QUESTIONS + 1)])
+        assert calibrated_agree > 0.8, calibrated_agree
+
+        start = time.perf_counter()
+        hard, _ = question_sampler.get_candidates(difficulty=3)
+        sampler_t = time.perf_counter() - start
+        assert all(levels.get(q, bank_levels[q]) == 3 for q in hard)
+        start = time.perf_counter()
+        question_sampler.get_candidates(difficulty=3)
+        cached_t = time.perf_counter() - start
+
+        print(f"{STUDENTS:,} 位學生 × {ANSWERS_EACH} 筆 = {stats['responses']:,} 筆作答，{QUESTIONS:,} 題")
+        print(f"refit 全量重估：      {stats['seconds']:6.2f} s（{stats['iterations']} 輪）；"
+              f"與真值相關 b {refit_b:.3f}、θ {refit_theta:.3f}")
+        print(f"catch_up {NEW_ROWS:,} 筆：   {online_t:6.2f} s（{NEW_ROWS / online_t:,.0f} 筆/s）；"
+              f"更新後相關 b {online_b:.3f}、θ {online_theta:.3f}")
+        print(f"難度等級與真值一致率：校準 {calibrated_agree:.0%}，題庫原值 {bank_agree:.0%}")
+        print(f"依難度抽題候選（困難 {len(hard):,} 題）：首次 {sampler_t * 1000:.1f} ms，快取 {cached_t * 1000:.3f} ms")
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_cohort_analytics.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_cohort_analytics
+#
+# STUDENTS 位學生（CLASSES 個班）各作答 ANSWERS_EACH 筆，量測教師後台的班級分析：
+# 1. 單一班級首次計算、全校首次計算（SQLite 分批聚合，峰值記憶體另跑一次以 tracemalloc 量測）
+# 2. 沒有新作答時再次開啟（只查一次最大 id）
+# 3. 新增 NEW_ROWS 筆作答後再次開啟（只累加新紀錄）
+# 並確認各題答對率、選項分布與直接由作答紀錄計算的結果一致。
+
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+from data_store import bank_cache, db, rollups
+from data_store.answer_log_writer import INSERT_SQL
+from init_db import create_database
+from models import cohort_analytics
+
+STUDENTS = 5000
+ANSWERS_EACH = 500
+CLASSES = 25
+QUESTIONS = 3000
+NEW_ROWS = 500
+TOPICS = ["文意理解", "修辭", "字音字形", "成語", "文化常識", "閱讀策略"]
+
+def build_bank(path):
+    create_database(path)
+    rng = random.Random(1)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO questions (id, content, options, answer, topic, difficulty, question_type) VALUES (?, ?, '{}', 'A', ?, ?, '單選')",
+                     ((i, f"題幹{i}", rng.choice(TOPICS), rng.randint(1, 5)) for i in range(1, QUESTIONS + 1)))
+    conn.commit()
+    conn.close()
+
+def answers(n, seed, start_minute):
+    rng = random.Random(seed)
+    for i in range(n):
+        qid = rng.randint(1, QUESTIONS)
+        choice = "A" if rng.random() < 0.4 + (qid % 50) / 100 else rng.choice("BCD")
+        minute = start_minute + i // 50
+        yield (f"2025-{3 + minute // 40000:02d}-{1 + minute // 1440 % 28:02d}T08:00:00", rng.randint(1, STUDENTS),
+               str(qid), choice, "A", int(choice == "A"), None, None)
+
+def class_of(user_id):
+    return f"{300 + user_id % CLASSES}"
+
+def direct_stats(class_name):
+    conn = db.get_connection(db.USER_LOG)
+    questions, choices = defaultdict(lambda: [0, 0]), defaultdict(Counter)
+    for qid, answer, ok in conn.execute("""
+            SELECT a.question_id, a.student_answer, a.is_correct FROM answer_log a
+            JOIN users u ON u.id = a.user_id WHERE u.class_name = ?""", (class_name,)):
+        questions[qid][0] += 1
+        questions[qid][1] += ok
+        choices[qid][answer] += 1
+    return questions, choices
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def peak_mb(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATHS[db.QUESTION_BANK] = os.path.join(tmp, "bank.sqlite")
+        db.DB_PATHS[db.USER_LOG] = os.path.join(tmp, "user_log.sqlite")
+        build_bank(db.DB_PATHS[db.QUESTION_BANK])
+        bank_cache.clear_cache()
+        with db.transaction(db.USER_LOG) as conn:
+            conn.executemany("INSERT INTO users (id, username, password_hash, role, class_name) VALUES (?, ?, '', 'student', ?)",
+                             ((u, f"s{u}", class_of(u)) for u in range(1, STUDENTS + 1)))
+            conn.executemany(INSERT_SQL, answers(STUDENTS * ANSWERS_EACH, 2, 0))
+        _, rollup_t = timed(rollups.catch_up)
+        print(f"{STUDENTS:,} 位學生 × {ANSWERS_EACH} 筆 = {STUDENTS * ANSWERS_EACH:,} 筆作答，{CLASSES} 個班"
+              f"（作答統計彙總表首次補算 {rollup_t:.1f}s，平時由寫入器逐批累計）")
+
+        stats, first_t = timed(lambda: cohort_analytics.get_cohort_stats("301"))
+        questions, choices = direct_stats("301")
+        assert {q: tuple(c) for q, c in questions.items()} == {q: tuple(c) for q, c in stats.questions.items()}
+        assert all(stats.distractors(q) == dict(c) for q, c in choices.items())
+        _, trend_t = timed(lambda: (cohort_analytics.accuracy_trend("301"), cohort_analytics.weakest_topics("301"),
+                                    cohort_analytics.student_accuracy("301"), stats.p_values()))
+        _, school_t = timed(lambda: cohort_analytics.get_cohort_stats(cohort_analytics.ALL_CLASSES))
+        _, cached_t = timed(lambda: cohort_analytics.get_cohort_stats("301"))
+
+        with db.transaction(db.USER_LOG) as conn:
+            conn.executemany(INSERT_SQL, answers(NEW_ROWS, 3, 10 ** 6))
+        _, inc_t = timed(lambda: (cohort_analytics.get_cohort_stats("301"),
+                                  cohort_analytics.get_cohort_stats(cohort_analytics.ALL_CLASSES)))
+        questions, _ = direct_stats("301")
+        assert {q: tuple(c) for q, c in questions.items()} == {q: tuple(c) for q, c in stats.questions.items()}
+
+        cohort_analytics.clear_cache()
+        class_mem = peak_mb(lambda: cohort_analytics.get_cohort_stats("301"))
+        school_mem = peak_mb(lambda: cohort_analytics.get_cohort_stats(cohort_analytics.ALL_CLASSES))
+
+        print(f"單一班級首次計算：     {first_t * 1000:8.1f} ms（峰值 {class_mem:.1f} MB）")
+        print(f"  趨勢/主題/學生/p 值： {trend_t * 1000:8.1f} ms")
+        print(f"全校首次計算：         {school_t * 1000:8.1f} ms（峰值 {school_mem:.1f} MB）")
+        print(f"無新作答再次開啟：     {cached_t * 1000:8.3f} ms")
+        print(f"新增 {NEW_ROWS} 筆後（班級+全校）：{inc_t * 1000:8.1f} ms")
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_context_packer.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_context_packer
+#
+# 以 data/ 的課文（虯髯客傳、師說）為題組閱讀文本，每段各出一題「文中『某句』的意思」，
+# 搭配 ROUNDS 輪對話與學生摘要，比較：
+# 1. 改寫前的 coach_agent.build_prompt：閱讀文本、選項、全部對話、摘要原樣放入（沒有教材）
+# 2. build_context：依 token 預算打包，附相關教材片段
+# 量測 prompt token 數、節省量、打包耗時（含教材檢索），並確認題目引用的句子
+# 一定留在打包後的閱讀文本中、同樣輸入的輸出完全相同、不超過預算。
+# 另確認教材檢索失敗時（索引建立或讀取出錯），prompt 仍照常打包、教材段落為空。
+
+import json
+import random
+import time
+
+from assistant_core.coach_agent import PROMPT_BUDGET, build_context
+from data_store.question_record import Question, QuestionGroup
+from rag_tools import knowledge_lookup, knowledge_store
+from rag_tools.context_packer import estimate_tokens
+
+TEXTS = ["data/虯髯客傳", "data/師說"]
+ROUNDS = 6
+
+def legacy_build_prompt(question_info, chat_history, user_input, style, student_ans, correct_ans, summary):
+    """改寫前的 coach_agent.build_prompt"""
+    ctx = []
+    if question_info.get("閱讀素材"):
+        ctx.append(f"【閱讀素材/題組說明】\n{question_info['閱讀素材']}")
+    if question_info.get("題幹"):
+        ctx.append(f"【題目】\n{question_info['題幹']}")
+    opts = question_info.get("選項", {})
+    if opts:
+        ctx.append("【選項】\n" + "\n".join([f"({k}) {v}" for k, v in opts.items()]))
+    ctx.append(f"【正確答案】{question_info.get('正解') or correct_ans or ''}")
+    if student_ans:
+        ctx.append(f"【學生上次作答】{student_ans}")
+    dialogue = "".join([f"{speaker}：{msg}\n" for speaker, msg in chat_history])
+    dialogue += f"學生（本輪輸入）：{user_input}\n"
+    prompt = "\n".join(ctx)
+    prompt += f"\n\n【歷程對話】\n{dialogue}"
+    prompt += f"\n【學生近期摘要】\n{summary}\n【教練風格】{style}"
+    return prompt
+
+def make_cases(rng):
+    cases = []
+    for path in TEXTS:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        title, paragraphs = lines[0], lines[1:]
+        group = QuestionGroup(len(cases) + 1, title, "\n".join(paragraphs), "文言")
+        for i, para in enumerate(paragraphs):
+            clauses = [c for c in para.replace("。", "，").replace("；", "，").split("，") if len(c) >= 4]
+            quote = rng.choice(clauses)
+            options = {k: "".join(rng.sample(para, 6)) for k in "ABCD"}
+            question = Question(len(cases) + 1, f"文中「{quote}」的意思為何？", options, "B",
+                                topic="文意理解", keywords=quote[:2], group=group)
+            cases.append((question, i, para))
+    return cases
+
+def make_history(rng, para):
+    turns = []
+    for r in range(ROUNDS):
+        turns.append(("你", f"第{r + 1}輪：我還是不太懂，" + "".join(rng.sample(para, min(40, len(para))))))
+        turns.append(("AI 教練", "【回覆】" + "".join(rng.choices(para, k=120)) + "【反問】你覺得呢？"))
+    return turns
+
+def search_failure(args):
+    """教材檢索丟出例外時的打包結果"""
+    def broken(query, k=3):
+        raise OSError("index unavailable")
+    original, knowledge_lookup.search = knowledge_lookup.search, broken
+    try:
+        return build_context(*args)
+    finally:
+        knowledge_lookup.search = original
+
+def main():
+    knowledge_store.get_index()   # 同 main.py 啟動時在背景建立索引；查詢時不在請求中建立
+    rng = random.Random(1)
+    cases = make_cases(rng)
+    summary = json.dumps({"topics": {f"主題{i}": {"answered": 20 + i, "accuracy": 0.5} for i in range(12)},
+                          "weak_keywords": [f"關鍵詞{i}" for i in range(30)]}, ensure_ascii=False, indent=2)
+    legacy_tokens, packed_tokens, knowledge_tokens, pack_times, evidence = [], [], [], [], 0
+    for question, index, para in cases:
+        history = make_history(rng, para)
+        args = (question, history, "為什麼答案是 B？", "引導式（預設）", "C", "B", summary)
+        legacy_tokens.append(estimate_tokens(legacy_build_prompt(*args)))
+        start = time.perf_counter()
+        context = build_context(*args)
+        pack_times.append(time.perf_counter() - start)
+        assert context.text == build_context(*args).text
+        assert context.tokens <= PROMPT_BUDGET, context
+        packed_tokens.append(context.tokens)
+        knowledge_tokens.append(dict((t, used) for t, used, _ in context.sections)["【相關教材】"])
+        reading = context.text.split("【題目】")[0]
+        quote = question.content.split("「")[1].split("」")[0]
+        evidence += quote in reading
+
+    n = len(cases)
+    assert evidence == n, evidence
+    fallback = search_failure(args)
+    assert dict((t, used) for t, used, _ in fallback.sections)["【相關教材】"] == 0
+    assert "【題目】" in fallback.text and fallback.tokens <= PROMPT_BUDGET
+    mean = lambda xs: sum(xs) / len(xs)
+    print(f"{n} 題（{', '.join(TEXTS)}），每題 {ROUNDS} 輪對話，預算 {PROMPT_BUDGET} tokens")
+    print(f"改寫前 build_prompt：平均 {mean(legacy_tokens):7.0f} tokens（最多 {max(legacy_tokens)}），教材 0 tokens")
+    print(f"build_context：      平均 {mean(packed_tokens):7.0f} tokens（最多 {max(packed_tokens)}），"
+          f"其中教材平均 {mean(knowledge_tokens):.0f} tokens")
+    print(f"每次節省：           平均 {mean(legacy_tokens) - mean(packed_tokens):7.0f} tokens"
+          f"（{1 - sum(packed_tokens) / sum(legacy_tokens):.0%}）")
+    print(f"打包耗時（含教材檢索）：平均 {mean(pack_times) * 1000:.1f} ms，最多 {max(pack_times) * 1000:.1f} ms")
+    print(f"題目引用的句子保留在閱讀文本中：{evidence}/{n}")
+    print(f"教材檢索失敗時：prompt 照常打包（{fallback.tokens} tokens，教材 0 tokens）")
+
+if __name__ == "__main__":
+    main()
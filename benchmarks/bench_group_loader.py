@@ -0,0 +1,79 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_group_loader.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_group_loader
+
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+from init_db import create_database
+from data_store.bank_loader import load_groups, QUESTION_COLUMNS
+
+SUBS_PER_GROUP = 4
+
+def build_bank(db_path, n_questions):
+    """建立測試題庫：n_questions 題，全部為每組 4 小題的題組"""
+    create_database(db_path)
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    n_groups = n_questions // SUBS_PER_GROUP
+    c.executemany(
+        "INSERT INTO question_groups (id, title, reading_text, category) VALUES (?, ?, ?, ?)",
+        ((gid, f"題組{gid}", "閱讀文本" * 20, "閱讀理解") for gid in range(1, n_groups + 1))
+    )
+    options = json.dumps({"A": "甲", "B": "乙", "C": "丙", "D": "丁"}, ensure_ascii=False)
+    # 子題交錯寫入，模擬題組陸續增補的真實題庫
+    c.executemany(
+        "INSERT INTO questions (group_id, content, options, answer, topic, difficulty, question_type) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((i % n_groups + 1, f"題幹{i}", options, "A", "閱讀理解", 2, "單選") for i in range(n_groups * SUBS_PER_GROUP))
+    )
+    conn.commit()
+    conn.close()
+
+def _build_row(row):
+    return {"sub_id": row[0], "題幹": row[1], "選項": json.loads(row[2]) if row[2] else {}, "正解": row[3]}
+
+def load_groups_n_plus_one(conn):
+    """改寫前的做法：每個題組各查一次子題"""
+    c = conn.cursor()
+    c.execute("SELECT id, title, reading_text, category FROM question_groups")
+    result = []
+    for gid, title, reading_text, category in c.fetchall():
+        c.execute(f"SELECT {QUESTION_COLUMNS} FROM questions WHERE group_id = ?", (gid,))
+        result.append({
+            "group_id": gid,
+            "title": title,
+            "reading_text": reading_text,
+            "category": category,
+            "questions": [_build_row(q) for q in c.fetchall()]
+        })
+    return result
+
+def timed(fn, conn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(conn)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    print(f"{'題數':>8} {'題組數':>8} {'N+1 (s)':>10} {'集合查詢 (s)':>14} {'倍數':>6}")
+    for n in (10_000, 100_000):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bank.sqlite")
+            build_bank(db_path, n)
+            conn = sqlite3.connect(db_path)
+            # 兩種做法結果必須一致（題組順序與各組小題）
+            assert [(g["group_id"], [q["sub_id"] for q in g["questions"]]) for g in load_groups_n_plus_one(conn)] == \
+                   [(g.group_id, [q.id for q in g.questions]) for g in load_groups(conn)]
+            # N+1 在 10 萬題時極慢，只量一次
+            old = timed(load_groups_n_plus_one, conn, repeat=1 if n >= 100_000 else 3)
+            new = timed(load_groups, conn)
+            conn.close()
+        print(f"{n:>8} {n // SUBS_PER_GROUP:>8} {old:>10.3f} {new:>14.3f} {old / new:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
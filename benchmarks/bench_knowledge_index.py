@@ -0,0 +1,122 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_knowledge_index.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_knowledge_index
+#
+# ENTRIES 筆教材條目（詞語/修辭/課文/教材重點，文字由常用詞依 Zipf 分布組成），比較：
+# 1. 改寫前：每次查詢重讀 JSON，逐筆 json.dumps 後做子字串比對，回傳檔案順序前 3 筆
+# 2. BM25 倒排索引（rag_tools/knowledge_index.py）：建一次索引，查詢回傳分數最高的 3 筆
+# 查詢分兩類：直接查詞語（精確字串），以及取自釋義的幾個詞（學生以自己的話描述）；
+# 以目標條目是否出現在前 3 筆（hit@3）與 MRR 衡量品質。
+
+import json
+import os
+import random
+import tempfile
+import time
+from itertools import accumulate
+
+from rag_tools.knowledge_index import KnowledgeIndex
+
+ENTRIES = 100_000
+VOCAB = 20_000
+QUERIES = 200
+LEGACY_QUERIES = 10
+CHARS = [chr(c) for c in range(0x4E00, 0x4E00 + 3000)]
+TYPES = ["詞語", "修辭", "課文", "教材重點"]
+
+def legacy_lookup(query, data):
+    """改寫前的 lookup_knowledge：逐筆 json.dumps 後子字串比對"""
+    results = []
+    for item in data:
+        if query in json.dumps(item, ensure_ascii=False):
+            results.append(item)
+    return results[:3]
+
+def build_corpus(rng):
+    words = list({"".join(rng.choices(CHARS, k=rng.choice((2, 2, 3)))) for _ in range(VOCAB)})
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(words))))
+
+    def sentence(n):
+        return "".join(rng.choices(words, cum_weights=cum_weights, k=n)) + "。"
+    entries = []
+    for i in range(ENTRIES):
+        kind = rng.choice(TYPES)
+        item = {"id": f"k-{i}", "type": kind}
+        if kind == "課文":
+            item["title"] = "".join(rng.sample(words[1000:], 2))
+            item["content"] = sentence(30) + sentence(30)
+        elif kind == "教材重點":
+            item["title"] = "".join(rng.sample(words[1000:], 2))
+            item["points"] = [sentence(10) for _ in range(3)]
+        else:
+            item["term"] = "".join(rng.sample(words[1000:], 2))
+            item["definition"] = sentence(15)
+            item["example"] = sentence(10)
+        entries.append(item)
+    return entries
+
+def make_queries(rng, entries):
+    """[(查詢字串, 目標條目 index, 類別)]"""
+    queries = []
+    for target in rng.sample(range(len(entries)), QUERIES):
+        item = entries[target]
+        name = item.get("term") or item.get("title")
+        queries.append((name, target, "查詞語"))
+        body = item.get("definition") or item.get("content") or "".join(item.get("points", []))
+        start = rng.randrange(0, max(1, len(body) - 20))
+        # 從釋義中取三小段、以逗號分隔（不是原文中連續的字串）
+        pieces = [body[start + j * 6:start + j * 6 + 3] for j in range(3)]
+        queries.append(("，".join(pieces), target, "以釋義描述"))
+    return queries
+
+def quality(results_by_query, queries, entries):
+    stats = {}
+    for (query, target, kind), results in zip(queries, results_by_query):
+        ids = [item["id"] for item in results]
+        hit = entries[target]["id"] in ids
+        rr = 1 / (ids.index(entries[target]["id"]) + 1) if hit else 0
+        s = stats.setdefault(kind, [0, 0.0, 0])
+        s[0] += hit
+        s[1] += rr
+        s[2] += 1
+    return {kind: (h / n, rr / n) for kind, (h, rr, n) in stats.items()}
+
+def main():
+    rng = random.Random(1)
+    entries = build_corpus(rng)
+    queries = make_queries(rng, entries)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "knowledge.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+
+        start = time.perf_counter()
+        index = KnowledgeIndex(entries)
+        build_t = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new_results = [[item for _, item in index.search(q, 3)] for q, _, _ in queries]
+        new_t = (time.perf_counter() - start) / len(queries)
+
+        # 改寫前：全部查詢都算品質（資料已載入），延遲另以含重讀檔案的 LEGACY_QUERIES 次量測
+        old_results = [legacy_lookup(q, entries) for q, _, _ in queries]
+        start = time.perf_counter()
+        for q, _, _ in queries[:LEGACY_QUERIES]:
+            with open(path, "r", encoding="utf-8") as f:
+                legacy_lookup(q, json.load(f))
+        old_t = (time.perf_counter() - start) / LEGACY_QUERIES
+
+    new_q = quality(new_results, queries, entries)
+    old_q = quality(old_results, queries, entries)
+    for kind in new_q:
+        assert new_q[kind][0] >= old_q[kind][0], (kind, new_q, old_q)
+    assert new_q["以釋義描述"][0] > 0.9 and new_q["查詞語"][0] > 0.95, new_q
+
+    print(f"教材條目 {ENTRIES:,} 筆，查詢 {len(queries)} 次")
+    print(f"建立 BM25 索引（一次）：{build_t:8.2f} s")
+    print(f"改寫前（重讀 JSON + 線性掃描）：{old_t * 1000:8.0f} ms/次")
+    print(f"BM25 索引查詢：                 {new_t * 1000:8.2f} ms/次（{old_t / new_t:,.0f}x）")
+    for kind in new_q:
+        print(f"  {kind}：hit@3 {old_q[kind][0]:.0%} → {new_q[kind][0]:.0%}，MRR {old_q[kind][1]:.2f} → {new_q[kind][1]:.2f}")
+
+if __name__ == "__main__":
+    main()
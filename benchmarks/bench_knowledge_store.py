@@ -0,0 +1,92 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_knowledge_store.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_knowledge_store
+#
+# FILES 個教材 JSON 檔共 ENTRIES 筆條目（沿用 bench_knowledge_index 的合成語料），量測：
+# 1. 改寫前：每次行程啟動都在記憶體中重建 BM25 索引
+# 2. 首次建立磁碟索引，與之後以記憶體映射開啟（啟動成本）
+# 3. 修改一個來源檔後的增量重建、只更動修改時間（內容不變）、完全沒有變動
+# 並確認映射開啟的索引與記憶體內索引的 BM25 查詢結果一致，verify() 無問題；
+# 映射索引的查詢延遲為 BM25 與向量融合（knowledge_vectors）的結果。
+
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_knowledge_index import build_corpus, make_queries
+from rag_tools import knowledge_store as store
+from rag_tools.knowledge_index import KnowledgeIndex
+
+FILES = 200
+QUERIES = 200
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def write_sources(src, entries):
+    per_file = len(entries) // FILES
+    for f in range(FILES):
+        with open(os.path.join(src, f"kb-{f:03d}.json"), "w", encoding="utf-8") as fh:
+            json.dump(entries[f * per_file:(f + 1) * per_file], fh, ensure_ascii=False)
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def main():
+    rng = random.Random(1)
+    entries = build_corpus(rng)
+    queries = [q for q, _, _ in make_queries(rng, entries)][:QUERIES]
+    with tempfile.TemporaryDirectory() as tmp:
+        src, index_dir = os.path.join(tmp, "knowledge_base"), os.path.join(tmp, "index")
+        os.makedirs(src)
+        write_sources(src, entries)
+
+        memory, memory_t = timed(lambda: KnowledgeIndex(
+            [item for path in store.list_sources((src,)) for item in store.load_source(path)]))
+        result, build_t = timed(lambda: store.build((src,), index_dir))
+        assert result["tokenized"] == FILES and result["docs"] == len(entries)
+
+        def open_and_query():
+            index = store.open_index(index_dir)
+            index.search(queries[0], 3)
+            return index
+        mapped, open_t = timed(open_and_query)
+        for q in queries:
+            got = [(round(s, 4), e["id"]) for s, e in mapped.lexical.search(q, 3)]
+            assert got == [(round(s, 4), e["id"]) for s, e in memory.search(q, 3)], q
+        _, query_t = timed(lambda: [mapped.search(q, 3) for q in queries])
+
+        # 修改一個來源檔：第一筆條目改名
+        path = os.path.join(src, "kb-007.json")
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        data[0]["term"] = data[0]["title"] = "借代轉化"
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False)
+        result, inc_t = timed(lambda: store.build((src,), index_dir))
+        assert result["tokenized"] == 1 and result["generation"] == 2
+        assert store.open_index(index_dir).search("借代轉化", 1)[0][1]["id"] == data[0]["id"]
+
+        os.utime(os.path.join(src, "kb-100.json"))
+        result, touch_t = timed(lambda: store.build((src,), index_dir))
+        assert result["tokenized"] == 0 and result["generation"] == 2
+        _, noop_t = timed(lambda: store.build((src,), index_dir))
+        problems, verify_t = timed(lambda: store.verify((src,), index_dir))
+        assert not problems, problems
+        size = dir_size(index_dir)
+        seg_size = dir_size(os.path.join(index_dir, "segments"))
+
+    print(f"教材條目 {len(entries):,} 筆，{FILES} 個來源檔")
+    print(f"改寫前：每次啟動在記憶體中重建索引 {memory_t:8.2f} s")
+    print(f"首次建立磁碟索引：                 {build_t:8.2f} s（索引 {(size - seg_size) / 2**20:.0f} MB + 分段 {seg_size / 2**20:.0f} MB）")
+    print(f"記憶體映射開啟 + 第一次查詢：      {open_t * 1000:8.1f} ms（{memory_t / open_t:,.0f}x）")
+    print(f"映射索引查詢（BM25 + 向量融合）：  {query_t / len(queries) * 1000:8.2f} ms/次")
+    print(f"修改 1 個來源檔後增量重建：        {inc_t:8.2f} s")
+    print(f"只更動修改時間 / 沒有變動：        {touch_t * 1000:8.1f} ms / {noop_t * 1000:.1f} ms")
+    print(f"verify：                           {verify_t:8.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_knowledge_tracing.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_knowledge_tracing
+#
+# STUDENTS 位學生各作答 ANSWERS_EACH 筆（每人有一個答對率特別低的弱點主題），量測：
+# 1. replay() 重播全部歷史紀錄（冷啟動）
+# 2. 新增 NEW_ROWS 筆後 catch_up() 逐筆線上更新的速度
+# 3. 讀取單一學生掌握度，對照由該生原始作答紀錄 JOIN 題庫重新統計主題答對率
+# 並確認「重播」與「重播 + 線上更新」得到相同的掌握度、掌握度最低的主題即為弱點主題。
+
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from collections import defaultdict
+
+from data_store import answer_history, bank_cache, db, knowledge_tracing as kt
+from data_store.answer_log_writer import INSERT_SQL
+from init_db import create_database
+
+STUDENTS = 2000
+ANSWERS_EACH = 500
+QUESTIONS = 3000
+NEW_ROWS = 20_000
+TOPICS = ["文意理解", "修辭", "字音字形", "成語", "文化常識", "閱讀策略", "語詞詞義", "篇章結構"]
+KEYWORDS = ["比喻", "借代", "轉化", "映襯", "設問", "誇飾", "排比", "層遞", "對偶", "頂真"]
+
+def build_bank(path):
+    create_database(path)
+    rng = random.Random(1)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO questions (id, content, options, answer, topic, keywords) VALUES (?, ?, '{}', 'A', ?, ?)",
+                     ((i, f"題幹{i}", TOPICS[i % len(TOPICS)], ",".join(rng.sample(KEYWORDS, 2)))
+                      for i in range(1, QUESTIONS + 1)))
+    conn.commit()
+    conn.close()
+
+def weak_topic(user_id):
+    return TOPICS[user_id % len(TOPICS)]
+
+def answers(n, seed):
+    rng = random.Random(seed)
+    for i in range(n):
+        user_id = rng.randint(1, STUDENTS)
+        qid = rng.randint(1, QUESTIONS)
+        ok = rng.random() < (0.3 if TOPICS[qid % len(TOPICS)] == weak_topic(user_id) else 0.85)
+        yield (f"2025-05-{1 + i % 28:02d}T08:00:00", user_id, str(qid), "A" if ok else "B", "A", int(ok), None, None)
+
+def snapshot():
+    return {row[:3]: row[3:] for row in db.get_connection(db.USER_LOG).execute(
+        "SELECT user_id, dimension, skill, p_mastery, attempts, correct, last_log_id FROM mastery")}
+
+def legacy_topic_accuracy(user_id):
+    """改寫前：讀該生全部作答紀錄（JOIN 題庫）再依主題統計答對率"""
+    counts = defaultdict(lambda: [0, 0])
+    for row in answer_history.get_user_history(user_id):
+        record = dict(zip(answer_history.HISTORY_COLUMNS, row))
+        counts[record["topic"]][0] += 1
+        counts[record["topic"]][1] += record["is_correct"] or 0
+    return sorted(counts, key=lambda t: counts[t][1] / counts[t][0])
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATHS[db.QUESTION_BANK] = os.path.join(tmp, "bank.sqlite")
+        db.DB_PATHS[db.USER_LOG] = os.path.join(tmp, "user_log.sqlite")
+        build_bank(db.DB_PATHS[db.QUESTION_BANK])
+        bank_cache.clear_cache()
+        with db.transaction(db.USER_LOG) as conn:
+            conn.executemany(INSERT_SQL, answers(STUDENTS * ANSWERS_EACH, 2))
+
+        stats = kt.replay()
+        with db.transaction(db.USER_LOG) as conn:
+            conn.executemany(INSERT_SQL, answers(NEW_ROWS, 3))
+        processed, online_t = timed(kt.catch_up)
+        assert processed == NEW_ROWS
+        incremental = snapshot()
+        replayed = kt.replay()
+        full = snapshot()
+        assert incremental.keys() == full.keys()
+        assert all(abs(incremental[k][0] - full[k][0]) < 1e-9 and incremental[k][1:] == full[k][1:] for k in full)
+
+        hits = sum(kt.get_mastery(u, "topic")[0][0] == weak_topic(u) for u in range(1, STUDENTS + 1))
+        assert hits / STUDENTS > 0.95, hits
+
+        mastery, read_t = timed(lambda: kt.get_mastery(7, "topic"))
+        legacy, legacy_t = timed(lambda: legacy_topic_accuracy(7))
+        assert mastery[0][0] == legacy[0] == weak_topic(7)
+
+        print(f"{STUDENTS:,} 位學生 × {ANSWERS_EACH} 筆 = {stats['responses']:,} 筆作答，"
+              f"{stats['updates']:,} 次技能更新、{stats['skills']:,} 個（學生, 技能）")
+        print(f"replay 重播：                {stats['seconds']:6.2f} s（{stats['steps']} 步）；"
+              f"含新增後再重播 {replayed['seconds']:.2f} s")
+        print(f"catch_up {NEW_ROWS:,} 筆：          {online_t:6.2f} s（{NEW_ROWS / online_t:,.0f} 筆/s），與重播結果一致")
+        print(f"讀取單一學生主題掌握度：     {read_t * 1000:6.3f} ms")
+        print(f"改寫前由原始紀錄統計主題：   {legacy_t * 1000:6.1f} ms")
+        print(f"掌握度最低主題 = 弱點主題：  {hits / STUDENTS:.1%}")
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_knowledge_vectors.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_knowledge_vectors
+#
+# 1. 品質：沿用 bench_knowledge_index 的 ENTRIES 筆合成教材，比較 BM25、雜湊 n-gram 向量、
+#    兩者融合（RRF）的 hit@3 / MRR。查詢除「查詞語」「以釋義描述」外，另加「改寫」：
+#    取釋義中的幾個詞、打亂順序，並把約四分之一的字換成其他字（同義改寫時用字不同）
+# 2. 規模：PASSAGES 筆段落的向量寫入記憶體映射的 float32 矩陣，量測建立速度、
+#    單一查詢與批次查詢的 top-k 延遲，以及行程的記憶體峰值（對照矩陣大小）
+
+import os
+import random
+import resource
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_knowledge_index import CHARS, build_corpus, make_queries, quality
+from rag_tools.knowledge_index import KnowledgeIndex, entry_text
+from rag_tools.knowledge_vectors import DIM, EMBED_BATCH, HybridIndex, VectorIndex, embed
+
+PASSAGES = 1_000_000
+PASSAGE_CHARS = 60
+SCALE_QUERIES = 20
+BATCH_QUERIES = 64
+
+def paraphrase_queries(rng, entries, targets):
+    queries = []
+    for target in targets:
+        item = entries[target]
+        body = item.get("definition") or item.get("content") or "".join(item.get("points", []))
+        start = rng.randrange(0, max(1, len(body) - 24))
+        pieces = [body[start + j * 6:start + j * 6 + 4] for j in range(4)]
+        rng.shuffle(pieces)
+        chars = [c if rng.random() > 0.25 else rng.choice(CHARS) for c in "".join(pieces)]
+        queries.append(("".join(chars), target, "改寫"))
+    return queries
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def quality_run(rng):
+    entries = build_corpus(rng)
+    queries = make_queries(rng, entries)
+    queries += paraphrase_queries(rng, entries, [target for _, target, _ in queries[::2]])
+    lexical = KnowledgeIndex(entries)
+    vectors, embed_t = timed(lambda: embed([entry_text(item) for item in entries]))
+    hybrid = HybridIndex(lexical, vectors)
+    dense = VectorIndex(vectors)
+    texts = [q for q, _, _ in queries]
+    runs = {
+        "BM25": [[item for _, item in lexical.search(q, 3)] for q in texts],
+        "向量": [[entries[i] for _, i in hits] for hits in dense.search_batch(texts, 3)],
+    }
+    runs["融合"], fused_t = timed(lambda: [[item for _, item in hybrid.search(q, 3)] for q in texts])
+    return len(entries), embed_t, fused_t / len(texts), {name: quality(r, queries, entries) for name, r in runs.items()}
+
+def scale_run(rng):
+    words = np.array([c for c in CHARS])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vectors.npy")
+        matrix = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(PASSAGES, DIM))
+        nprng = np.random.default_rng(1)
+        start = time.perf_counter()
+        for lo in range(0, PASSAGES, EMBED_BATCH):
+            n = min(EMBED_BATCH, PASSAGES - lo)
+            chars = words[nprng.zipf(1.3, size=(n, PASSAGE_CHARS)) % len(words)]
+            matrix[lo:lo + n] = embed(["".join(row) for row in chars])
+        matrix.flush()
+        del matrix
+        build_t = time.perf_counter() - start
+        rss_after_build = peak_rss_mb()
+
+        index = VectorIndex(np.load(path, mmap_mode="r"))
+        queries = ["".join(rng.choices(CHARS, k=12)) for _ in range(BATCH_QUERIES)]
+        index.search(queries[0], 10)   # 暖機：第一次掃描時頁面載入
+        _, single_t = timed(lambda: [index.search(q, 10) for q in queries[:SCALE_QUERIES]])
+        _, batch_t = timed(lambda: index.search_batch(queries, 10))
+        size_mb = os.path.getsize(path) / 2**20
+    return build_t, single_t / SCALE_QUERIES, batch_t / BATCH_QUERIES, size_mb, rss_after_build, peak_rss_mb()
+
+def main():
+    rng = random.Random(1)
+    n, embed_t, fused_t, results = quality_run(rng)
+    for kind in results["BM25"]:
+        assert results["融合"][kind][0] >= results["BM25"][kind][0] - 0.02, (kind, results)
+
+    rss_before = peak_rss_mb()
+    build_t, single_t, batch_t, size_mb, rss_build, rss_query = scale_run(rng)
+
+    print(f"教材條目 {n:,} 筆：計算向量 {embed_t:.2f} s（{n / embed_t:,.0f} 筆/s），融合查詢 {fused_t * 1000:.2f} ms/次")
+    print("hit@3 / MRR      " + "".join(f"{name:>16}" for name in results))
+    for kind in results["BM25"]:
+        print(f"  {kind:<8}" + "".join(f"{results[name][kind][0]:>10.0%} / {results[name][kind][1]:.2f}" for name in results))
+    print(f"{PASSAGES:,} 筆段落（DIM {DIM}）：向量矩陣 {size_mb:,.0f} MB，建立 {build_t:.1f} s")
+    print(f"  單一查詢 top-10：{single_t * 1000:8.1f} ms/次；批次 {BATCH_QUERIES} 個查詢：{batch_t * 1000:.1f} ms/次")
+    print(f"  行程記憶體峰值：建立前 {rss_before:,.0f} MB、建立後 {rss_build:,.0f} MB、查詢後 {rss_query:,.0f} MB")
+
+if __name__ == "__main__":
+    main()
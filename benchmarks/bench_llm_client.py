@@ -0,0 +1,175 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_llm_client.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_llm_client
+#
+# 1. 啟動時間：在新的 Python 行程中匯入所有使用 LLM 的模組（main.py 啟動時都會匯入），比較
+#    - 改寫前：每個模組匯入時各自 load_dotenv()、建立 AsyncOpenAI／OpenAIChatCompletionsModel／Agent
+#      （以同樣的初始化程式模擬，在匯入現行模組之後執行）
+#    - 現行：只匯入模組，不碰 agents SDK、不需要 API key
+#    - 現行＋第一次使用：另外建立所有 agent（這部分成本移到第一次使用 AI 功能時才付出）
+# 2. 連線：以本機假的 OpenAI 相容端點，量測同一事件迴圈內多次請求用了幾條 TCP 連線，
+#    並確認 Runner.run_sync 與 llm_client.run（取代 asyncio.run）交替使用不會出錯、
+#    新迴圈結束時它的 client 已關閉，不留在快取中
+#    （改寫前模組層級的 client 在第二次 asyncio.run 時會因連線屬於已關閉的事件迴圈而失敗）
+#
+# 缺少非 LLM 相依套件（如 streamlit、pandas）而無法匯入的模組會略過並列出。
+
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from assistant_core import llm_client
+from assistant_core.llm_client import MODEL_NAME
+
+MODULES = [
+    "assistant_core.ai_diagnosis_agent",
+    "assistant_core.coach.coach_agents",
+    "assistant_core.coach_agent",
+    "assistant_core.explain_question",
+    "assistant_core.feedback.multi_feedback_agents",
+    "assistant_core.learning_summary_agent",
+    "assistant_core.llm_generate_questions",
+    "assistant_core.populate_difficulty",
+    "assistant_core.populate_explanations",
+    "assistant_core.populate_keywords",
+    "assistant_core.populate_paragraphs",
+    "assistant_core.strategies.handoff_workflow",
+    "interface.topic_classify_view",
+]
+REPEAT = 5
+REQUESTS = 8
+
+STARTUP_SCRIPT = """
+import importlib, time
+start = time.perf_counter()
+modules = [importlib.import_module(name) for name in {modules!r}]
+getters = [value for module in modules for value in vars(module).values()
+           if getattr(value, "__qualname__", "") == "lazy_agent.<locals>.get"]
+mode = {mode!r}
+if mode == "first_use":
+    for get in getters:
+        get()
+elif mode == "legacy":
+    import os
+    from dotenv import load_dotenv
+    from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel
+    for _ in modules:
+        load_dotenv()
+        client = AsyncOpenAI(base_url=os.getenv("GOOGLE_GEMINI_ENDPOINT"), api_key=os.getenv("GOOGLE_GEMINI_API_KEY"))
+        model = OpenAIChatCompletionsModel(model={model_name!r}, openai_client=client)
+    for i, _ in enumerate(getters):
+        Agent(name=f"Agent{{i}}", instructions="", model=model)
+print(time.perf_counter() - start, len(getters), "agents" in __import__("sys").modules)
+"""
+
+def importable_modules():
+    ok, skipped = [], []
+    for name in MODULES:
+        result = subprocess.run([sys.executable, "-c", f"import {name}"], capture_output=True)
+        (ok if result.returncode == 0 else skipped).append(name)
+    return ok, skipped
+
+def startup(modules, mode):
+    env = dict(os.environ)
+    env.pop("GOOGLE_GEMINI_API_KEY", None)
+    env.pop("GOOGLE_GEMINI_ENDPOINT", None)
+    if mode != "lazy":
+        env.update(GOOGLE_GEMINI_API_KEY="benchmark", GOOGLE_GEMINI_ENDPOINT="http://127.0.0.1:9/")
+    times = []
+    for _ in range(REPEAT):
+        out = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT.format(modules=modules, mode=mode, model_name=MODEL_NAME)],
+                             capture_output=True, text=True, env=env, check=True).stdout.splitlines()[-1].split()
+        times.append(float(out[0]))
+    return statistics.median(times), int(out[1]), out[2] == "True"
+
+# === 本機假端點 ===
+class FakeEndpoint(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+    requests = 0
+
+    def do_POST(self):
+        FakeEndpoint.connections.add(self.client_address)
+        FakeEndpoint.requests += 1
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        body = json.dumps({
+            "id": "bench", "object": "chat.completion", "created": 0, "model": "bench",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "好"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def connection_reuse():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeEndpoint)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["GOOGLE_GEMINI_ENDPOINT"] = f"http://127.0.0.1:{server.server_port}/"
+    os.environ["GOOGLE_GEMINI_API_KEY"] = "benchmark"
+    os.environ.setdefault("OPENAI_AGENTS_DISABLE_TRACING", "1")
+    from agents import Runner
+    from assistant_core.coach_agent import get_coach_agent
+    from assistant_core.ai_diagnosis_agent import get_ai_diagnosis_agent
+
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    for _ in range(REQUESTS):
+        Runner.run_sync(get_coach_agent(), input="為什麼？")
+    run_sync_conns = len(FakeEndpoint.connections)
+    errors = 0
+    for _ in range(3):
+        for agent in (get_ai_diagnosis_agent(), get_coach_agent()):
+            try:
+                llm_client.run(Runner.run(agent, input="診斷"))
+            except Exception:
+                errors += 1
+    open_clients = len(llm_client._clients)
+    try:
+        Runner.run_sync(get_coach_agent(), input="再問一次")
+    except Exception:
+        errors += 1
+    requests, conns = FakeEndpoint.requests, len(FakeEndpoint.connections)
+
+    # 改寫前：模組層級建立一次 client，之後每次 asyncio.run 都沿用
+    from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel
+    client = AsyncOpenAI(base_url=os.environ["GOOGLE_GEMINI_ENDPOINT"], api_key="benchmark")
+    legacy_agent = Agent(name="Legacy", instructions="",
+                         model=OpenAIChatCompletionsModel(model=MODEL_NAME, openai_client=client))
+    legacy_errors = 0
+    for _ in range(3):
+        try:
+            asyncio.run(Runner.run(legacy_agent, input="診斷"))
+        except Exception:
+            legacy_errors += 1
+    server.shutdown()
+    return run_sync_conns, requests, conns, errors, legacy_errors, open_clients
+
+def main():
+    modules, skipped = importable_modules()
+    print(f"匯入 {len(modules)} 個使用 LLM 的模組（新行程，取 {REPEAT} 次中位數）")
+    if skipped:
+        print(f"略過（缺少相依套件）：{', '.join(skipped)}")
+    legacy, n_agents, _ = startup(modules, "legacy")
+    lazy, _, sdk_loaded = startup(modules, "lazy")
+    first_use, _, _ = startup(modules, "first_use")
+    print(f"改寫前（匯入時各自建立 client 與 {n_agents} 個 agent）：{legacy * 1000:7.0f} ms")
+    print(f"現行（只匯入，agents SDK {'已' if sdk_loaded else '未'}載入）：   {lazy * 1000:7.0f} ms"
+          f"  → 啟動快 {(legacy - lazy) * 1000:.0f} ms（{legacy / lazy:.1f}x）")
+    print(f"現行＋第一次使用（建立全部 agent）：        {first_use * 1000:7.0f} ms")
+
+    run_sync_conns, requests, conns, errors, legacy_errors, open_clients = connection_reuse()
+    print(f"Runner.run_sync 連續 {REQUESTS} 次請求：{run_sync_conns} 條連線（改寫前每個模組各一個連線池）")
+    print(f"含 6 次 llm_client.run 與再一次 run_sync，共 {requests} 次請求：{conns} 條連線，失敗 {errors} 次")
+    print(f"6 次 llm_client.run 之後仍快取的 client：{open_clients} 個（只剩 run_sync 的迴圈）")
+    print(f"改寫前的模組層級 client 連續 3 次 asyncio.run：失敗 {legacy_errors} 次")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_log_export.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_log_export
+#
+# 作答紀錄 TOTAL_ROWS 筆（STUDENTS 位學生、約 DAYS 天）匯出為依日期分區的 Arrow IPC 檔：
+# 1. 首次全量匯出、再新增 NEW_ROWS 筆後的增量匯出（只寫新紀錄，不重複）
+# 2. 模擬中斷：留下未記錄水位的分區檔，下次匯出會先清除再重寫
+# 3. 讀取：全體一個月的記憶體映射讀取、StudentModel.from_export 與正式資料庫建立的結果一致
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pyarrow.compute as pc
+
+from data_store import db, log_export
+from data_store.answer_log_writer import INSERT_SQL
+from models.student_model import StudentModel
+
+TOTAL_ROWS = 1_000_000
+STUDENTS = 500
+DAYS = 120
+NEW_ROWS = 5000
+
+def insert_answers(n, start_id, seed):
+    rng = random.Random(seed)
+    start = datetime(2025, 2, 1)
+    step = DAYS * 86400 / TOTAL_ROWS
+    with db.transaction(db.USER_LOG) as conn:
+        conn.executemany(INSERT_SQL, (
+            ((start + timedelta(seconds=(start_id + i) * step)).isoformat(), rng.randint(1, STUDENTS),
+             str(rng.randint(1, 30)), "A", "A" if rng.random() < 0.7 else "B", 0, None, None)
+            for i in range(n)
+        ))
+        conn.execute("UPDATE answer_log SET is_correct = (student_answer = correct_answer) WHERE id > ?", (start_id,))
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATHS[db.USER_LOG] = os.path.join(tmp, "user_log.sqlite")
+        export_dir = os.path.join(tmp, "export")
+        conn = db.get_connection(db.USER_LOG)
+        conn.executemany("INSERT INTO users (id, username, password_hash, role, class_name) VALUES (?, ?, '', 'student', ?)",
+                         ((u, f"s{u}", f"30{u % 5 + 1}") for u in range(1, STUDENTS + 1)))
+        conn.commit()
+        insert_answers(TOTAL_ROWS, 0, 1)
+
+        start = time.perf_counter()
+        n = log_export.export_answers(export_dir)
+        full = time.perf_counter() - start
+        db_size = os.path.getsize(db.DB_PATHS[db.USER_LOG])
+        print(f"全量匯出 {n:,} 筆：{full:.2f}s（{n / full:,.0f} 筆/秒），"
+              f"{len(log_export._part_files(export_dir))} 個分區檔 {dir_size(export_dir) / 1e6:.1f} MB（SQLite {db_size / 1e6:.1f} MB）")
+
+        insert_answers(NEW_ROWS, TOTAL_ROWS, 2)
+        # 模擬上次匯出在寫完分區檔、更新水位前中斷
+        stale = os.path.join(export_dir, "date=2099-01-01")
+        os.makedirs(stale)
+        open(os.path.join(stale, f"part-{TOTAL_ROWS + 1:012d}-{TOTAL_ROWS + 9:012d}.arrow"), "wb").close()
+
+        start = time.perf_counter()
+        added = log_export.export_answers(export_dir)
+        inc = time.perf_counter() - start
+        assert added == NEW_ROWS and not os.listdir(stale)
+        assert log_export.export_answers(export_dir) == 0
+        print(f"增量匯出 {added:,} 筆：{inc * 1000:.1f} ms；無新紀錄再匯出 0 筆")
+
+        table = log_export.read_answers(export_dir, columns=["log_id"])
+        ids = table["log_id"].to_numpy()
+        assert len(ids) == TOTAL_ROWS + NEW_ROWS and len(set(ids.tolist())) == len(ids)
+
+        start = time.perf_counter()
+        month = log_export.read_answers(export_dir, start_date="2025-03-01", end_date="2025-03-31",
+                                        columns=["user_id", "class_name", "topic", "is_correct"])
+        read_t = time.perf_counter() - start
+        rate = pc.mean(month["is_correct"].cast("int8")).as_py()
+        print(f"讀取 2025-03 全體 {month.num_rows:,} 筆：{read_t * 1000:.1f} ms，正確率 {rate:.3f}")
+
+        start = time.perf_counter()
+        exported = StudentModel.from_export(42, export_dir)
+        exp_t = time.perf_counter() - start
+        start = time.perf_counter()
+        live = StudentModel(42)
+        live_t = time.perf_counter() - start
+        assert exported.export_summary() == live.export_summary()
+        assert exported.accuracy_by_date() == live.accuracy_by_date()
+        assert exported.watermark == live.watermark and exported.refresh() == 0
+        print(f"StudentModel.from_export：{exp_t * 1000:.1f} ms；StudentModel（正式資料庫）：{live_t * 1000:.1f} ms；結果一致")
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_question_records.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_question_records
+#
+# 比較整個題庫載入快取後的記憶體用量（tracemalloc）：
+# 改寫前為中文鍵 dict 且選項立即 json.loads；改寫後為 __slots__ 的 Question/QuestionGroup，選項延後解析。
+
+import gc
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from init_db import create_database
+from data_store.bank_loader import load_groups, load_single_questions
+
+N_SINGLES = 50_000
+N_GROUPS = 12_500
+SUBS_PER_GROUP = 4
+VIEWED_RATIO = 0.1   # 模擬一段時間內實際出過（讀過選項）的題目比例
+
+def build_bank(db_path):
+    """接近真實長度的題庫：5 萬單題 + 12,500 題組 × 4 小題，共 10 萬題"""
+    create_database(db_path)
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.executemany(
+        "INSERT INTO question_groups (id, title, reading_text, category) VALUES (?, ?, ?, ?)",
+        ((gid, f"題組{gid}", "閱讀文本" * 100, "閱讀理解") for gid in range(1, N_GROUPS + 1))
+    )
+    options = json.dumps({k: f"選項{k}的敘述內容，約十餘字" for k in "ABCD"}, ensure_ascii=False)
+    rows = []
+    for i in range(N_SINGLES + N_GROUPS * SUBS_PER_GROUP):
+        gid = i % N_GROUPS + 1 if i >= N_SINGLES else None
+        rows.append((gid, f"第{i}題：下列關於材料性質的敘述何者正確？" * 2, options, "B",
+                     f"解析{i}：依據材料科學的基本原理說明正確選項的理由。" * 3, "材料性質", 2, "單選", "晶體結構,缺陷"))
+    c.executemany(
+        "INSERT INTO questions (group_id, content, options, answer, explanation, topic, difficulty, question_type, keywords) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+# === 改寫前的 question_loader（中文鍵 dict，選項立即解析）===
+def _legacy_row(row):
+    return {
+        "題幹": row[1], "選項": json.loads(row[2]) if row[2] else {}, "正解": row[3], "解析": row[4],
+        "主題": row[5], "難度": row[6], "題型": row[7], "關鍵詞": row[8],
+    }
+
+def load_legacy(conn):
+    c = conn.cursor()
+    c.execute("SELECT id, content, options, answer, explanation, topic, difficulty, question_type, keywords "
+              "FROM questions WHERE group_id IS NULL")
+    singles = [{"type": "single", "題號": row[0], **_legacy_row(row)} for row in c.fetchall()]
+    c.execute("SELECT id, title, reading_text, category FROM question_groups ORDER BY id")
+    groups, by_id = [], {}
+    for gid, title, reading_text, category in c.fetchall():
+        by_id[gid] = {"type": "group", "group_id": gid, "title": title, "reading_text": reading_text,
+                      "category": category, "questions": []}
+        groups.append(by_id[gid])
+    c.execute("SELECT group_id, id, content, options, answer, explanation, topic, difficulty, question_type, keywords "
+              "FROM questions WHERE group_id IS NOT NULL ORDER BY id")
+    for row in c:
+        by_id[row[0]]["questions"].append({"sub_id": row[1], **_legacy_row(row[1:])})
+    return singles, groups
+
+def load_records(conn):
+    return load_single_questions(conn), load_groups(conn)
+
+def measure(fn, conn):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = fn(conn)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, current, peak, elapsed
+
+def touch_options(data, ratio):
+    singles, groups = data
+    subs = [q for g in groups for q in g.questions]
+    step = int(1 / ratio)
+    for q in singles[::step] + subs[::step]:
+        q.options
+
+def main():
+    mb = 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bank.sqlite")
+        build_bank(db_path)
+        conn = sqlite3.connect(db_path)
+
+        legacy, old_cur, old_peak, old_t = measure(load_legacy, conn)
+        del legacy
+        records, new_cur, new_peak, new_t = measure(load_records, conn)
+
+        tracemalloc.start()
+        touch_options(records, VIEWED_RATIO)
+        viewed_extra, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        conn.close()
+
+    total = N_SINGLES + N_GROUPS * SUBS_PER_GROUP
+    print(f"題庫 {total:,} 題（單題 {N_SINGLES:,}、題組 {N_GROUPS:,} × {SUBS_PER_GROUP}）")
+    print(f"{'':<22} {'常駐 (MB)':>10} {'峰值 (MB)':>10} {'載入 (s)':>9}")
+    print(f"{'中文鍵 dict（改寫前）':<20} {old_cur / mb:>10.1f} {old_peak / mb:>10.1f} {old_t:>9.3f}")
+    print(f"{'slotted 紀錄':<22} {new_cur / mb:>10.1f} {new_peak / mb:>10.1f} {new_t:>9.3f}")
+    print(f"常駐記憶體為改寫前的 {new_cur / old_cur:.0%}；"
+          f"其中 {VIEWED_RATIO:.0%} 題解析過選項後再增加 {viewed_extra / mb:.1f} MB")
+
+if __name__ == "__main__":
+    main()
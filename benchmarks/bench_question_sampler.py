@@ -0,0 +1,96 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_question_sampler.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_question_sampler
+#
+# 另量測依難度篩選時，校準等級更新（約 200 題等級變動）後重建候選的時間：
+# 只更新等級有變動的題目 vs 整份重掃題庫，並確認兩者結果相同。
+
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from benchmarks.bench_group_loader import build_bank
+from data_store import bank_cache, db, question_loader, question_sampler
+
+DRAWS = 2000
+CHANGED_LEVELS = 200
+REFRESHES = 5
+
+def use_bank(db_path):
+    db.DB_PATHS[db.QUESTION_BANK] = db_path
+    bank_cache.clear_cache()
+
+def main():
+    print(f"{'題數':>8} {'首次建立候選 (ms)':>18} {'只抽 id (µs)':>12} {'抽題+取題 (µs)':>14} {'排除已出 (µs)':>14}")
+    for n in (10_000, 100_000):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bank.sqlite")
+            build_bank(db_path, n)
+            use_bank(db_path)
+
+            start = time.perf_counter()
+            question_sampler.get_candidates()
+            warmup = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            for _ in range(DRAWS):
+                question_sampler.draw()
+            per_id = (time.perf_counter() - start) / DRAWS * 1e6
+
+            start = time.perf_counter()
+            for _ in range(DRAWS):
+                question_loader.get_random_question()
+            per_draw = (time.perf_counter() - start) / DRAWS * 1e6
+
+            seen = {("group", gid) for gid in random.sample(range(1, n // 4 + 1), n // 8)}
+            start = time.perf_counter()
+            for _ in range(DRAWS):
+                question_loader.get_random_question(exclude=seen)
+            per_draw_excl = (time.perf_counter() - start) / DRAWS * 1e6
+            db.close_connections()
+        print(f"{n:>8} {warmup:>18.1f} {per_id:>12.1f} {per_draw:>14.1f} {per_draw_excl:>14.1f}")
+
+    n = 100_000
+    incremental, full = calibrated_refresh(n)
+    print(f"\n校準等級變動 {CHANGED_LEVELS} 題後重建難度候選（{n + n // 4:,} 題）："
+          f"增量 {incremental:.1f} ms，整份重掃 {full:.1f} ms（{full / incremental:.0f}x）")
+
+def calibrated_refresh(n):
+    """校準等級每次變動 CHANGED_LEVELS 題後，增量更新與整份重建候選的時間（ms）"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bank.sqlite")
+        build_bank(db_path, n)
+        conn = sqlite3.connect(db_path)
+        conn.executemany("INSERT INTO questions (content, options, answer, topic, difficulty, question_type) VALUES (?, '{}', 'A', '閱讀理解', ?, '單選')",
+                         ((f"單題{i}", random.randint(1, 3)) for i in range(n // 4)))
+        conn.commit()
+        conn.close()
+        use_bank(db_path)
+        total = n + n // 4
+        rng = random.Random(0)
+        levels, version = {qid: rng.randint(1, 3) for qid in rng.sample(range(1, total + 1), total // 2)}, 0
+        original = question_sampler.calibration.item_levels
+        question_sampler.calibration.item_levels = lambda: (levels, version)
+        try:
+            question_sampler.get_candidates(difficulty=2)
+            incremental = full = 0.0
+            for _ in range(REFRESHES):
+                levels = dict(levels)
+                for qid in rng.sample(range(1, total + 1), CHANGED_LEVELS):
+                    levels[qid] = rng.randint(1, 3)
+                version += 1
+                start = time.perf_counter()
+                updated = question_sampler.get_candidates(difficulty=2)
+                incremental += time.perf_counter() - start
+                start = time.perf_counter()
+                rebuilt = question_sampler._load_calibrated_candidates(None, 2, None, levels)
+                full += time.perf_counter() - start
+                assert updated == rebuilt, "增量更新的候選與整份重建不同"
+        finally:
+            question_sampler.calibration.item_levels = original
+            db.close_connections()
+    return incremental / REFRESHES * 1000, full / REFRESHES * 1000
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_question_similarity.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_question_similarity
+#
+# 題庫 QUESTIONS 題（FAMILIES 組「同源」題目：同一段素材改寫而成、共用關鍵詞），量測：
+# 1. 首次建立相似度索引
+# 2. similar_questions() 查詢延遲，對照逐題計算餘弦相似度的暴力掃描
+# 3. 新增 NEW_QUESTIONS 題、修改 EDITED 題後的增量同步（只切詞變動的題目）
+# 並確認查詢結果大多為同源題目、與暴力掃描的前幾名一致，新增/修改/刪除的題目立即反映。
+
+import math
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+
+from data_store import bank_cache, db, question_similarity as sim
+from init_db import create_database
+
+QUESTIONS = 100_000
+FAMILIES = 2000
+NEW_QUESTIONS = 1000
+EDITED = 50
+QUERIES = 200
+CHARS = [chr(c) for c in range(0x4E00, 0x4E00 + 3000)]
+TOPICS = ["文意理解", "修辭", "字音字形", "成語", "文化常識", "閱讀策略"]
+
+def family_source(f):
+    rng = random.Random(f)
+    return ("".join(rng.choices(CHARS, k=60)), ",".join(rng.sample(CHARS, 3)), rng.choice(TOPICS))
+
+def make_question(qid, rng):
+    family = qid % FAMILIES
+    base, keywords, topic = family_source(family)
+    # 同源題目：取素材中的一段再混入隨機字
+    start = rng.randrange(0, 20)
+    content = base[start:start + 40] + "".join(rng.choices(CHARS, k=20)) + "，下列何者正確？"
+    return (qid, content, keywords, topic)
+
+def build_bank(path, rng):
+    create_database(path)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO questions (id, content, keywords, topic, options, answer) VALUES (?, ?, ?, ?, '{}', 'A')",
+                     (make_question(i, rng) for i in range(1, QUESTIONS + 1)))
+    conn.commit()
+    conn.close()
+
+def brute_force(qid, k):
+    """逐題計算二元組 TF-IDF 餘弦相似度（不建索引時的做法）"""
+    rows = db.get_connection(db.QUESTION_BANK).execute("SELECT id, content, keywords, topic FROM questions").fetchall()
+    bags = {}
+    df = Counter()
+    for rid, content, keywords, topic in rows:
+        _, keys, tf = sim.tokenize([content], [keywords], [topic])
+        bags[rid] = dict(zip(keys.tolist(), tf.tolist()))
+        df.update(bags[rid].keys())
+    n = len(rows)
+    idf = {key: math.log((n + 1) / (d + 1)) + 1.0 for key, d in df.items()}
+
+    def vec(bag):
+        v = {key: w * idf[key] for key, w in bag.items()}
+        return v, math.sqrt(sum(x * x for x in v.values()))
+    query, qnorm = vec(bags[qid])
+    scores = []
+    for rid, bag in bags.items():
+        if rid == qid:
+            continue
+        v, norm = vec(bag)
+        dot = sum(w * v.get(key, 0.0) for key, w in query.items())
+        if dot:
+            scores.append((-dot / (norm * qnorm), rid))
+    return [rid for _, rid in sorted(scores)[:k]]
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATHS[db.QUESTION_BANK] = os.path.join(tmp, "bank.sqlite")
+        db.DB_PATHS[db.USER_LOG] = os.path.join(tmp, "user_log.sqlite")
+        build_bank(db.DB_PATHS[db.QUESTION_BANK], rng)
+        bank_cache.clear_cache()
+
+        index, build_t = timed(sim.get_index)
+        assert len(index) == QUESTIONS
+
+        queries = rng.sample(range(1, QUESTIONS + 1), QUERIES)
+        same_family = 0
+        start = time.perf_counter()
+        for qid in queries:
+            picked = sim.similar_questions(qid, k=5)
+            assert len(picked) == 5 and qid not in [p for p, _ in picked]
+            same_family += sum(p % FAMILIES == qid % FAMILIES for p, _ in picked)
+        query_t = (time.perf_counter() - start) / QUERIES
+        precision = same_family / (QUERIES * 5)
+        assert precision > 0.95, precision
+
+        expected, brute_t = timed(lambda: brute_force(queries[0], 5))
+        assert [p for p, _ in sim.similar_questions(queries[0], k=5)] == expected
+        # 錯題本以 TEXT 存題號：字串題號也要排除；排除清單很長時照樣回傳 k 題
+        wrongbook = [str(p) for p in expected[:3]] + [str(q) for q in range(1, QUESTIONS + 1, 7)]
+        picked = [p for p, _ in sim.similar_questions(queries[0], k=5, exclude=wrongbook)]
+        assert len(picked) == 5 and not set(picked) & {int(q) for q in wrongbook}
+
+        # 增量：新增題目、修改題目（改成另一組素材）、刪除題目
+        new_rows = [make_question(i, rng) for i in range(QUESTIONS + 1, QUESTIONS + NEW_QUESTIONS + 1)]
+        edited = rng.sample([q for q in range(1, QUESTIONS + 1) if q != queries[1]], EDITED)
+        with db.transaction(db.QUESTION_BANK) as conn:
+            conn.executemany("INSERT INTO questions (id, content, keywords, topic, options, answer) VALUES (?, ?, ?, ?, '{}', 'A')", new_rows)
+            for qid in edited:
+                _, content, keywords, topic = make_question(qid + 1, rng)
+                conn.execute("UPDATE questions SET content = ?, keywords = ?, topic = ? WHERE id = ?", (content, keywords, topic, qid))
+            conn.execute("DELETE FROM questions WHERE id = ?", (queries[1],))
+        (changed, removed), inc_t = timed(lambda: sim.sync(index))
+        assert (changed, removed) == (NEW_QUESTIONS + EDITED, 1)
+        assert sim.sync(index) == (0, 0)
+        assert len(index) == QUESTIONS + NEW_QUESTIONS - 1
+        new_qid = QUESTIONS + 1
+        assert all(p % FAMILIES == new_qid % FAMILIES for p, _ in sim.similar_questions(new_qid, k=5))
+        moved = edited[0]
+        assert all(p % FAMILIES == (moved + 1) % FAMILIES for p, _ in sim.similar_questions(moved, k=3))
+        assert all(p != queries[1] for qid in queries[2:20] for p, _ in sim.similar_questions(qid, k=5))
+
+        sim.clear_index()
+        _, rebuild_t = timed(sim.get_index)
+
+        print(f"題庫 {QUESTIONS:,} 題（{FAMILIES:,} 組同源題目）")
+        print(f"首次建立索引：             {build_t:8.2f} s")
+        print(f"similar_questions（5 題）：{query_t * 1000:8.2f} ms（同源比例 {precision:.0%}）")
+        print(f"暴力掃描（5 題）：         {brute_t * 1000:8.0f} ms（{brute_t / query_t:,.0f}x）")
+        print(f"新增 {NEW_QUESTIONS} 題 + 修改 {EDITED} 題增量同步：{inc_t * 1000:8.0f} ms"
+              f"（全部重建 {rebuild_t * 1000:.0f} ms）")
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
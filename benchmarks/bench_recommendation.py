@@ -0,0 +1,111 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_recommendation.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_recommendation
+#
+# 題庫 QUESTIONS 題、學生作答 ANSWERS 筆時，比較「推薦下一題」：
+# 1. 改寫前：全體最近一筆錯題的主題 + SELECT * ... ORDER BY RANDOM() LIMIT 1（整表掃描排序）
+# 2. 推薦引擎：主題/關鍵詞題號索引 + 學生檔案（已作答/已掌握、錯題主題權重）
+# 並確認推薦結果不含已掌握題目、主題分布偏向最近答錯的主題。
+
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+
+from data_store import bank_cache, db
+from data_store.answer_log_writer import INSERT_SQL
+from data_store.question_loader import get_questions_by_ids
+from assistant_core.recommendation import recommend_next_question as rec
+from init_db import create_database
+
+QUESTIONS = 200_000
+ANSWERS = 3000
+TOPICS = ["文意理解", "修辭", "字音字形", "成語", "文化常識", "閱讀策略", "語詞詞義", "篇章結構"]
+KEYWORDS = ["比喻", "借代", "轉化", "映襯", "設問", "誇飾", "排比", "層遞", "對偶", "頂真"]
+WEAK_TOPIC = "修辭"
+
+LEGACY_SQL = "SELECT * FROM questions WHERE topic = ? AND id != ? ORDER BY RANDOM() LIMIT 1"
+
+def build_bank(path):
+    create_database(path)
+    rng = random.Random(1)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO questions (id, content, options, answer, explanation, topic, difficulty, question_type, keywords) "
+        "VALUES (?, ?, ?, 'A', ?, ?, ?, '單選', ?)",
+        ((i, "題幹" * 50, json.dumps({"A": "甲", "B": "乙", "C": "丙", "D": "丁"}), "解析" * 80, rng.choice(TOPICS),
+          rng.randint(1, 5), ",".join(rng.sample(KEYWORDS, 2))) for i in range(1, QUESTIONS + 1))
+    )
+    conn.commit()
+    conn.close()
+
+def fill_log():
+    """學生 1：大多數題目答對，WEAK_TOPIC 的題目多半答錯"""
+    rng = random.Random(2)
+    topics = dict(db.get_connection(db.QUESTION_BANK).execute("SELECT id, topic FROM questions WHERE id <= 20000"))
+    rows = []
+    for i in range(ANSWERS):
+        qid = rng.randint(1, 20000)
+        ok = rng.random() < (0.2 if topics[qid] == WEAK_TOPIC else 0.9)
+        rows.append((f"2025-06-01T{i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}", 1, str(qid), "A" if ok else "B", "A", int(ok), None, None))
+    with db.transaction(db.USER_LOG) as conn:
+        conn.executemany(INSERT_SQL, rows)
+
+def legacy_recommend():
+    row = db.get_connection(db.USER_LOG).execute(
+        "SELECT question_id FROM answer_log WHERE is_correct = 0 ORDER BY timestamp DESC LIMIT 1").fetchone()
+    conn = db.get_connection(db.QUESTION_BANK)
+    topic = conn.execute("SELECT topic FROM questions WHERE id = ?", (row[0],)).fetchone()[0]
+    return conn.execute(LEGACY_SQL, (topic, row[0])).fetchone()
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATHS[db.QUESTION_BANK] = os.path.join(tmp, "bank.sqlite")
+        db.DB_PATHS[db.USER_LOG] = os.path.join(tmp, "user_log.sqlite")
+        build_bank(db.DB_PATHS[db.QUESTION_BANK])
+        bank_cache.clear_cache()
+        fill_log()
+
+        start = time.perf_counter()
+        rec.get_index()
+        index_t = time.perf_counter() - start
+        start = time.perf_counter()
+        profile = rec.get_profile(1)
+        profile_t = time.perf_counter() - start
+
+        rng = random.Random(3)
+        topics = Counter()
+        for _ in range(200):
+            picked = rec.recommend_ids(1, k=5, rng=rng)
+            assert len(picked) == 5 and not any(qid in profile.mastered for qid, _ in picked)
+            topics.update(q.topic for q in get_questions_by_ids([qid for qid, _ in picked]).values())
+        weak_share = topics[WEAK_TOPIC] / sum(topics.values())
+        assert weak_share > 2 / len(TOPICS), weak_share
+
+        old = timed(legacy_recommend, 5)
+        new = timed(lambda: rec.recommend_ids(1, k=5, rng=rng), 200)
+        full = timed(lambda: rec.recommend(1, k=5, rng=rng), 50)
+        practice = timed(lambda: rec.build_practice_set(1, size=20, rng=rng), 20)
+        print(f"題庫 {QUESTIONS:,} 題，學生作答 {ANSWERS:,} 筆（弱點主題「{WEAK_TOPIC}」）")
+        print(f"建立題號索引（每次題庫變動一次）：{index_t * 1000:8.1f} ms")
+        print(f"建立學生檔案（登入後一次）：      {profile_t * 1000:8.1f} ms")
+        print(f"改寫前 ORDER BY RANDOM()（1 題）：{old * 1000:8.1f} ms")
+        print(f"recommend_ids（5 題）：           {new * 1000:8.3f} ms（{old / new:,.0f}x）")
+        print(f"recommend（5 題，含題目內容）：   {full * 1000:8.3f} ms")
+        print(f"build_practice_set（20 題）：     {practice * 1000:8.3f} ms")
+        print(f"推薦結果中弱點主題比例：{weak_share:.0%}（題庫中約 {1 / len(TOPICS):.0%}）")
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_rollups.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_rollups
+#
+# 學習歷程頁的圖表資料：
+# 1. 改寫前：讀出該生全部作答並對照題庫，逐列累計日期/結果/主題/關鍵詞/難度
+#    （以純 Python 模擬 pandas merge + groupby，為舊做法成本的下限）
+# 2. 作答統計彙總表：每個維度一次主鍵範圍讀取
+# 並確認彙總結果與直接由作答紀錄計算的結果一致。
+
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from data_store import bank_cache, db, rollups
+from data_store.answer_log_writer import INSERT_SQL
+from init_db import create_database
+
+STUDENTS = 50
+ANSWERS_EACH = 4000
+QUESTIONS = 5000
+TOPICS = ["文意理解", "修辭", "字音字形", "成語", "文化常識", "閱讀策略"]
+KEYWORDS = ["比喻", "借代", "轉化", "映襯", "設問", "誇飾", "排比", "層遞"]
+
+def build_bank(path):
+    create_database(path)
+    rng = random.Random(1)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO questions (id, content, options, answer, topic, difficulty, question_type, keywords) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        ((i, f"題幹{i}", json.dumps({"A": "甲", "B": "乙"}), "A", rng.choice(TOPICS), rng.randint(1, 5), "單選",
+          ",".join(rng.sample(KEYWORDS, 2))) for i in range(1, QUESTIONS + 1))
+    )
+    conn.commit()
+    conn.close()
+
+def fill_log():
+    rng = random.Random(2)
+    start = datetime(2025, 3, 1)
+    with db.transaction(db.USER_LOG) as conn:
+        conn.executemany("INSERT INTO users (id, username, password_hash, role, class_name) VALUES (?, ?, '', 'student', ?)",
+                         ((u, f"s{u}", f"30{u % 3 + 1}") for u in range(1, STUDENTS + 1)))
+        rows = []
+        for i in range(STUDENTS * ANSWERS_EACH):
+            correct = rng.random() < 0.7
+            rows.append(((start + timedelta(minutes=i)).isoformat(), i % STUDENTS + 1, str(rng.randint(1, QUESTIONS)),
+                         "A" if correct else "B", "A", int(correct), None, None))
+        conn.executemany(INSERT_SQL, rows)
+
+def legacy_summary(user_id):
+    log = db.get_connection(db.USER_LOG).execute(
+        "SELECT * FROM answer_log WHERE user_id = ? ORDER BY timestamp DESC", (user_id,)).fetchall()
+    bank = {str(r[0]): r for r in db.get_connection(db.QUESTION_BANK).execute(
+        "SELECT id, topic, keywords, difficulty, question_type FROM questions")}
+    daily, result, topic, kw, diff = Counter(), Counter(), Counter(), Counter(), Counter()
+    for row in log:
+        ok = row[6]
+        daily[(row[1][:10], ok)] += 1
+        result[ok] += 1
+        if not ok and row[3] in bank:
+            q = bank[row[3]]
+            topic[q[1]] += 1
+            diff[str(q[3])] += 1
+            for k in q[2].split(","):
+                kw[k.strip()] += 1
+    return daily, result, topic, kw, diff
+
+def rollup_summary(user_id):
+    return {dim: rollups.get_user_rollup(user_id, dim) for dim in ("day", "all", "topic", "keyword", "difficulty")}
+
+def timed(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATHS[db.QUESTION_BANK] = os.path.join(tmp, "bank.sqlite")
+        db.DB_PATHS[db.USER_LOG] = os.path.join(tmp, "user_log.sqlite")
+        build_bank(db.DB_PATHS[db.QUESTION_BANK])
+        bank_cache.clear_cache()
+        fill_log()
+
+        start = time.perf_counter()
+        n = rollups.catch_up()
+        catch_up_time = time.perf_counter() - start
+        print(f"作答 {n:,} 筆（{STUDENTS} 人），首次補算彙總 {catch_up_time:.2f}s（{n / catch_up_time:,.0f} 筆/秒）")
+
+        # 與直接計算結果比對
+        daily, result, topic, kw, diff = legacy_summary(7)
+        r = rollup_summary(7)
+        assert r["all"][0][1:] == (result[0] + result[1], result[1])
+        assert {(d, a - c) for d, a, c in r["day"]} == {(d, daily[(d, 0)]) for d, _ in daily}
+        assert {v: a - c for v, a, c in r["topic"] if a > c} == dict(topic)
+        assert {v: a - c for v, a, c in r["keyword"] if a > c} == dict(kw)
+        assert {v: a - c for v, a, c in r["difficulty"] if a > c} == dict(diff)
+
+        old = timed(lambda: legacy_summary(7), repeat=3)
+        new = timed(lambda: rollup_summary(7))
+        noop = timed(rollups.catch_up)
+        print(f"改寫前 全部作答 + 題庫對照（下限）：{old * 1000:8.1f} ms")
+        print(f"彙總表讀取（5 個維度）：            {new * 1000:8.2f} ms（{old / new:,.0f}x）")
+        print(f"無新紀錄時 catch_up()：             {noop * 1000:8.3f} ms")
+        classes = rollups.get_class_rollup("301", "all")
+        print(f"班級 301 總計：作答 {classes[0][1]:,}，答對 {classes[0][2]:,}")
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
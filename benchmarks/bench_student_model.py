@@ -0,0 +1,69 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_student_model.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_student_model
+#
+# 全體作答紀錄 TOTAL_ROWS 筆（STUDENTS 位學生）時，比較每次頁面渲染建立學生模型的成本：
+# 1. 改寫前：SELECT * FROM answer_log 全表讀出（此處只計 fetchall，未含 pandas 轉換，為舊做法成本的下限）
+# 2. StudentModel(user_id)：只讀該生紀錄
+# 3. refresh()：只讀水位之後的新紀錄
+
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from data_store import db
+from data_store.answer_log_writer import INSERT_SQL
+from models.student_model import StudentModel
+
+TOTAL_ROWS = 1_000_000
+STUDENTS = 1000
+NEW_ROWS = 10
+
+def fill_log(conn):
+    rng = random.Random(5)
+    start = datetime(2025, 1, 1)
+    rows = ((
+        (start + timedelta(seconds=i * 3)).isoformat(), i % STUDENTS + 1, str(rng.randrange(1, 5000)),
+        "A", "A" if rng.random() < 0.7 else "B", 0, None, None
+    ) for i in range(TOTAL_ROWS))
+    with db.transaction(db.USER_LOG) as conn:
+        conn.executemany(INSERT_SQL, rows)
+        conn.execute("UPDATE answer_log SET is_correct = (student_answer = correct_answer)")
+
+def traced(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATHS[db.USER_LOG] = os.path.join(tmp, "user_log.sqlite")
+        conn = db.get_connection(db.USER_LOG)
+        fill_log(conn)
+        print(f"作答紀錄 {TOTAL_ROWS:,} 筆，{STUDENTS} 位學生（每人約 {TOTAL_ROWS // STUDENTS:,} 筆）")
+
+        _, old_t, old_mem = traced(lambda: conn.execute("SELECT * FROM answer_log ORDER BY timestamp DESC").fetchall())
+        model, new_t, new_mem = traced(lambda: StudentModel(42))
+        print(f"改寫前 全表讀取（下限）：{old_t * 1000:9.1f} ms，峰值 {old_mem:7.1f} MB")
+        print(f"StudentModel(user_id)：  {new_t * 1000:9.1f} ms，峰值 {new_mem:7.1f} MB")
+
+        with db.transaction(db.USER_LOG) as conn:
+            conn.executemany(INSERT_SQL, [(datetime.now().isoformat(), 42, "1", "A", "B", 0, None, None)] * NEW_ROWS)
+        added, ref_t, _ = traced(model.refresh)
+        assert added == NEW_ROWS
+        _, noop_t, _ = traced(model.refresh)
+        print(f"refresh()（{NEW_ROWS} 筆新紀錄）：{ref_t * 1000:8.2f} ms；無新紀錄：{noop_t * 1000:.2f} ms")
+
+        fresh = StudentModel(42)
+        assert fresh.export_summary() == model.export_summary()
+        print(f"summary：{model.export_summary()}")
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_wrongbook_lookup.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_wrongbook_lookup
+#
+# 錯題本載入 WRONG 題錯題所需的題目資料：
+# 1. 最初做法：每列錯題 get_question_topic 各開一次連線查主題（共兩輪 + 摘要 5 題），再逐題取題目
+# 2. 逐題查詢：每題 get_question_by_id（由快取的題庫 id 索引取出，索引於快取失效後首次查詢時建立）
+# 3. get_questions_by_ids：一次集合查詢
+
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from benchmarks.bench_group_loader import build_bank
+from data_store import bank_cache, bank_loader, db, question_loader
+
+BANK_SIZE = 10_000
+WRONG = 500
+
+def legacy_topic(path, qid):
+    conn = sqlite3.connect(path)
+    row = conn.execute("SELECT topic, keywords FROM questions WHERE id = ?", (qid,)).fetchone()
+    conn.close()
+    return row
+
+def legacy(path, qids):
+    for qid in qids:                      # get_all_wrong_topics
+        legacy_topic(path, qid)
+    for qid in qids[:5]:                  # summarize_error_patterns
+        legacy_topic(path, qid)
+    conn = db.get_connection(db.QUESTION_BANK)
+    for qid in qids:                      # 錯題列表：題目 + 主題
+        bank_loader.load_question(conn, int(qid))
+        legacy_topic(path, qid)
+
+def per_item(qids):
+    bank_cache.clear_cache()
+    for qid in qids:
+        question_loader.get_question_by_id(qid)
+
+def batch(qids):
+    return question_loader.get_questions_by_ids(qids)
+
+def timed(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def count_statements(fn):
+    conn = db.get_connection(db.QUESTION_BANK)
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        fn()
+    finally:
+        conn.set_trace_callback(None)
+    return sum(1 for s in statements if s.lstrip().upper().startswith("SELECT"))
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bank.sqlite")
+        build_bank(path, BANK_SIZE)
+        db.DB_PATHS[db.QUESTION_BANK] = path
+        bank_cache.clear_cache()
+        # answer_log.question_id 為 TEXT
+        qids = [str(i) for i in random.Random(7).sample(range(1, BANK_SIZE + 1), WRONG)]
+
+        result = batch(qids)
+        assert len(result) == WRONG and all(result[q].group is not None for q in qids)
+
+        rows = [
+            ("最初做法（逐列開連線）", timed(lambda: legacy(path, qids), repeat=3),
+             WRONG + 5 + WRONG * (3 + 1)),   # 主題 + 摘要 + 每題（題目、題組、子題、主題）
+            ("逐題 get_question_by_id（含建索引）", timed(lambda: per_item(qids)), count_statements(lambda: per_item(qids))),
+            ("get_questions_by_ids", timed(lambda: batch(qids)), count_statements(lambda: batch(qids))),
+        ]
+        print(f"錯題 {WRONG} 題（題庫 {BANK_SIZE:,} 題）")
+        print(f"{'':<24} {'耗時 (ms)':>10} {'題庫查詢次數':>12}")
+        for label, elapsed, queries in rows:
+            print(f"{label:<22} {elapsed * 1000:>10.1f} {queries:>12}")
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
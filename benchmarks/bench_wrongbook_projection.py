@@ -0,0 +1,87 @@
+# 檔案路徑：learning_assistant/benchmarks/bench_wrongbook_projection.py
+# 執行方式（於專案根目錄）：python -m benchmarks.bench_wrongbook_projection
+#
+# STUDENTS 位學生各作答 ANSWERS_EACH 筆（題庫 QUESTIONS 題），比較錯題本頁面讀取：
+# 1. 改寫前：answer_log 上 GROUP BY question_id, group_id, sub_id + MAX(timestamp)
+# 2. 錯題本投影：wrongbook 依 (user_id, last_wrong_at) 索引直接讀取
+# 並確認經由寫入器增量更新的投影與 rebuild() 全量重建、以及舊查詢結果一致。
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from data_store import answer_log_writer, db, wrongbook
+
+STUDENTS = 50
+ANSWERS_EACH = 4000
+QUESTIONS = 2000
+
+LEGACY_SQL = """
+    SELECT question_id, group_id, sub_id, student_answer, correct_answer, MAX(timestamp)
+    FROM answer_log
+    WHERE user_id = ? AND is_correct = 0
+    GROUP BY question_id, group_id, sub_id
+    ORDER BY MAX(timestamp) DESC
+"""
+
+def generate_answers():
+    rng = random.Random(3)
+    start = datetime(2025, 9, 1)
+    rows = []
+    for i in range(STUDENTS * ANSWERS_EACH):
+        user_id = i % STUDENTS + 1
+        qid = str(rng.randrange(1, QUESTIONS + 1))
+        correct = rng.choice("ABCD")
+        answer = correct if rng.random() < 0.65 else rng.choice("ABCD")
+        ts = (start + timedelta(seconds=i * 7)).isoformat()
+        rows.append((user_id, qid, answer, correct, ts))
+    return rows
+
+def timed(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATHS[db.USER_LOG] = os.path.join(tmp, "user_log.sqlite")
+        conn = db.get_connection(db.USER_LOG)
+
+        start = time.perf_counter()
+        for user_id, qid, answer, correct, ts in generate_answers():
+            answer_log_writer.log_answer(user_id, qid, answer, correct, timestamp=ts)
+        answer_log_writer.flush()
+        write_time = time.perf_counter() - start
+        total = STUDENTS * ANSWERS_EACH
+        print(f"作答 {total:,} 筆（{STUDENTS} 人，題庫 {QUESTIONS:,} 題），寫入含投影更新 {write_time:.2f}s")
+
+        incremental = conn.execute("SELECT * FROM wrongbook ORDER BY user_id, question_id").fetchall()
+        wrongbook.rebuild()
+        rebuilt = conn.execute("SELECT * FROM wrongbook ORDER BY user_id, question_id").fetchall()
+        assert incremental == rebuilt, "增量更新與全量重建結果不一致"
+
+        for user_id in range(1, STUDENTS + 1):
+            legacy = [(str(r[0]), r[3], r[4], r[5]) for r in conn.execute(LEGACY_SQL, (user_id,))]
+            projected = [(r[0], r[3], r[4], r[5]) for r in wrongbook.get_wrong_entries(user_id)]
+            assert sorted(legacy) == sorted(projected), f"user {user_id} 錯題清單不一致"
+
+        users = list(range(1, STUDENTS + 1))
+        old = timed(lambda: [conn.execute(LEGACY_SQL, (u,)).fetchall() for u in users]) / STUDENTS
+        new = timed(lambda: [wrongbook.get_wrong_entries(u) for u in users]) / STUDENTS
+        one = timed(lambda: [wrongbook.get_entry(u, "1") for u in users]) / STUDENTS
+        entries = len(wrongbook.get_wrong_entries(1))
+        print(f"每位學生約 {entries} 題錯題")
+        print(f"改寫前 GROUP BY 錯題清單：{old * 1000:8.2f} ms/人")
+        print(f"錯題本投影清單：          {new * 1000:8.2f} ms/人（{old / new:.1f}x）")
+        print(f"單題查詢（教練頁）：      {one * 1000:8.3f} ms")
+        answer_log_writer.shutdown()
+        db.close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# 檔案路徑：learning_assistant/data_store/answer_history.py
+
+# 作答紀錄對照題庫的查詢：在 user_log 連線上 ATTACH 題庫（db.get_log_connection），
+# 由 SQLite 直接 JOIN，只取回該生的紀錄與需要的欄位；
+# 不再把 questions / question_groups 整表讀進 DataFrame 後在 Python 中合併，記憶體用量與題庫大小無關。
+
+from data_store.db import get_log_connection
+
+# get_user_history() 每列的欄位順序
+HISTORY_COLUMNS = (
+    "timestamp", "question_id", "content", "student_answer", "correct_answer", "is_correct",
+    "topic", "keywords", "difficulty", "question_type", "title", "category",
+)
+
+def get_user_history(user_id, limit=None):
+    """該生作答紀錄（新到舊）附上題目內容、主題等欄位；題目已刪除時題庫欄位為 None"""
+    return get_log_connection().execute("""
+        SELECT a.timestamp, a.question_id, q.content, a.student_answer, a.correct_answer, a.is_correct,
+               q.topic, q.keywords, q.difficulty, q.question_type, g.title, g.category
+        FROM answer_log a
+        LEFT JOIN qb.questions q ON q.id = a.question_id
+        LEFT JOIN qb.question_groups g ON g.id = a.group_id
+        WHERE a.user_id = ?
+        ORDER BY a.timestamp DESC
+        LIMIT ?
+    """, (user_id, -1 if limit is None else limit)).fetchall()
+
+def get_wrong_topic_distribution(user_id):
+    """{主題: 答錯過的題數}（每題計一次，取自錯題本投影）"""
+    return dict(get_log_connection().execute("""
+        SELECT q.topic, COUNT(*)
+        FROM wrongbook w
+        JOIN qb.questions q ON q.id = w.question_id
+        WHERE w.user_id = ? AND q.topic IS NOT NULL AND q.topic != ''
+        GROUP BY q.topic
+    """, (user_id,)).fetchall())
@@ -0,0 +1,235 @@
+# 檔案路徑：learning_assistant/data_store/answer_log_writer.py
+
+# 作答紀錄寫入器：「提交作答」只把紀錄放進佇列就立即返回，
+# 由單一背景執行緒每隔幾毫秒把累積的紀錄用一次交易批次寫入（group commit）。
+# 全班同時提交時只有一個寫入者，不再互搶寫入鎖而出現 database is locked。
+#
+# - 讀取作答紀錄前呼叫 flush() 可確保剛提交的答案已寫入；有紀錄未能寫入時丟出 AnswerLogError，
+#   頁面據此提醒學生
+# - 重試 MAX_RETRIES 次仍失敗的批次（例如寫入鎖等候逾時）不丟棄：整批附加到 JOURNAL_PATH，
+#   寫入器啟動時與每次 flush() 時重放。重放前先把檔案改名認領，多個行程不會重放同一批；
+#   重放失敗時寫回 journal 等下次，認領後中途結束的行程留下的認領檔逾時後由其他行程接手。
+#   重放交易提交後、刪除認領檔之前若行程中斷，該批會再寫入一次
+# - 行程結束時（atexit）會自動把佇列中的紀錄寫完
+# - 每批寫入時一併更新錯題本投影（data_store/wrongbook.py）
+# - 統計彙總（data_store/rollups.py）、題目難度校準（data_store/calibration.py）與知識追蹤掌握度
+#   （data_store/knowledge_tracing.py）不在寫入執行緒上補算：寫入後通知另一個執行緒，
+#   等 DERIVED_DELAY 秒把期間的批次合併成一次補算，全班同時提交時不拖慢後續批次的寫入
+#   （讀取彙總/掌握度的頁面本身也會先補算，不必等計時器）
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from data_store import calibration, knowledge_tracing, rollups, wrongbook
+from data_store.db import USER_LOG, transaction
+
+FLUSH_INTERVAL = 0.005   # 收到第一筆後最多再等 5ms 收集同批紀錄
+MAX_BATCH = 500
+MAX_RETRIES = 3
+DERIVED_DELAY = 1.0      # 寫入後等待此秒數再補算衍生資料，期間寫入的批次合併為一次
+JOURNAL_PATH = "data_store/answer_log_journal.jsonl"
+STALE_CLAIM = 300.0      # 秒；認領檔超過此時間未處理完，視為認領的行程已中斷
+
+logger = logging.getLogger(__name__)
+
+INSERT_SQL = """
+    INSERT INTO answer_log (timestamp, user_id, question_id, student_answer, correct_answer, is_correct, group_id, sub_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+class AnswerLogError(RuntimeError):
+    """有作答紀錄尚未寫入資料庫（已暫存於 JOURNAL_PATH，之後自動重試）"""
+
+_queue = queue.Queue()
+_STOP = object()
+_REPLAY = object()
+_thread = None
+_thread_lock = threading.Lock()
+_stats = {"rows": 0, "batches": 0, "errors": 0, "journaled": 0, "replayed": 0}
+_derived_pending = threading.Event()
+_derived_thread = None
+_derived_lock = threading.Lock()
+
+def log_answer(user_id, qid, student_ans, correct_ans, group_id=None, sub_id=None, timestamp=None):
+    """加入一筆作答紀錄（非同步寫入）"""
+    row = (
+        timestamp or datetime.now().isoformat(),
+        user_id, qid, student_ans, correct_ans,
+        int(student_ans == correct_ans), group_id, sub_id
+    )
+    _ensure_writer()
+    _queue.put(row)
+
+def flush():
+    """
+    等待目前佇列中的紀錄全部寫入，並重放 journal 中先前寫入失敗的紀錄；
+    仍有紀錄未寫入時丟出 AnswerLogError
+    """
+    _ensure_writer()
+    _queue.put(_REPLAY)
+    _queue.join()
+    pending = _journal_rows()
+    if pending:
+        raise AnswerLogError(f"有 {pending} 筆作答紀錄暫時無法寫入資料庫，已暫存並會自動重試")
+
+def stats():
+    return dict(_stats)
+
+def _ensure_writer():
+    global _thread, _derived_thread
+    if _thread is not None and _thread.is_alive():
+        return
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_writer_loop, name="answer-log-writer", daemon=True)
+            _thread.start()
+        if _derived_thread is None or not _derived_thread.is_alive():
+            _derived_thread = threading.Thread(target=_derived_loop, name="answer-log-derived", daemon=True)
+            _derived_thread.start()
+
+def _writer_loop():
+    _replay_journal()
+    while True:
+        item = _queue.get()
+        if item is _STOP:
+            _queue.task_done()
+            return
+        if item is _REPLAY:
+            try:
+                _replay_journal()
+            finally:
+                _queue.task_done()
+            continue
+        batch = [item]
+        stop = False
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while len(batch) < MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                nxt = _queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if nxt is _STOP or nxt is _REPLAY:
+                _queue.put(nxt)      # 寫完這批再處理
+                _queue.task_done()
+                break
+            batch.append(nxt)
+        try:
+            if not _write_batch(batch):
+                _append_journal(batch)
+                _stats["journaled"] += len(batch)
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+def _write_batch(rows):
+    """寫入一批紀錄，失敗時重試；全部失敗回傳 False（不丟出例外）"""
+    for attempt in range(MAX_RETRIES):
+        try:
+            with transaction(USER_LOG, immediate=True) as conn:
+                conn.executemany(INSERT_SQL, rows)
+                # 投影表與作答紀錄同一交易更新，兩者不會不一致
+                wrongbook.apply_answers(conn, rows)
+            _stats["rows"] += len(rows)
+            _stats["batches"] += 1
+            _derived_pending.set()
+            return True
+        except Exception:
+            if attempt == MAX_RETRIES - 1:
+                _stats["errors"] += len(rows)
+                logger.exception("寫入 %d 筆作答紀錄失敗，暫存至 %s", len(rows), JOURNAL_PATH)
+            else:
+                time.sleep(0.05 * (attempt + 1))
+    return False
+
+# === 寫入失敗的暫存（journal）===
+def _append_journal(rows):
+    with open(JOURNAL_PATH, "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+        f.flush()
+        os.fsync(f.fileno())
+
+def _journal_files():
+    """JOURNAL_PATH 本身與各行程的認領檔（JOURNAL_PATH.<pid>）"""
+    directory, name = os.path.split(os.path.abspath(JOURNAL_PATH))
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, entry) for entry in os.listdir(directory)
+            if entry == name or entry.startswith(name + ".")]
+
+def _journal_rows():
+    """journal 中（含重放中的）尚未寫入的筆數"""
+    total = 0
+    for path in _journal_files():
+        try:
+            with open(path, "rb") as f:
+                total += sum(1 for line in f if line.strip())
+        except FileNotFoundError:
+            pass
+    return total
+
+def _claim_journal():
+    """改名認領 journal 與逾時的認領檔，回傳本行程認領的檔案路徑 list"""
+    claimed = []
+    mine = os.path.abspath(JOURNAL_PATH)
+    for path in _journal_files():
+        try:
+            if path != mine and time.time() - os.path.getmtime(path) < STALE_CLAIM:
+                continue             # 其他行程重放中
+            target = f"{mine}.{os.getpid()}.{len(claimed)}"
+            os.replace(path, target)
+            os.utime(target)         # 改名不更新修改時間；重設後其他行程才不會當成逾時再認領
+            claimed.append(target)
+        except OSError:
+            pass                     # 其他行程已認領
+    return claimed
+
+def _replay_journal():
+    """在寫入執行緒上重放 journal：認領的檔案寫入成功後刪除，失敗時剩餘的紀錄寫回 journal"""
+    for path in _claim_journal():
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [tuple(json.loads(line)) for line in f if line.strip()]
+        for start in range(0, len(rows), MAX_BATCH):
+            batch = rows[start:start + MAX_BATCH]
+            if not _write_batch(batch):
+                _append_journal(rows[start:])
+                break
+            _stats["replayed"] += len(batch)
+        os.remove(path)
+
+def _derived_loop():
+    while True:
+        _derived_pending.wait()
+        time.sleep(DERIVED_DELAY)
+        _derived_pending.clear()     # 補算期間寫入的批次會再觸發下一輪
+        _catch_up_derived()
+
+def _catch_up_derived():
+    # 彙總表、難度校準與掌握度皆以 answer_log.id 水位補算，失敗時下一輪或頁面讀取時會再補上
+    with _derived_lock:
+        for name, catch_up in (("作答統計彙總", rollups.catch_up), ("難度校準", calibration.catch_up),
+                               ("知識追蹤", knowledge_tracing.catch_up)):
+            try:
+                catch_up()
+            except Exception:
+                logger.exception("更新%s失敗", name)
+
+def shutdown():
+    """寫完佇列中剩餘的紀錄並停止背景執行緒，尚未補算的衍生資料立即補算"""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        _queue.put(_STOP)
+        _thread.join()
+    _thread = None
+    if _derived_pending.is_set():
+        _derived_pending.clear()
+        _catch_up_derived()
+
+atexit.register(shutdown)
@@ -0,0 +1,70 @@
+# 檔案路徑：learning_assistant/data_store/bank_cache.py
+
+# 題庫行程內快取：題庫只在管理員編修/匯入時才會變動，
+# 讀取端（出題、錯題本、題組維護）一律經由這裡取得已解析好的資料。
+#
+# 失效判斷採兩層版本：
+# 1. PRAGMA data_version：由一條只讀不寫的監看連線查詢，任何其他連線（含其他行程）
+#    提交寫入後數值就會改變。
+# 2. 本地版本號：import_from_json、populate_* 等寫入端完成後呼叫 bump_bank_version()，
+#    涵蓋重建/覆蓋資料庫檔案等 data_version 偵測不到的情況。
+#
+# 快取內容為共用物件，呼叫端請視為唯讀，不要就地修改。
+
+import threading
+from data_store.db import QUESTION_BANK, open_connection, resolve_path
+
+_lock = threading.RLock()
+_local_version = 0
+_watch_conn = None
+_watch_path = None
+_cached_version = None
+_entries = {}
+
+def bump_bank_version():
+    """題庫寫入後呼叫，讓所有快取在下一次讀取時重新載入"""
+    global _local_version
+    with _lock:
+        _local_version += 1
+
+def _data_version():
+    global _watch_conn, _watch_path
+    path = resolve_path(QUESTION_BANK)
+    if _watch_conn is None or _watch_path != path:
+        # 監看連線獨立於連線池：只讀不寫，才能看到所有其他連線的提交
+        _watch_conn = open_connection(QUESTION_BANK, check_same_thread=False)
+        _watch_path = path
+    return _watch_conn.execute("PRAGMA data_version").fetchone()[0]
+
+def current_version():
+    with _lock:
+        data_version = _data_version()
+        return (_local_version, _watch_path, data_version)
+
+def get_cached(name, loader):
+    """
+    讀穿式快取：name 為快取鍵，loader() 在快取失效或尚未載入時呼叫。
+    同一版本內重複讀取直接回傳記憶體中的物件。
+    """
+    global _cached_version
+    with _lock:
+        version = current_version()
+        if version != _cached_version:
+            _entries.clear()
+            _cached_version = version
+        if name in _entries:
+            return _entries[name]
+
+    value = loader()
+
+    with _lock:
+        # 載入期間若題庫又被改寫，版本不同就不寫入，下次讀取會重新載入
+        if _cached_version == version:
+            _entries[name] = value
+    return value
+
+def clear_cache():
+    global _cached_version
+    with _lock:
+        _entries.clear()
+        _cached_version = None
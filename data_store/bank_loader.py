@@ -0,0 +1,115 @@
+# 檔案路徑：learning_assistant/data_store/bank_loader.py
+
+# 題庫載入共用層：question_loader 與 question_group_loader 共用同一套查詢，
+# 以兩次集合查詢取回所有題組與子題，避免每個題組各查一次（N+1）。
+# 回傳的一律是 question_record 的 Question / QuestionGroup。
+
+from data_store.question_record import Question, QuestionGroup
+
+QUESTION_COLUMNS = "id, content, options, answer, explanation, topic, difficulty, question_type, keywords, paragraph"
+GROUP_COLUMNS = "id, title, reading_text, category"
+
+# === 取得所有題組（含子題）===
+def load_groups(conn):
+    """回傳 QuestionGroup list（依題組 id 排序），子題依 id 排序"""
+    c = conn.cursor()
+    c.execute(f"SELECT {GROUP_COLUMNS} FROM question_groups ORDER BY id")
+    result = [QuestionGroup.from_row(row) for row in c.fetchall()]
+    if not result:
+        return result
+    groups_by_id = {g.group_id: g for g in result}
+
+    # 依主鍵順序掃描所有子題，單次走訪即分配到所屬題組
+    c.execute(f"""
+        SELECT group_id, {QUESTION_COLUMNS}
+        FROM questions
+        WHERE group_id IS NOT NULL
+        ORDER BY id
+    """)
+    for row in c:
+        group = groups_by_id.get(row[0])
+        if group is not None:
+            group.questions.append(Question.from_row(row[1:], group))
+    return result
+
+# === 取得單一題組（含子題）===
+def load_group(conn, group_id):
+    """只取出指定題組，找不到時回傳 None"""
+    c = conn.cursor()
+    c.execute(f"SELECT {GROUP_COLUMNS} FROM question_groups WHERE id = ?", (group_id,))
+    row = c.fetchone()
+    if not row:
+        return None
+    group = QuestionGroup.from_row(row)
+    c.execute(f"""
+        SELECT {QUESTION_COLUMNS}
+        FROM questions
+        WHERE group_id = ?
+        ORDER BY id
+    """, (group_id,))
+    group.questions = [Question.from_row(q, group) for q in c.fetchall()]
+    return group
+
+# === 取得所有單題 ===
+def load_single_questions(conn):
+    c = conn.cursor()
+    c.execute(f"SELECT {QUESTION_COLUMNS} FROM questions WHERE group_id IS NULL ORDER BY id")
+    return [Question.from_row(row) for row in c.fetchall()]
+
+# === 依 id 取出一題（單題或題組小題）===
+def load_question(conn, qid, single_only=False):
+    """
+    題組小題會連同所屬題組一併載入（q.group 可取得閱讀文本與其他小題）；
+    single_only=True 時只接受單題。找不到回傳 None。
+    """
+    c = conn.cursor()
+    c.execute(f"SELECT group_id, {QUESTION_COLUMNS} FROM questions WHERE id = ?", (qid,))
+    row = c.fetchone()
+    if not row:
+        return None
+    group_id = row[0]
+    if group_id is None:
+        return Question.from_row(row[1:])
+    if single_only:
+        return None
+    group = load_group(conn, group_id)
+    if group is None:
+        # 題組已刪除但小題仍在：視為單題
+        return Question.from_row(row[1:])
+    for q in group.questions:
+        if q.id == row[1]:
+            return q
+    return None
+
+# === 依多個 id 一次取出（錯題本等清單頁用）===
+MAX_SQL_PARAMS = 900   # SQLite 預設參數上限 999，保留餘裕
+
+def load_questions(conn, ids):
+    """
+    以 questions LEFT JOIN question_groups 一次取出多題，回傳 {id: Question}（找不到的 id 不列入）。
+    題組小題的 q.group 只帶題組標題、閱讀文本與分類（group.questions 不載入）。
+    id 超過 MAX_SQL_PARAMS 個時分段查詢。
+    """
+    ids = list(dict.fromkeys(ids))
+    result = {}
+    groups = {}
+    c = conn.cursor()
+    for start in range(0, len(ids), MAX_SQL_PARAMS):
+        chunk = ids[start:start + MAX_SQL_PARAMS]
+        c.execute(f"""
+            SELECT g.id, g.title, g.reading_text, g.category,
+                   {", ".join("q." + col.strip() for col in QUESTION_COLUMNS.split(","))}
+            FROM questions q
+            LEFT JOIN question_groups g ON g.id = q.group_id
+            WHERE q.id IN ({", ".join("?" * len(chunk))})
+        """, chunk)
+        for row in c:
+            gid = row[0]   # 題組已刪除時為 NULL，該小題視為單題（同 load_question）
+            group = None
+            if gid is not None:
+                group = groups.get(gid)
+                if group is None:
+                    group = groups[gid] = QuestionGroup(gid, *row[1:4])
+            q = Question.from_row(row[4:], group)
+            result[q.id] = q
+    return result
@@ -0,0 +1,242 @@
+# 檔案路徑：learning_assistant/data_store/bulk_importer.py
+
+# 題庫批次匯入：逐段讀取 JSON 陣列 / JSONL 檔，不需整份載入記憶體；
+# 每累積 CHUNK_QUESTIONS 題以 executemany 在同一交易內寫入題組與題目。
+#
+# 中斷續傳：每批寫入時，同一交易內一併更新 import_progress（以檔案內容 SHA-1 為鍵）
+# 記錄已完成的項目數；重新匯入同一檔案會從上次成功的位置繼續，不會重複建立題組。
+#
+# 項目格式同 question_group_loader.import_from_json：
+#   題組 {"group": {...}, "questions": [...]}，或單題 {...}；欄位中英文鍵名皆可
+#
+# 手動執行：python -m data_store.bulk_importer 題庫.json [--force]
+
+import hashlib
+import json
+import os
+import sys
+import time
+from data_store.bank_cache import bump_bank_version
+from data_store.db import QUESTION_BANK, get_connection, transaction
+
+CHUNK_QUESTIONS = 5000
+READ_SIZE = 1 << 20
+
+QUESTION_INSERT_SQL = """
+    INSERT INTO questions (group_id, content, options, answer, explanation, topic, difficulty, question_type, keywords, paragraph)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+GROUP_INSERT_SQL = "INSERT INTO question_groups (id, title, reading_text, category) VALUES (?, ?, ?, ?)"
+
+# === 逐段解析 ===
+def iter_json_items(fp, read_size=READ_SIZE):
+    """
+    從文字檔逐一產生頂層項目：
+    - 開頭為 [ 時視為 JSON 陣列，逐一解析陣列元素
+    - 否則視為 JSONL（或多個連續的 JSON 物件）
+    """
+    decoder = json.JSONDecoder()
+    buf = fp.read(read_size)
+    eof = not buf
+    pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while pos < len(buf) and buf[pos] in chars:
+            pos += 1
+
+    skip(" \t\r\n")
+    in_array = buf[pos:pos + 1] == "["
+    if in_array:
+        pos += 1
+    separators = " \t\r\n," if in_array else " \t\r\n"
+
+    while True:
+        skip(separators)
+        if in_array and buf[pos:pos + 1] == "]":
+            return
+        if pos >= len(buf) and eof:
+            if in_array:
+                raise ValueError("JSON 陣列未正確結尾（缺少 ]）")
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+            # 剛好解析到緩衝區尾端時，無法確定項目已完整（例如數字被截斷），先補讀
+            complete = end < len(buf) or eof
+        except ValueError:
+            if eof:
+                raise
+            complete = False
+        if complete:
+            yield item
+            pos = end
+            continue
+        more = fp.read(read_size)
+        eof = not more
+        buf = buf[pos:] + more
+        pos = 0
+
+def file_fingerprint(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# === 欄位整理（每題都會執行，直接以 dict.get 取值）===
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+
+def _question_row(q, group_id):
+    get = q.get
+    content = get("content") or get("題幹")
+    if not content:
+        return None
+    keywords = get("keywords") or get("關鍵詞")
+    if isinstance(keywords, (list, tuple)):
+        keywords = ", ".join(keywords)
+    options = get("選項") or get("options") or {}
+    difficulty = get("difficulty")
+    if difficulty is None:
+        difficulty = get("難度", 1)
+    return (
+        group_id, content,
+        options if isinstance(options, str) else _encode_json(options),
+        get("answer") or get("正解"),
+        get("explanation") or get("解析"),
+        get("topic") or get("主題"),
+        difficulty,
+        get("question_type") or get("題型") or "單選",
+        keywords,
+        get("paragraph") or get("段落"),
+    )
+
+def _next_group_id(conn):
+    # AUTOINCREMENT 不重用已刪除的 id，需同時參考 sqlite_sequence
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM question_groups").fetchone()[0]
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'question_groups'").fetchone()
+    return max(max_id, row[0] if row else 0) + 1
+
+# === 寫入一批 ===
+def _write_chunk(items, stats, source_key):
+    with transaction(QUESTION_BANK, immediate=True) as conn:
+        # 在寫入鎖內配置題組 id，整批題組與子題各一次 executemany
+        next_gid = _next_group_id(conn)
+        group_rows, question_rows = [], []
+        for item in items:
+            if isinstance(item, dict) and "group" in item and "questions" in item:
+                g = item["group"] or {}
+                gid = next_gid
+                next_gid += 1
+                group_rows.append((gid, g.get("title") or g.get("題組標題"), g.get("reading_text") or g.get("閱讀文本"),
+                                   g.get("category") or g.get("分類")))
+                rows = [_question_row(q, gid) for q in item["questions"] or []]
+            elif isinstance(item, dict):
+                rows = [_question_row(item, None)]
+            else:
+                rows = [None]
+            stats["skipped"] += sum(r is None for r in rows)
+            question_rows.extend(r for r in rows if r is not None)
+
+        conn.executemany(GROUP_INSERT_SQL, group_rows)
+        conn.executemany(QUESTION_INSERT_SQL, question_rows)
+        stats["items"] += len(items)
+        stats["groups"] += len(group_rows)
+        stats["questions"] += len(question_rows)
+        if source_key:
+            conn.execute("""
+                UPDATE import_progress
+                SET items_done = items_done + ?, groups_done = groups_done + ?, questions_done = questions_done + ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE source_key = ?
+            """, (len(items), len(group_rows), len(question_rows), source_key))
+
+def _report(stats, start, progress):
+    stats["elapsed"] = time.perf_counter() - start
+    stats["rows_per_sec"] = stats["questions"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    if progress:
+        progress(dict(stats))
+
+def import_items(items, progress=None, chunk_size=CHUNK_QUESTIONS, source_key=None, skip=0):
+    """
+    匯入可迭代的項目（list 或 iter_json_items 的產生器）。
+    progress(stats) 於每批寫入後呼叫，stats 含 items / groups / questions / skipped / elapsed / rows_per_sec。
+    skip: 續傳時略過前 skip 個項目（已於先前匯入）。
+    """
+    stats = {"items": 0, "groups": 0, "questions": 0, "skipped": 0,
+             "resumed_from": skip, "elapsed": 0.0, "rows_per_sec": 0.0}
+    start = time.perf_counter()
+    batch, batch_questions = [], 0
+    try:
+        for i, item in enumerate(items):
+            if i < skip:
+                continue
+            batch.append(item)
+            batch_questions += len(item.get("questions") or []) if isinstance(item, dict) and "group" in item else 1
+            if batch_questions >= chunk_size:
+                _write_chunk(batch, stats, source_key)
+                _report(stats, start, progress)
+                batch, batch_questions = [], 0
+        if batch:
+            _write_chunk(batch, stats, source_key)
+        _report(stats, start, progress)
+    finally:
+        if stats["items"]:
+            bump_bank_version()
+    return stats
+
+def import_file(path, progress=None, chunk_size=CHUNK_QUESTIONS, force=False):
+    """
+    串流匯入 JSON 陣列或 JSONL 檔。同一檔案中斷後重新匯入會自動續傳；
+    已完整匯入過的檔案不會再匯入一次（force=True 可強制重新匯入）。
+    回傳 stats（見 import_items），另含 already_done 表示是否因已匯入而略過。
+    """
+    source_key = file_fingerprint(path)
+    conn = get_connection(QUESTION_BANK)
+    row = conn.execute("SELECT items_done, status FROM import_progress WHERE source_key = ?",
+                       (source_key,)).fetchone()
+    if row and row[1] == "done" and not force:
+        return {"items": 0, "groups": 0, "questions": 0, "skipped": 0, "resumed_from": row[0],
+                "elapsed": 0.0, "rows_per_sec": 0.0, "already_done": True}
+    skip = row[0] if row and row[1] != "done" else 0
+    with transaction(QUESTION_BANK) as conn:
+        conn.execute("""
+            INSERT INTO import_progress (source_key, source_name, items_done, status)
+            VALUES (?, ?, ?, 'running')
+            ON CONFLICT(source_key) DO UPDATE SET
+                source_name = excluded.source_name, items_done = excluded.items_done,
+                groups_done = CASE WHEN excluded.items_done = 0 THEN 0 ELSE groups_done END,
+                questions_done = CASE WHEN excluded.items_done = 0 THEN 0 ELSE questions_done END,
+                status = 'running', updated_at = CURRENT_TIMESTAMP
+        """, (source_key, os.path.basename(path), skip))
+
+    with open(path, "r", encoding="utf-8-sig") as fp:
+        stats = import_items(iter_json_items(fp), progress, chunk_size, source_key, skip)
+
+    with transaction(QUESTION_BANK) as conn:
+        conn.execute("UPDATE import_progress SET status = 'done', updated_at = CURRENT_TIMESTAMP WHERE source_key = ?",
+                     (source_key,))
+    stats["already_done"] = False
+    return stats
+
+def format_stats(stats):
+    text = (f"{stats['questions']:,} 題（題組 {stats['groups']:,}），"
+            f"{stats['elapsed']:.2f}s，{stats['rows_per_sec']:,.0f} 題/秒")
+    if stats["resumed_from"]:
+        text += f"，自第 {stats['resumed_from'] + 1:,} 筆續傳"
+    if stats["skipped"]:
+        text += f"，略過 {stats['skipped']:,} 題（缺少題幹）"
+    return text
+
+def main(argv):
+    if not argv:
+        print("用法：python -m data_store.bulk_importer 題庫.json|題庫.jsonl [--force]")
+        sys.exit(1)
+    stats = import_file(argv[0], progress=lambda s: print(f"[匯入中] {format_stats(s)}"),
+                        force="--force" in argv)
+    if stats["already_done"]:
+        print("此檔案已完整匯入過，如需重新匯入請加上 --force")
+    else:
+        print(f"✅ 匯入完成：{format_stats(stats)}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
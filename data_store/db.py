@@ -0,0 +1,109 @@
+# 檔案路徑：learning_assistant/data_store/db.py
+
+# SQLite 連線管理：所有模組統一由這裡取得連線，不再各自 sqlite3.connect()/close()。
+# - 每個執行緒對每個資料庫只開一條連線並重複使用（Streamlit 每個 session 跑在自己的執行緒）
+# - 開啟時套用一致的 PRAGMA（WAL、busy_timeout、快取與 mmap、外鍵檢查）
+# - 寫入一律包在 transaction() 內，離開區塊時自動 commit，發生例外則 rollback
+# - 每個行程第一次開啟 question_bank / user_log 時，自動套用 database/migrations.py 的結構升級
+# - get_log_connection() 在 user_log 連線上 ATTACH 題庫（qb），作答紀錄與題目可在 SQL 內直接 JOIN
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+QUESTION_BANK = "question_bank"
+USER_LOG = "user_log"
+BANK_SCHEMA = "qb"   # get_log_connection() 上題庫的 schema 名稱：qb.questions、qb.question_groups
+
+# 資料庫代號 → 檔案路徑；其他字串視為檔案路徑直接使用
+DB_PATHS = {
+    QUESTION_BANK: "data_store/question_bank.sqlite",
+    USER_LOG: "data_store/user_log.sqlite",
+}
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",     # WAL 模式下可安全降低 fsync 次數
+    "PRAGMA busy_timeout = 5000",      # 遇到寫入鎖時最多等待 5 秒，而非直接 database is locked
+    "PRAGMA cache_size = -16000",      # 每條連線約 16MB 頁面快取
+    "PRAGMA mmap_size = 268435456",    # 256MB 記憶體映射讀取
+    "PRAGMA foreign_keys = ON",
+)
+
+_local = threading.local()
+_migrated = set()
+_migrate_lock = threading.Lock()
+
+def resolve_path(db):
+    return DB_PATHS.get(db, db)
+
+def open_connection(db, **kwargs):
+    """開一條套用標準 PRAGMA 的新連線（不進連線池，呼叫端自行管理）"""
+    conn = sqlite3.connect(resolve_path(db), **kwargs)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def get_connection(db=QUESTION_BANK):
+    """取得本執行緒專用的連線，同一執行緒重複呼叫回傳同一條，呼叫端不需 close()"""
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = _local.pool = {}
+    key = os.path.abspath(resolve_path(db))
+    conn = pool.get(key)
+    if conn is None:
+        conn = pool[key] = open_connection(db)
+        _ensure_migrated(db, key, conn)
+    return conn
+
+def get_log_connection():
+    """
+    取得本執行緒的 user_log 連線，並確保題庫已 ATTACH 為 qb：
+        SELECT ... FROM answer_log a LEFT JOIN qb.questions q ON q.id = a.question_id
+    ATTACH 不能在交易中執行，請在開始寫入交易之前取得。
+    """
+    conn = get_connection(USER_LOG)
+    if BANK_SCHEMA not in {row[1] for row in conn.execute("PRAGMA database_list")}:
+        get_connection(QUESTION_BANK)   # 確保題庫已套用結構升級
+        conn.execute(f"ATTACH DATABASE ? AS {BANK_SCHEMA}", (os.path.abspath(resolve_path(QUESTION_BANK)),))
+        conn.execute(f"PRAGMA {BANK_SCHEMA}.cache_size = -16000")
+    return conn
+
+def _ensure_migrated(db, key, conn):
+    if db not in (QUESTION_BANK, USER_LOG) or key in _migrated:
+        return
+    with _migrate_lock:
+        if key in _migrated:
+            return
+        from database.migrations import migrate
+        migrate(conn, db)
+        _migrated.add(key)
+
+@contextmanager
+def transaction(db=QUESTION_BANK, immediate=False):
+    """
+    with transaction(USER_LOG) as conn: ...
+    正常離開時 commit，例外時 rollback；巢狀使用時沿用外層交易。
+    immediate=True 會在開頭就取得寫入鎖，適合「先讀後寫」的流程。
+    """
+    conn = get_connection(db)
+    if conn.in_transaction:
+        yield conn
+        return
+    if immediate:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+def close_connections():
+    """關閉本執行緒連線池中的所有連線（工具腳本結束或測試切換資料庫時使用）"""
+    pool = getattr(_local, "pool", None) or {}
+    for conn in pool.values():
+        conn.close()
+    pool.clear()
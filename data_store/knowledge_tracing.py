@@ -0,0 +1,214 @@
+# 檔案路徑：learning_assistant/data_store/knowledge_tracing.py
+
+# 知識追蹤（Bayesian Knowledge Tracing）：為每位學生的每個主題/關鍵詞維護「已掌握」機率，
+# 存於 user_log.mastery（每人每技能一列）。學習歷程、AI 總結與推薦直接讀掌握度，
+# 不必再由大量原始作答紀錄推算弱點。
+#
+# 每筆作答對題目所屬的每個技能（主題、各關鍵詞）做一次 O(1) 更新：
+#   答對：p' = p(1-S) / (p(1-S) + (1-p)G)；答錯：p' = pS / (pS + (1-p)(1-G))
+#   學習轉移：p'' = p' + (1-p')T
+# - catch_up()：以 answer_log.id 為水位（rollup_state 的 'knowledge_tracing' 列）逐批更新，
+#   answer_log_writer 每批寫入後呼叫
+# - replay()：清空後重播全部歷史紀錄（冷啟動、調整參數後）。以 numpy 將同一步的所有
+#   （學生, 技能）序列一起更新，結果與逐筆 catch_up() 相同
+#
+# 手動執行：python -m data_store.knowledge_tracing [--replay]
+
+import sys
+import time
+
+import numpy as np
+
+from data_store.db import QUESTION_BANK, USER_LOG, get_connection, transaction
+from data_store.question_loader import get_questions_by_ids
+
+BATCH_SIZE = 5000
+FETCH_SIZE = 100_000
+DIMENSIONS = ("topic", "keyword")
+P_INIT = 0.3      # 初始掌握機率
+P_LEARN = 0.1     # 每次練習後由未掌握轉為掌握的機率 T
+P_SLIP = 0.1      # 已掌握卻答錯 S
+P_GUESS = 0.25    # 未掌握卻猜對 G（四選一）
+MASTERED = 0.95   # 掌握度達此值視為已掌握
+
+_UPSERT_SQL = """
+    INSERT INTO mastery (user_id, dimension, skill, p_mastery, attempts, correct, last_log_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, dimension, skill) DO UPDATE SET
+        p_mastery = excluded.p_mastery, attempts = excluded.attempts,
+        correct = excluded.correct, last_log_id = excluded.last_log_id
+"""
+
+def update(p, is_correct):
+    """單次作答後的掌握機率"""
+    if is_correct:
+        posterior = p * (1 - P_SLIP) / (p * (1 - P_SLIP) + (1 - p) * P_GUESS)
+    else:
+        posterior = p * P_SLIP / (p * P_SLIP + (1 - p) * (1 - P_GUESS))
+    return posterior + (1 - posterior) * P_LEARN
+
+def _skills(topic, keywords):
+    """題目對應的技能：[(dimension, skill)]，關鍵詞切分方式同 Question.keyword_list()"""
+    skills = [("topic", topic)] if topic else []
+    skills += [("keyword", kw) for kw in dict.fromkeys(k.strip() for k in (keywords or "").split(",")) if kw]
+    return skills
+
+# === 線上增量 ===
+def _watermark(conn):
+    row = conn.execute("SELECT last_log_id FROM rollup_state WHERE name = 'knowledge_tracing'").fetchone()
+    return row[0] if row else 0
+
+def _set_watermark(conn, last_id):
+    conn.execute("""
+        INSERT INTO rollup_state (name, last_log_id) VALUES ('knowledge_tracing', ?)
+        ON CONFLICT(name) DO UPDATE SET last_log_id = excluded.last_log_id
+    """, (last_id,))
+
+def _catch_up_batch(conn, batch_size):
+    rows = conn.execute("""
+        SELECT id, user_id, question_id, is_correct FROM answer_log
+        WHERE id > ? ORDER BY id LIMIT ?
+    """, (_watermark(conn), batch_size)).fetchall()
+    if not rows:
+        return 0
+    questions = get_questions_by_ids({row[2] for row in rows if row[2] is not None})
+    states = {}
+    loaded = set()
+    for log_id, user_id, qid, is_correct in rows:
+        q = questions.get(qid)
+        if user_id is None or q is None:
+            continue
+        if user_id not in loaded:
+            # 每位學生只讀一次目前的掌握狀態
+            for dimension, skill, p, attempts, correct in conn.execute(
+                    "SELECT dimension, skill, p_mastery, attempts, correct FROM mastery WHERE user_id = ?", (user_id,)):
+                states[(user_id, dimension, skill)] = [p, attempts, correct, 0]
+            loaded.add(user_id)
+        for dimension, skill in _skills(q.topic, q.keywords):
+            state = states.setdefault((user_id, dimension, skill), [P_INIT, 0, 0, 0])
+            state[0] = update(state[0], is_correct)
+            state[1] += 1
+            state[2] += 1 if is_correct else 0
+            state[3] = log_id
+    conn.executemany(_UPSERT_SQL, [(*key, *state) for key, state in states.items() if state[3]])
+    _set_watermark(conn, rows[-1][0])
+    return len(rows)
+
+def catch_up(batch_size=BATCH_SIZE):
+    """把水位之後的作答納入掌握度，回傳處理筆數"""
+    total = 0
+    while True:
+        with transaction(USER_LOG, immediate=True) as conn:
+            n = _catch_up_batch(conn, batch_size)
+        total += n
+        if n < batch_size:
+            return total
+
+# === 全量重播 ===
+def _skill_table():
+    """(題號 → 列, 每題技能 CSR 起點, 技能代碼, 技能標籤 [(dimension, skill)])"""
+    labels, codes = [], {}
+    qids, ptr, skills = [], [0], []
+    for qid, topic, keywords in get_connection(QUESTION_BANK).execute("SELECT id, topic, keywords FROM questions ORDER BY id"):
+        for label in _skills(topic, keywords):
+            if label not in codes:
+                codes[label] = len(labels)
+                labels.append(label)
+            skills.append(codes[label])
+        qids.append(qid)
+        ptr.append(len(skills))
+    return np.array(qids, dtype=np.int64), np.array(ptr, dtype=np.int64), np.array(skills, dtype=np.int64), labels
+
+def _load_log(conn):
+    c = conn.execute("""
+        SELECT id, user_id, CAST(question_id AS INTEGER), COALESCE(is_correct, 0) FROM answer_log
+        WHERE user_id IS NOT NULL ORDER BY id
+    """)
+    chunks = []
+    while True:
+        rows = c.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        chunks.append(np.array(rows, dtype=np.int64).reshape(-1, 4))
+    return np.concatenate(chunks) if chunks else np.empty((0, 4), dtype=np.int64)
+
+def replay():
+    """清空掌握度並重播全部作答紀錄，回傳統計 dict"""
+    start = time.perf_counter()
+    qids, ptr, skill_codes, labels = _skill_table()
+    with transaction(USER_LOG, immediate=True) as conn:
+        log = _load_log(conn)
+        last_id = int(log[-1, 0]) if len(log) else _watermark(conn)
+        # 只保留題庫中找得到的題目，展開成「每筆作答 × 每個技能」的事件（仍依 id 排序）
+        pos = np.minimum(np.searchsorted(qids, log[:, 2]), max(len(qids) - 1, 0))
+        found = qids[pos] == log[:, 2] if len(qids) else np.zeros(len(log), dtype=bool)
+        log, pos = log[found], pos[found]
+        counts = ptr[pos + 1] - ptr[pos]
+        row = np.repeat(np.arange(len(log)), counts)
+        offset = np.arange(len(row)) - np.repeat(np.cumsum(counts) - counts, counts)
+        skill = skill_codes[ptr[pos][row] + offset]
+
+        # 序列 = (學生, 技能)；依序列排序後，同一序列內的事件仍依 answer_log.id 先後
+        users, user_code = np.unique(log[row, 1], return_inverse=True)
+        chain_key = user_code * max(len(labels), 1) + skill
+        chain_ids, chain = np.unique(chain_key, return_inverse=True)
+        order = np.argsort(chain, kind="stable")
+        chain_sorted = chain[order]
+        starts = np.searchsorted(chain_sorted, np.arange(len(chain_ids)))
+        step = np.empty(len(order), dtype=np.int64)
+        step[order] = np.arange(len(order)) - starts[chain_sorted]
+
+        # 第 k 步：所有長度超過 k 的序列同時更新一次
+        correct = log[row, 3] == 1
+        p = np.full(len(chain_ids), P_INIT)
+        by_step = np.argsort(step, kind="stable")
+        bounds = np.searchsorted(step[by_step], np.arange(step.max() + 2 if len(step) else 1))
+        for k in range(len(bounds) - 1):
+            events = by_step[bounds[k]:bounds[k + 1]]
+            c, y = chain[events], correct[events]
+            pc = p[c]
+            posterior = np.where(y, pc * (1 - P_SLIP) / (pc * (1 - P_SLIP) + (1 - pc) * P_GUESS),
+                                 pc * P_SLIP / (pc * P_SLIP + (1 - pc) * (1 - P_GUESS)))
+            p[c] = posterior + (1 - posterior) * P_LEARN
+
+        attempts = np.bincount(chain, minlength=len(chain_ids))
+        right = np.bincount(chain, weights=correct, minlength=len(chain_ids)).astype(np.int64)
+        last_log = np.zeros(len(chain_ids), dtype=np.int64)
+        np.maximum.at(last_log, chain, log[row, 0])
+        n_labels = max(len(labels), 1)
+        conn.execute("DELETE FROM mastery")
+        conn.executemany(_UPSERT_SQL, (
+            (int(users[key // n_labels]), *labels[key % n_labels], pi, int(a), int(r), int(last))
+            for key, pi, a, r, last in zip(chain_ids.tolist(), p.tolist(), attempts, right, last_log)))
+        _set_watermark(conn, last_id)
+    return {"responses": len(log), "updates": len(row), "skills": len(chain_ids),
+            "steps": len(bounds) - 1, "seconds": time.perf_counter() - start}
+
+# === 讀取 ===
+def get_mastery(user_id, dimension="topic"):
+    """[(技能, 掌握機率, 作答數, 答對數)]，掌握度由低到高"""
+    return get_connection(USER_LOG).execute("""
+        SELECT skill, p_mastery, attempts, correct FROM mastery
+        WHERE user_id = ? AND dimension = ?
+        ORDER BY p_mastery, skill
+    """, (user_id, dimension)).fetchall()
+
+def mastery_vector(user_id, dimension="topic"):
+    """{技能: 掌握機率}"""
+    return {skill: p for skill, p, _, _ in get_mastery(user_id, dimension)}
+
+def weakest_skills(user_id, dimension="topic", n=5, min_attempts=3):
+    """作答數達 min_attempts 且尚未掌握的技能，掌握度最低的 n 個：[(技能, 掌握機率, 作答數)]"""
+    return [(skill, p, attempts) for skill, p, attempts, _ in get_mastery(user_id, dimension)
+            if attempts >= min_attempts and p < MASTERED][:n]
+
+def main(argv):
+    if "--replay" in argv:
+        stats = replay()
+        print(f"✅ 重播完成：作答 {stats['responses']:,} 筆、更新 {stats['updates']:,} 次、"
+              f"{stats['skills']:,} 個（學生, 技能），{stats['seconds']:.1f}s")
+    else:
+        print(f"已納入 {catch_up():,} 筆作答紀錄")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,195 @@
+# 檔案路徑：learning_assistant/data_store/log_export.py
+
+# 作答紀錄離線分析匯出：answer_log 對照題庫（主題、關鍵詞、難度、題型）與班級，
+# 寫成壓縮的 Arrow IPC 欄式檔案，依作答日期分區：
+#   EXPORT_DIR/date=2025-05-01/part-000000000001-000000005000.arrow
+#
+# 增量匯出：以 answer_log.id 為水位，只匯出上次之後的新紀錄；每次匯出的所有分區檔
+# 寫完後才更新 _state.json，中斷時留下的未記錄分區檔在下次匯出前刪除，不會重複。
+#
+# 讀取端（read_answers / StudentModel.from_export）以記憶體映射開啟匯出檔，
+# 分析時不需連線正式資料庫。
+#
+# 手動執行：python -m data_store.log_export [匯出目錄]
+
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+from data_store.db import get_log_connection
+
+EXPORT_DIR = "data_store/exports/answer_log"
+BATCH_SIZE = 50_000
+COMPRESSION = "zstd"
+STATE_FILE = "_state.json"
+
+_PART_RE = re.compile(r"part-(\d+)-(\d+)\.arrow$")
+
+SCHEMA = pa.schema([
+    ("log_id", pa.int64()),
+    ("timestamp", pa.string()),
+    ("user_id", pa.int32()),
+    ("class_name", pa.dictionary(pa.int32(), pa.string())),
+    ("question_id", pa.string()),
+    ("group_id", pa.int32()),
+    ("sub_id", pa.int32()),
+    ("student_answer", pa.dictionary(pa.int32(), pa.string())),
+    ("correct_answer", pa.dictionary(pa.int32(), pa.string())),
+    ("is_correct", pa.bool_()),
+    ("topic", pa.dictionary(pa.int32(), pa.string())),
+    ("keywords", pa.string()),
+    ("difficulty", pa.int16()),
+    ("question_type", pa.dictionary(pa.int32(), pa.string())),
+])
+
+_EXPORT_SQL = """
+    SELECT a.id, a.timestamp, a.user_id, u.class_name, a.question_id, a.group_id, a.sub_id,
+           a.student_answer, a.correct_answer, a.is_correct,
+           q.topic, q.keywords, q.difficulty, q.question_type
+    FROM answer_log a
+    LEFT JOIN users u ON u.id = a.user_id
+    LEFT JOIN qb.questions q ON q.id = a.question_id
+    WHERE a.id > ?
+    ORDER BY a.id
+    LIMIT ?
+"""
+
+# === 水位 ===
+def _read_state(export_dir):
+    try:
+        with open(os.path.join(export_dir, STATE_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"last_log_id": 0, "rows": 0}
+
+def _write_state(export_dir, state):
+    path = os.path.join(export_dir, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+def _part_files(export_dir):
+    """[(分區日期, 檔案路徑, 起始 id, 結束 id)]，依日期、id 排序"""
+    parts = []
+    if not os.path.isdir(export_dir):
+        return parts
+    for entry in sorted(os.listdir(export_dir)):
+        if not entry.startswith("date="):
+            continue
+        for name in sorted(os.listdir(os.path.join(export_dir, entry))):
+            m = _PART_RE.match(name)
+            if m:
+                parts.append((entry[5:], os.path.join(export_dir, entry, name), int(m.group(1)), int(m.group(2))))
+    return parts
+
+def _remove_orphans(export_dir, last_log_id):
+    """刪除上次匯出中斷時、水位尚未記錄的分區檔"""
+    for _, path, first, _ in _part_files(export_dir):
+        if first > last_log_id:
+            os.remove(path)
+
+# === 匯出 ===
+def _as_int(value):
+    return value if isinstance(value, int) else None
+
+def _to_table(rows):
+    columns = list(zip(*rows))
+    columns[4] = [None if q is None else str(q) for q in columns[4]]
+    columns[9] = [None if c is None else bool(c) for c in columns[9]]
+    for i in (5, 6, 12):   # group_id, sub_id, difficulty：舊資料可能不是整數
+        columns[i] = [_as_int(v) for v in columns[i]]
+    arrays = []
+    for values, field in zip(columns, SCHEMA):
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=field.type.value_type).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=SCHEMA)
+
+def _write_part(export_dir, day, table, first, last):
+    part_dir = os.path.join(export_dir, f"date={day}")
+    os.makedirs(part_dir, exist_ok=True)
+    path = os.path.join(part_dir, f"part-{first:012d}-{last:012d}.arrow")
+    options = ipc.IpcWriteOptions(compression=COMPRESSION)
+    with pa.OSFile(path + ".tmp", "wb") as sink, ipc.new_file(sink, SCHEMA, options=options) as writer:
+        writer.write_table(table)
+    os.replace(path + ".tmp", path)
+
+def export_answers(export_dir=EXPORT_DIR, batch_size=BATCH_SIZE, progress=None):
+    """匯出水位之後的新作答紀錄，回傳本次匯出筆數"""
+    os.makedirs(export_dir, exist_ok=True)
+    state = _read_state(export_dir)
+    _remove_orphans(export_dir, state["last_log_id"])
+    conn = get_log_connection()
+    total = 0
+    while True:
+        rows = conn.execute(_EXPORT_SQL, (state["last_log_id"], batch_size)).fetchall()
+        if not rows:
+            break
+        by_day = defaultdict(list)
+        for row in rows:
+            by_day[(row[1] or "")[:10] or "unknown"].append(row)
+        first, last = rows[0][0], rows[-1][0]
+        for day, day_rows in by_day.items():
+            _write_part(export_dir, day, _to_table(day_rows), first, last)
+        state = {"last_log_id": last, "rows": state["rows"] + len(rows)}
+        _write_state(export_dir, state)
+        total += len(rows)
+        if progress:
+            progress(total, last)
+        if len(rows) < batch_size:
+            break
+    return total
+
+# === 讀取（記憶體映射，不連線正式資料庫）===
+def read_answers(export_dir=EXPORT_DIR, start_date=None, end_date=None, user_ids=None, columns=None):
+    """
+    讀取匯出檔為 pyarrow.Table；依日期範圍（含頭尾，'YYYY-MM-DD'）只開啟需要的分區，
+    user_ids 指定時只保留這些學生的紀錄，columns 指定時只取這些欄位。
+    """
+    state = _read_state(export_dir)
+    read_options = None
+    if columns is not None:
+        # 只解壓/讀取需要的欄位（含篩選用的 user_id）
+        needed = set(columns) | ({"user_id"} if user_ids is not None else set())
+        read_options = ipc.IpcReadOptions(included_fields=[i for i, name in enumerate(SCHEMA.names) if name in needed])
+    tables = []
+    for day, path, first, _ in _part_files(export_dir):
+        if first > state["last_log_id"]:
+            continue
+        if (start_date and day < start_date) or (end_date and day > end_date):
+            continue
+        # 不關閉映射：未壓縮的欄位緩衝區直接引用映射區段
+        table = ipc.open_file(pa.memory_map(path, "r"), options=read_options).read_all()
+        if user_ids is not None:
+            table = table.filter(pc.is_in(table["user_id"], value_set=pa.array(list(user_ids), pa.int32())))
+        if columns is not None:
+            table = table.select(columns)
+        tables.append(table)
+    if not tables:
+        schema = SCHEMA if columns is None else pa.schema([SCHEMA.field(c) for c in columns])
+        return schema.empty_table()
+    return pa.concat_tables(tables).combine_chunks()
+
+def dictionary_codes(column):
+    """(不重複值 list, int32 代碼 ndarray)：以 Arrow dictionary 編碼取得代碼，不經逐列 Python 物件"""
+    encoded = column.fill_null("").dictionary_encode().combine_chunks()
+    return encoded.dictionary.to_pylist(), encoded.indices.to_numpy(zero_copy_only=False)
+
+def export_watermark(export_dir=EXPORT_DIR):
+    """已匯出的最後一筆 answer_log.id"""
+    return _read_state(export_dir)["last_log_id"]
+
+def main(argv):
+    export_dir = argv[0] if argv else EXPORT_DIR
+    n = export_answers(export_dir, progress=lambda total, last: print(f"[匯出中] {total:,} 筆（answer_log.id ≤ {last}）"))
+    print(f"✅ 匯出完成：新增 {n:,} 筆，目錄 {export_dir}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,152 +1,93 @@
-import sqlite3
-import random
-import json
+from data_store import bank_loader, question_sampler
+from data_store.bank_cache import get_cached
+from data_store.db import QUESTION_BANK, get_connection
 
-DB_PATH = "data_store/question_bank.sqlite"
+# 回傳值皆為 data_store.question_record 的 Question / QuestionGroup（快取共用物件，請視為唯讀）：
+# - 單題：q.kind == "single"
+# - 題組：group.kind == "group"，group.questions 為小題
+# - 題組小題：q.kind == "group_sub"，q.group 指回所屬題組
 
 # === 取得所有單題 ===
 def get_all_single_questions():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, content, options, answer, explanation, topic, difficulty, question_type
-        FROM questions
-        WHERE group_id IS NULL
-    """)
-    results = c.fetchall()
-    conn.close()
-    questions = []
-    for row in results:
-        questions.append({
-            "type": "single",
-            "題號": row[0],
-            "題幹": row[1],
-            "選項": json.loads(row[2]) if row[2] else {},
-            "正解": row[3],
-            "解析": row[4],
-            "主題": row[5],
-            "難度": row[6],
-            "題型": row[7],
-        })
-    return questions
+    return get_cached("question_loader.singles",
+                      lambda: bank_loader.load_single_questions(get_connection(QUESTION_BANK)))
 
 # === 取得所有題組 ===
 def get_all_question_groups():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, title, reading_text, category
-        FROM question_groups
-    """)
-    groups = c.fetchall()
-    result = []
-    for group_row in groups:
-        group_id, title, reading_text, category = group_row
-        c.execute("""
-            SELECT id, content, options, answer, explanation, topic, difficulty, question_type
-            FROM questions
-            WHERE group_id = ?
-        """, (group_id,))
-        subquestions = []
-        for q in c.fetchall():
-            subquestions.append({
-                "sub_id": q[0],
-                "題幹": q[1],
-                "選項": json.loads(q[2]) if q[2] else {},
-                "正解": q[3],
-                "解析": q[4],
-                "主題": q[5],
-                "難度": q[6],
-                "題型": q[7],
-            })
-        result.append({
-            "type": "group",
-            "group_id": group_id,
-            "title": title,
-            "reading_text": reading_text,
-            "category": category,
-            "questions": subquestions
-        })
-    conn.close()
-    return result
+    return get_cached("question_loader.groups",
+                      lambda: bank_loader.load_groups(get_connection(QUESTION_BANK)))
 
-# === 取得隨機單題或題組（可帶模式）===
-def get_random_question(mode="auto"):
-    singles = get_all_single_questions()
-    groups = get_all_question_groups()
-    all_items = singles + groups
+def _normalize_qid(qid):
+    # answer_log.question_id 為 TEXT，題庫 id 為 INTEGER
+    try:
+        return int(qid)
+    except (TypeError, ValueError):
+        return qid
 
-    if not all_items:
-        return None
+# === id 索引：與 singles / groups 清單同一份物件，隨題庫版本一起失效 ===
+def _build_index():
+    singles = {q.id: q for q in get_all_single_questions()}
+    groups = {g.group_id: g for g in get_all_question_groups()}
+    questions = dict(singles)
+    for group in groups.values():
+        for q in group.questions:
+            questions[q.id] = q
+    return singles, groups, questions
 
-    # auto: 單題與題組皆可隨機抽
-    item = random.choice(all_items)
-    return item
+def _index():
+    """回傳 (單題 id → Question, 題組 id → QuestionGroup, 題號/小題 id → Question)"""
+    return get_cached("question_loader.index", _build_index)
 
-def get_random_single_question():
-    singles = get_all_single_questions()
-    if not singles:
-        return None
-    return random.choice(singles)
+# === 依 id 取出單一項目（抽題用）===
+def get_item(kind, item_id):
+    """kind 為 single / group；由快取的 id 索引取出，不存在回傳 None"""
+    singles, groups, _ = _index()
+    if kind == "single":
+        return singles.get(item_id)
+    return groups.get(item_id)
 
-def get_random_group():
-    groups = get_all_question_groups()
-    if not groups:
+# === 取得隨機單題或題組（可帶模式）===
+def get_random_question(mode="auto", topic=None, difficulty=None, question_type=None, exclude=None):
+    """
+    mode: auto（單題與題組皆可）/ single / group
+    exclude: 已出過的 (type, id) 集合，見 item_key()
+    """
+    picked = question_sampler.draw(mode, topic, difficulty, question_type, exclude)
+    if picked is None:
         return None
-    return random.choice(groups)
+    return get_item(*picked)
+
+def get_random_single_question(**filters):
+    return get_random_question(mode="single", **filters)
+
+def get_random_group(**filters):
+    return get_random_question(mode="group", **filters)
+
+def item_key(item):
+    """回傳抽題項目的 (type, id)，供 exclude 記錄已出過的題目"""
+    if item.kind == "group":
+        return ("group", item.group_id)
+    return ("single", item.id)
 
 # === 依據題號/小題 id 查單題或題組小題 ===
 def get_question_by_id(qid):
     """
-    輸入題號（單題為 id，題組小題為 sub_id），自動判斷來源
+    輸入題號（單題為 id，題組小題為 sub_id），自動判斷來源；
+    題組小題的 q.group 可取得閱讀文本與其他小題。找不到回傳 None。
     """
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    # 先查單題
-    c.execute("""
-        SELECT id, content, options, answer, explanation, topic, difficulty, question_type
-        FROM questions
-        WHERE id = ? AND group_id IS NULL
-    """, (qid,))
-    row = c.fetchone()
-    if row:
-        conn.close()
-        return {
-            "type": "single",
-            "題號": row[0],
-            "題幹": row[1],
-            "選項": json.loads(row[2]) if row[2] else {},
-            "正解": row[3],
-            "解析": row[4],
-            "主題": row[5],
-            "難度": row[6],
-            "題型": row[7],
-        }
-    # 查題組內小題
-    c.execute("""
-        SELECT q.id, q.content, q.options, q.answer, q.explanation, q.topic, q.difficulty, q.question_type,
-               g.id, g.title, g.reading_text, g.category
-        FROM questions q
-        JOIN question_groups g ON q.group_id = g.id
-        WHERE q.id = ?
-    """, (qid,))
-    row = c.fetchone()
-    if row:
-        conn.close()
-        return {
-            "type": "group_sub",
-            "sub_id": row[0],
-            "題幹": row[1],
-            "選項": json.loads(row[2]) if row[2] else {},
-            "正解": row[3],
-            "解析": row[4],
-            "主題": row[5],
-            "難度": row[6],
-            "題型": row[7],
-            "group_id": row[8],
-            "group_title": row[9],
-            "reading_text": row[10],
-            "category": row[11]
-        }
-    conn.close()
-    return None
+    return _index()[2].get(_normalize_qid(qid))
+
+# === 一次查多題（錯題本、診斷清單）===
+def get_questions_by_ids(ids):
+    """
+    回傳 {輸入的 id: Question}，題號可為字串或整數（answer_log.question_id 為 TEXT）；
+    全部以一次集合查詢取得，題庫中不存在的題號不列入。
+    """
+    ids = list(ids)
+    found = bank_loader.load_questions(get_connection(QUESTION_BANK), [_normalize_qid(i) for i in ids])
+    result = {}
+    for qid in ids:
+        q = found.get(_normalize_qid(qid))
+        if q is not None:
+            result[qid] = q
+    return result
@@ -0,0 +1,169 @@
+# 檔案路徑：learning_assistant/data_store/question_record.py
+
+# 題目/題組的統一資料結構：取代各模組自行組裝、鍵名不一的 dict
+# （「題號」/「sub_id」/「id」、「正解」/「answer」、「題幹」/「content」…）。
+# - 使用 __slots__，每題只佔固定欄位，不帶 dict 的額外開銷
+# - 選項保留原始 JSON 字串，第一次讀取 .options 時才解析
+# - get()/[] 提供舊鍵名的相容存取，給仍以 dict 方式讀取的程式（如 prompt 組裝）使用
+
+import json
+import sys
+
+def _intern(value):
+    # 主題、題型、正解、關鍵詞重複率高，共用同一個字串物件
+    return sys.intern(value) if isinstance(value, str) else value
+
+class QuestionGroup:
+    __slots__ = ("group_id", "title", "reading_text", "category", "questions")
+
+    kind = "group"
+
+    def __init__(self, group_id, title=None, reading_text=None, category=None):
+        self.group_id = group_id
+        self.title = title
+        self.reading_text = reading_text
+        self.category = category
+        self.questions = []
+
+    @classmethod
+    def from_row(cls, row):
+        """row: (id, title, reading_text, category)"""
+        return cls(*row)
+
+    def get(self, key, default=None):
+        attr = _GROUP_ALIASES.get(key)
+        return getattr(self, attr) if attr else default
+
+    def __getitem__(self, key):
+        attr = _GROUP_ALIASES.get(key)
+        if attr is None:
+            raise KeyError(key)
+        return getattr(self, attr)
+
+    def __repr__(self):
+        return f"QuestionGroup(group_id={self.group_id!r}, questions={len(self.questions)})"
+
+
+class Question:
+    __slots__ = ("id", "group_id", "content", "_options", "answer", "explanation",
+                 "topic", "difficulty", "question_type", "keywords", "paragraph", "group")
+
+    def __init__(self, id, content=None, options=None, answer=None, explanation=None, topic=None,
+                 difficulty=None, question_type=None, keywords=None, paragraph=None, group=None):
+        self.id = id
+        self.content = content
+        self._options = options      # JSON 字串（未解析）或 dict
+        self.answer = answer
+        self.explanation = explanation
+        self.topic = topic
+        self.difficulty = difficulty
+        self.question_type = question_type
+        self.keywords = keywords
+        self.paragraph = paragraph
+        self.group = group
+        self.group_id = group.group_id if group is not None else None
+
+    @classmethod
+    def from_row(cls, row, group=None):
+        """row 欄位順序同 bank_loader.QUESTION_COLUMNS"""
+        qid, content, options, answer, explanation, topic, difficulty, question_type, keywords, paragraph = row
+        return cls(qid, content, options, _intern(answer), explanation, _intern(topic), difficulty,
+                   _intern(question_type), _intern(keywords), paragraph, group)
+
+    @property
+    def options(self):
+        raw = self._options
+        if isinstance(raw, dict):
+            return raw
+        try:
+            parsed = json.loads(raw) if raw else {}
+        except ValueError:
+            parsed = {}
+        if not isinstance(parsed, dict):
+            parsed = {}
+        self._options = parsed
+        return parsed
+
+    @property
+    def kind(self):
+        return "single" if self.group is None else "group_sub"
+
+    @property
+    def group_title(self):
+        return self.group.title if self.group is not None else None
+
+    @property
+    def reading_text(self):
+        return self.group.reading_text if self.group is not None else None
+
+    @property
+    def category(self):
+        return self.group.category if self.group is not None else None
+
+    @property
+    def material(self):
+        """閱讀素材：題組文本優先，其次為題目專屬段落"""
+        return self.reading_text or self.paragraph or ""
+
+    def keyword_list(self):
+        return [k.strip() for k in (self.keywords or "").split(",") if k.strip()]
+
+    def get(self, key, default=None):
+        attr = _QUESTION_ALIASES.get(key)
+        return getattr(self, attr) if attr else default
+
+    def __getitem__(self, key):
+        attr = _QUESTION_ALIASES.get(key)
+        if attr is None:
+            raise KeyError(key)
+        return getattr(self, attr)
+
+    def as_dict(self):
+        """轉成中文鍵名 dict（組 prompt 或 JSON 輸出用）"""
+        return {
+            "題號": self.id,
+            "題幹": self.content,
+            "選項": self.options,
+            "正解": self.answer,
+            "解析": self.explanation,
+            "主題": self.topic,
+            "關鍵詞": self.keywords,
+            "難度": self.difficulty,
+            "題型": self.question_type,
+            "閱讀文本": self.reading_text,
+            "題組標題": self.group_title,
+            "分類": self.category,
+        }
+
+    def __repr__(self):
+        return f"Question(id={self.id!r}, group_id={self.group_id!r})"
+
+
+# 舊 dict 鍵名 → 屬性名稱（各模組過去使用的鍵名都在這裡對應一次）
+_QUESTION_ALIASES = {
+    "type": "kind",
+    "題號": "id", "sub_id": "id", "id": "id",
+    "題幹": "content", "content": "content",
+    "選項": "options", "options": "options",
+    "正解": "answer", "answer": "answer",
+    "解析": "explanation", "explanation": "explanation",
+    "主題": "topic", "topic": "topic",
+    "難度": "difficulty", "difficulty": "difficulty",
+    "題型": "question_type", "question_type": "question_type",
+    "關鍵詞": "keywords", "keywords": "keywords",
+    "paragraph": "paragraph",
+    "group_id": "group_id",
+    "group_title": "group_title", "題組名稱": "group_title", "題組標題": "group_title",
+    "reading_text": "reading_text", "閱讀文本": "reading_text",
+    "category": "category", "分類": "category",
+    "閱讀素材": "material",
+}
+
+_GROUP_ALIASES = {
+    "type": "kind",
+    "group_id": "group_id",
+    "title": "title", "題組標題": "title",
+    "reading_text": "reading_text", "閱讀文本": "reading_text",
+    "category": "category", "分類": "category",
+    "questions": "questions",
+}
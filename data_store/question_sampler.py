@@ -0,0 +1,151 @@
+# 檔案路徑：learning_assistant/data_store/question_sampler.py
+
+# 隨機抽題：候選清單只保存單題 id 與題組 id（array 緊湊儲存），
+# 抽中後才由 question_loader 的 id 索引取出該題內容（索引隨題庫版本快取），每次抽題成本與題庫大小無關。
+# 候選清單依篩選條件快取於 bank_cache，題庫變動時自動重建。
+# 依難度篩選時，有足夠作答數的題目改用實際作答校準的難度等級（data_store/calibration.py）；
+# 校準等級更新時只重新判斷等級有變動的題目（與其所屬題組），不重掃整個題庫。
+
+import bisect
+import random
+import threading
+from array import array
+from data_store import calibration
+from data_store.bank_cache import current_version, get_cached
+from data_store.db import QUESTION_BANK, get_connection
+
+# 排除已作答題目時的隨機重試次數，超過才改為逐一過濾
+MAX_REJECTION_TRIES = 32
+# 校準等級變動的題數超過此值時整份重建（逐題更新已不划算）
+MAX_INCREMENTAL_CHANGES = 2000
+SQL_IN_CHUNK = 500
+
+def _build_filter(topic=None, difficulty=None, question_type=None):
+    clauses, params = [], []
+    if topic:
+        clauses.append("topic = ?")
+        params.append(topic)
+    if difficulty is not None and difficulty != "":
+        clauses.append("difficulty = ?")
+        params.append(difficulty)
+    if question_type:
+        clauses.append("question_type = ?")
+        params.append(question_type)
+    return "".join(f" AND {c}" for c in clauses), params
+
+def _load_candidates(topic, difficulty, question_type):
+    where, params = _build_filter(topic, difficulty, question_type)
+    c = get_connection(QUESTION_BANK).cursor()
+    c.execute(f"SELECT id FROM questions WHERE group_id IS NULL{where} ORDER BY id", params)
+    singles = array("q", (row[0] for row in c))
+    # 題組只要有任一小題符合條件即列入候選
+    c.execute(f"SELECT DISTINCT group_id FROM questions WHERE group_id IS NOT NULL{where} ORDER BY group_id", params)
+    groups = array("q", (row[0] for row in c))
+    return singles, groups
+
+def _load_calibrated_candidates(topic, level, question_type, levels):
+    """依難度等級篩選：有校準值的題目用校準等級，其餘沿用題庫的 difficulty"""
+    where, params = _build_filter(topic, None, question_type)
+    c = get_connection(QUESTION_BANK).cursor()
+    c.execute(f"SELECT id, difficulty FROM questions WHERE group_id IS NULL{where} ORDER BY id", params)
+    singles = array("q", (qid for qid, d in c if levels.get(qid, d) == level))
+    c.execute(f"SELECT group_id, id, difficulty FROM questions WHERE group_id IS NOT NULL{where}", params)
+    groups = array("q", sorted({gid for gid, qid, d in c if levels.get(qid, d) == level}))
+    return singles, groups
+
+def _rows_in(column, ids, where, params, select):
+    """WHERE {column} IN (ids) 的查詢，ids 分段帶入"""
+    c = get_connection(QUESTION_BANK).cursor()
+    ids = sorted(ids)
+    for start in range(0, len(ids), SQL_IN_CHUNK):
+        chunk = ids[start:start + SQL_IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        yield from c.execute(f"SELECT {select} FROM questions WHERE {column} IN ({marks}){where}", chunk + params)
+
+def _set_member(ids, item, member):
+    """在已排序的 id array 中加入或移除 item"""
+    i = bisect.bisect_left(ids, item)
+    present = i < len(ids) and ids[i] == item
+    if member and not present:
+        ids.insert(i, item)
+    elif present and not member:
+        ids.pop(i)
+
+def _update_calibrated_candidates(value, topic, level, question_type, levels, changed):
+    """只重新判斷校準等級有變動的題目；題組只要有小題變動，就重新判斷整組"""
+    where, params = _build_filter(topic, None, question_type)
+    singles, groups = array("q", value[0]), array("q", value[1])   # 複製：抽題端可能仍持有舊的 array
+    touched = set()
+    for qid, gid, d in _rows_in("id", changed, where, params, "id, group_id, difficulty"):
+        if gid is None:
+            _set_member(singles, qid, levels.get(qid, d) == level)
+        else:
+            touched.add(gid)
+    matched = {gid for gid, qid, d in _rows_in("group_id", touched, where, params, "group_id, id, difficulty")
+               if levels.get(qid, d) == level}
+    for gid in touched:
+        _set_member(groups, gid, gid in matched)
+    return singles, groups
+
+def _changed_levels(old, new):
+    """校準等級新增、刪除或改變的題號（items 的對稱差在 C 層完成，比逐題比對快）"""
+    return {qid for qid, _ in old.items() ^ new.items()}
+
+_calibrated = {}
+_calibrated_lock = threading.Lock()
+
+def get_candidates(topic=None, difficulty=None, question_type=None):
+    """回傳 (單題 id array, 題組 id array)"""
+    try:
+        level = int(difficulty)
+    except (TypeError, ValueError):
+        key = f"sampler.candidates:{topic}:{difficulty}:{question_type}"
+        return get_cached(key, lambda: _load_candidates(topic, difficulty, question_type))
+    # 校準等級會隨作答更新，另以（題庫版本, 校準版本）判斷是否過期，每組篩選條件只保留最新一份：
+    # 題庫變動時整份重建，只有校準等級變動時只更新等級有變的題目
+    levels, levels_version = calibration.item_levels()
+    bank_version = current_version()
+    key = (topic, level, question_type)
+    with _calibrated_lock:
+        cached = _calibrated.get(key)
+    if cached and cached[0] == bank_version and cached[1] == levels_version:
+        return cached[3]
+    changed = _changed_levels(cached[2], levels) if cached and cached[0] == bank_version else None
+    if changed is not None and len(changed) <= MAX_INCREMENTAL_CHANGES:
+        value = _update_calibrated_candidates(cached[3], topic, level, question_type, levels, changed)
+    else:
+        value = _load_calibrated_candidates(topic, level, question_type, levels)
+    with _calibrated_lock:
+        _calibrated[key] = (bank_version, levels_version, levels, value)
+    return value
+
+def draw(mode="auto", topic=None, difficulty=None, question_type=None, exclude=None):
+    """
+    依條件抽出一個項目，回傳 ("single", 題號) 或 ("group", 題組 id)；無候選時回傳 None。
+    mode: auto（單題與題組皆可）/ single / group
+    exclude: 已出過的項目集合，元素格式同回傳值；全部出過時忽略此條件
+    """
+    singles, groups = get_candidates(topic, difficulty, question_type)
+    if mode == "single":
+        groups = array("q")
+    elif mode == "group":
+        singles = array("q")
+    total = len(singles) + len(groups)
+    if total == 0:
+        return None
+
+    def item_at(i):
+        return ("single", singles[i]) if i < len(singles) else ("group", groups[i - len(singles)])
+
+    if not exclude:
+        return item_at(random.randrange(total))
+
+    for _ in range(MAX_REJECTION_TRIES):
+        item = item_at(random.randrange(total))
+        if item not in exclude:
+            return item
+    # 多數候選都已出過：改為過濾剩餘項目
+    remaining = [i for i in range(total) if item_at(i) not in exclude]
+    if not remaining:
+        return item_at(random.randrange(total))
+    return item_at(random.choice(remaining))
@@ -0,0 +1,306 @@
+# 檔案路徑：learning_assistant/data_store/question_similarity.py
+
+# 題目相似度索引：題幹、題目素材與題組閱讀文本的字元二元組（bigram）加上關鍵詞、主題，
+# 以稀疏 TF-IDF 餘弦相似度回答「與某題最相似的題目」（錯題本「再練類似題」、AI 教練延伸練習）。
+#
+# - 倒排索引以 numpy CSR 陣列存放（詞 → 題目、詞頻）。查詢只累加查詢題目權重最高的
+#   MAX_QUERY_TERMS 個詞的倒排串列，再以 bincount 算分，不掃描題庫
+# - 增量更新：題庫版本改變時比對每題內容的 CRC，新增/修改的題目另建一個小分段（segment），
+#   刪除或修改前的舊版本只標記失效；分段數或失效比例超過門檻時才合併成單一分段
+# - 索引存於行程內，第一次查詢時建立；切詞完全以 numpy 向量化處理
+
+import math
+import threading
+import zlib
+
+import numpy as np
+
+from data_store.bank_cache import current_version
+from data_store.db import QUESTION_BANK, get_connection
+from data_store.text_tokens import char_codes, word_chars
+
+READING_CHARS = 300       # 題組閱讀文本只取前段，避免長文主導同組小題以外的相似度
+KEYWORD_TF = 3            # 關鍵詞視為出現 3 次
+TOPIC_TF = 2              # 主題視為出現 2 次
+MAX_QUERY_TERMS = 48      # 查詢時只用權重最高的詞
+MAX_DF_RATIO = 0.2        # 出現在超過此比例題目的詞不參與查詢（幾乎不具鑑別度）
+MAX_SEGMENTS = 8
+MAX_DEAD_RATIO = 0.25
+
+# 詞 key（int64）：高位區分種類，低位為字元碼或字串 CRC
+_BIGRAM = 1 << 42
+_KEYWORD = 2 << 42
+_TOPIC = 3 << 42
+
+# === 切詞 ===
+def _split(value):
+    """關鍵詞可為逗號分隔字串或 list"""
+    if isinstance(value, (list, tuple)):
+        value = ",".join(value)
+    return [kw.strip() for kw in (value or "").replace("，", ",").split(",") if kw.strip()]
+
+def tokenize(texts, keywords, topics):
+    """
+    多題一次切詞：texts / keywords / topics 為等長 list。
+    回傳 (題目索引 int32, 詞 key int64, 詞頻權重 float32)，依 (題目, 詞) 排序且不重複。
+    """
+    cp = char_codes(texts)
+    sep = cp == 0
+    doc_of_char = np.cumsum(sep) - sep
+    valid = word_chars(cp)
+    pair = valid[:-1] & valid[1:]
+    docs = [doc_of_char[:-1][pair]]
+    keys = [_BIGRAM | (cp[:-1][pair] << 21) | cp[1:][pair]]
+    counts = [np.ones(len(keys[0]))]
+
+    extra_docs, extra_keys, extra_counts = [], [], []
+    for i, (kws, topic) in enumerate(zip(keywords, topics)):
+        for kw in _split(kws):
+            extra_docs.append(i)
+            extra_keys.append(_KEYWORD | zlib.crc32(kw.encode("utf-8")))
+            extra_counts.append(KEYWORD_TF)
+        if topic:
+            extra_docs.append(i)
+            extra_keys.append(_TOPIC | zlib.crc32(topic.encode("utf-8")))
+            extra_counts.append(TOPIC_TF)
+    docs.append(np.array(extra_docs, dtype=np.int64))
+    keys.append(np.array(extra_keys, dtype=np.int64))
+    counts.append(np.array(extra_counts, dtype=np.float64))
+    docs, keys, counts = np.concatenate(docs), np.concatenate(keys), np.concatenate(counts)
+    if not len(keys):
+        return np.empty(0, np.int32), np.empty(0, np.int64), np.empty(0, np.float32)
+
+    vocab, term = np.unique(keys, return_inverse=True)
+    pairs, inverse = np.unique(docs * len(vocab) + term, return_inverse=True)
+    tf = np.bincount(inverse, counts)
+    return ((pairs // len(vocab)).astype(np.int32), vocab[pairs % len(vocab)],
+            (1.0 + np.log(tf)).astype(np.float32))
+
+# === 分段 ===
+class _Segment:
+    """一批題目的倒排索引（詞 → 題目）與正向索引（題目 → 詞），皆為 CSR 陣列"""
+
+    def __init__(self, qids, docs, keys, tf):
+        self.qids = np.asarray(qids, dtype=np.int64)
+        self.alive = np.ones(len(self.qids), dtype=bool)
+        # 正向：docs 已排序
+        self.doc_ptr = np.searchsorted(docs, np.arange(len(self.qids) + 1))
+        self.doc_keys, self.doc_tf = keys, tf
+        # 倒排
+        order = np.argsort(keys, kind="stable")
+        self.terms, starts, self.df = np.unique(keys[order], return_index=True, return_counts=True)
+        self.term_ptr = np.append(starts, len(order))
+        self.entry_term = np.empty(len(order), dtype=np.int64)      # 正向每筆對應的詞位置
+        self.entry_term[order] = np.repeat(np.arange(len(self.terms)), self.df)
+        self.post_docs = docs[order]
+        self.post_tf = tf[order]
+        self.norms = None
+
+    def lookup(self, keys):
+        """keys 在本分段的詞位置與是否存在"""
+        if not len(self.terms):
+            return np.zeros(len(keys), dtype=np.int64), np.zeros(len(keys), dtype=bool)
+        pos = np.minimum(np.searchsorted(self.terms, keys), len(self.terms) - 1)
+        return pos, self.terms[pos] == keys
+
+    def vector(self, i):
+        start, end = self.doc_ptr[i], self.doc_ptr[i + 1]
+        return self.doc_keys[start:end], self.doc_tf[start:end]
+
+    def triples(self):
+        """存活題目的 (qids, 題目索引, 詞 key, 詞頻)，合併分段用"""
+        lengths = np.diff(self.doc_ptr)
+        docs = np.repeat(np.arange(len(self.qids)), lengths)
+        mask = self.alive[docs]
+        remap = np.cumsum(self.alive) - 1
+        return self.qids[self.alive], remap[docs[mask]], self.doc_keys[mask], self.doc_tf[mask]
+
+# === 索引 ===
+class SimilarityIndex:
+    def __init__(self):
+        self.segments = []
+        self.location = {}      # 題號 → (分段, 分段內索引)
+        self.checksums = {}     # 題號 → 內容 CRC
+        self.version = None
+
+    def __len__(self):
+        return len(self.location)
+
+    def _stats(self, keys):
+        """(文件總數, 各詞的 df)；失效題目在合併前仍計入"""
+        n = sum(len(seg.qids) for seg in self.segments)
+        df = np.zeros(len(keys), dtype=np.int64)
+        for seg in self.segments:
+            pos, found = seg.lookup(keys)
+            df += np.where(found, seg.df[pos], 0)
+        return n, df
+
+    def _idf(self, keys):
+        n, df = self._stats(keys)
+        return np.log((n + 1) / (df + 1)) + 1.0, n, df
+
+    def _set_norms(self, seg):
+        # 只查分段內不重複的詞（已排序，查詢快），再對應回每一筆
+        idf = self._idf(seg.terms)[0][seg.entry_term]
+        docs = np.repeat(np.arange(len(seg.qids)), np.diff(seg.doc_ptr))
+        seg.norms = np.sqrt(np.bincount(docs, (seg.doc_tf * idf) ** 2, len(seg.qids))).astype(np.float32)
+
+    def add(self, qids, texts, keywords, topics, checksums):
+        """新增或更新一批題目（舊版本標記失效），另建一個分段"""
+        for qid in qids:
+            self._remove(qid)
+        docs, keys, tf = tokenize(texts, keywords, topics)
+        seg = _Segment(qids, docs, keys, tf)
+        self.segments.append(seg)
+        self._set_norms(seg)
+        number = len(self.segments) - 1
+        for i, (qid, crc) in enumerate(zip(qids, checksums)):
+            self.location[qid] = (number, i)
+            self.checksums[qid] = crc
+
+    def remove(self, qids):
+        for qid in qids:
+            self._remove(qid)
+            self.checksums.pop(qid, None)
+
+    def _remove(self, qid):
+        where = self.location.pop(qid, None)
+        if where:
+            self.segments[where[0]].alive[where[1]] = False
+
+    def maybe_merge(self):
+        total = sum(len(seg.qids) for seg in self.segments)
+        dead = total - len(self.location)
+        if len(self.segments) <= MAX_SEGMENTS and dead <= MAX_DEAD_RATIO * total:
+            return False
+        parts, offset = [], 0
+        for seg in self.segments:
+            qids, docs, keys, tf = seg.triples()
+            parts.append((qids, docs + offset, keys, tf))
+            offset += len(qids)
+        merged = _Segment(*(np.concatenate([p[i] for p in parts]) for i in range(4)))
+        self.segments = [merged]
+        self._set_norms(merged)
+        self.location = {qid: (0, i) for i, qid in enumerate(merged.qids.tolist())}
+        return True
+
+    def vector(self, qid):
+        where = self.location.get(qid)
+        return self.segments[where[0]].vector(where[1]) if where else None
+
+    def search(self, keys, tf, k=5, exclude=()):
+        """以 (詞 key, 詞頻) 向量查詢，回傳 [(題號, 相似度)]，相似度由高到低；exclude 為 int 題號集合"""
+        if not len(keys) or not self.location:
+            return []
+        idf, n, df = self._idf(keys)
+        weights = tf * idf
+        query_norm = math.sqrt(float(np.dot(weights, weights)))
+        informative = df <= max(1, MAX_DF_RATIO * n)
+        if informative.any():
+            keys, weights, idf = keys[informative], weights[informative], idf[informative]
+        if len(keys) > MAX_QUERY_TERMS:
+            top = np.argpartition(-weights, MAX_QUERY_TERMS - 1)[:MAX_QUERY_TERMS]
+            keys, weights, idf = keys[top], weights[top], idf[top]
+
+        excluded = np.fromiter(exclude, dtype=np.int64, count=len(exclude))
+        candidates = []
+        for seg in self.segments:
+            pos, found = seg.lookup(keys)
+            if not found.any():
+                continue
+            docs, contrib = [], []
+            for p, factor in zip(pos[found], (weights * idf)[found]):
+                start, end = seg.term_ptr[p], seg.term_ptr[p + 1]
+                docs.append(seg.post_docs[start:end])
+                contrib.append(seg.post_tf[start:end] * factor)
+            scores = np.bincount(np.concatenate(docs), np.concatenate(contrib), len(seg.qids))
+            scores = np.divide(scores, seg.norms * query_norm, out=np.zeros_like(scores), where=seg.norms > 0)
+            scores[~seg.alive] = 0
+            hits = np.flatnonzero(scores > 0)
+            if len(excluded):
+                hits = hits[~np.isin(seg.qids[hits], excluded)]     # 先剔除，部分排序只需取 k 個
+            if len(hits) > k:
+                hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+            candidates += zip(seg.qids[hits].tolist(), scores[hits].tolist())
+        candidates.sort(key=lambda item: (-item[1], item[0]))
+        return candidates[:k]
+
+# === 與題庫同步 ===
+SYNC_SQL = """
+    SELECT q.id, q.content, q.paragraph, q.keywords, q.topic, g.reading_text
+    FROM questions q LEFT JOIN question_groups g ON g.id = q.group_id
+"""
+
+def _document(content, paragraph, reading_text):
+    return "\n".join(filter(None, (content, paragraph, (reading_text or "")[:READING_CHARS])))
+
+def sync(index):
+    """比對題庫內容，只重新切詞新增/修改的題目，回傳 (新增或修改數, 刪除數)"""
+    qids, texts, keywords, topics, checksums = [], [], [], [], []
+    current = set()
+    for qid, content, paragraph, kws, topic, reading in get_connection(QUESTION_BANK).execute(SYNC_SQL):
+        current.add(qid)
+        text = _document(content, paragraph, reading)
+        crc = zlib.crc32(f"{text}\x1f{kws or ''}\x1f{topic or ''}".encode("utf-8"))
+        if index.checksums.get(qid) != crc:
+            qids.append(qid)
+            texts.append(text)
+            keywords.append(kws)
+            topics.append(topic)
+            checksums.append(crc)
+    removed = [qid for qid in index.checksums if qid not in current]
+    index.remove(removed)
+    if qids:
+        index.add(qids, texts, keywords, topics, checksums)
+    index.maybe_merge()
+    return len(qids), len(removed)
+
+_index = None
+_lock = threading.RLock()
+
+def get_index():
+    """行程內的相似度索引；題庫版本改變時先增量同步"""
+    global _index
+    with _lock:
+        version = current_version()
+        if _index is None:
+            _index = SimilarityIndex()
+        if _index.version != version:
+            sync(_index)
+            _index.version = version
+        return _index
+
+def clear_index():
+    global _index
+    with _lock:
+        _index = None
+
+# === 查詢 ===
+def _question_ids(values):
+    """題號轉成 int（錯題本等處以 TEXT 存題號）；無法轉換的略過"""
+    ids = set()
+    for value in values:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            pass
+    return ids
+
+def similar_questions(qid, k=5, exclude=()):
+    """與題號 qid 最相似的 k 題：[(題號, 相似度)]，不含 qid 本身與 exclude（題號可為 int 或字串）"""
+    try:
+        qid = int(qid)
+    except (TypeError, ValueError):
+        return []
+    with _lock:
+        index = get_index()
+        vector = index.vector(qid)
+        if vector is None:
+            return []
+        return index.search(*vector, k=k, exclude=_question_ids(exclude) | {qid})
+
+def similar_to_text(text, k=5, keywords=None, topic=None, exclude=()):
+    """與任意文字（可附關鍵詞、主題）最相似的 k 題"""
+    _, keys, tf = tokenize([text or ""], [keywords], [topic])
+    with _lock:
+        return get_index().search(keys, tf, k=k, exclude=_question_ids(exclude))
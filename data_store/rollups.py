@@ -0,0 +1,124 @@
+# 檔案路徑：learning_assistant/data_store/rollups.py
+
+# 作答統計彙總表（user_log.user_rollup / class_rollup）：
+# 依「維度 → 值」預先累計作答數與答對數，學習歷程等頁面的圖表直接讀取，不再掃描整段作答紀錄。
+#   維度：all（總計）/ day（日期）/ topic / keyword / difficulty / question_type
+#
+# 更新方式為以 answer_log.id 為水位的補算（catch_up）：
+# - answer_log_writer 每批寫入後呼叫一次，頁面讀取前也可呼叫（沒有新紀錄時只查一次水位）
+# - 水位與彙總在同一交易內更新，重複呼叫或中途失敗都不會重複累計
+# - 首次執行時會自動補算全部歷史紀錄
+#
+# 手動執行：python -m data_store.rollups [--rebuild]
+
+import sys
+from collections import defaultdict
+from data_store.db import USER_LOG, get_connection, transaction
+from data_store.question_loader import get_questions_by_ids
+
+BATCH_SIZE = 5000
+DIMENSIONS = ("all", "day", "topic", "keyword", "difficulty", "question_type")
+UNASSIGNED_CLASS = "未分班"
+
+_UPSERT_USER_SQL = """
+    INSERT INTO user_rollup (user_id, dimension, value, attempts, correct) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, dimension, value) DO UPDATE SET
+        attempts = attempts + excluded.attempts, correct = correct + excluded.correct
+"""
+_UPSERT_CLASS_SQL = """
+    INSERT INTO class_rollup (class_name, dimension, value, attempts, correct) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(class_name, dimension, value) DO UPDATE SET
+        attempts = attempts + excluded.attempts, correct = correct + excluded.correct
+"""
+
+def _dimension_values(timestamp, question):
+    yield "all", ""
+    if timestamp:
+        yield "day", timestamp[:10]
+    if question is None:
+        return
+    yield "topic", question.topic or "未分類"
+    for kw in question.keyword_list():
+        yield "keyword", kw
+    if question.difficulty is not None:
+        yield "difficulty", str(question.difficulty)
+    if question.question_type:
+        yield "question_type", question.question_type
+
+def _watermark(conn):
+    row = conn.execute("SELECT last_log_id FROM rollup_state WHERE name = 'answer_log'").fetchone()
+    return row[0] if row else 0
+
+def _catch_up_batch(conn, batch_size):
+    last_id = _watermark(conn)
+    rows = conn.execute("""
+        SELECT a.id, a.timestamp, a.user_id, a.question_id, a.is_correct, u.class_name
+        FROM answer_log a
+        LEFT JOIN users u ON u.id = a.user_id
+        WHERE a.id > ?
+        ORDER BY a.id
+        LIMIT ?
+    """, (last_id, batch_size)).fetchall()
+    if not rows:
+        return 0
+    questions = get_questions_by_ids({row[3] for row in rows if row[3] is not None})
+
+    user_counts = defaultdict(lambda: [0, 0])
+    class_counts = defaultdict(lambda: [0, 0])
+    for log_id, timestamp, user_id, qid, is_correct, class_name in rows:
+        if user_id is None:
+            continue
+        class_name = class_name or UNASSIGNED_CLASS
+        for dimension, value in _dimension_values(timestamp, questions.get(qid)):
+            for counts in (user_counts[(user_id, dimension, value)], class_counts[(class_name, dimension, value)]):
+                counts[0] += 1
+                counts[1] += 1 if is_correct else 0
+
+    conn.executemany(_UPSERT_USER_SQL, [(*key, a, c) for key, (a, c) in user_counts.items()])
+    conn.executemany(_UPSERT_CLASS_SQL, [(*key, a, c) for key, (a, c) in class_counts.items()])
+    conn.execute("""
+        INSERT INTO rollup_state (name, last_log_id) VALUES ('answer_log', ?)
+        ON CONFLICT(name) DO UPDATE SET last_log_id = excluded.last_log_id
+    """, (rows[-1][0],))
+    return len(rows)
+
+def catch_up(batch_size=BATCH_SIZE):
+    """把水位之後的作答紀錄累計進彙總表，回傳處理筆數"""
+    total = 0
+    while True:
+        with transaction(USER_LOG, immediate=True) as conn:
+            n = _catch_up_batch(conn, batch_size)
+        total += n
+        if n < batch_size:
+            return total
+
+def rebuild():
+    """清空彙總表並由 answer_log 重新累計（題庫主題/關鍵詞大幅調整後使用）"""
+    with transaction(USER_LOG, immediate=True) as conn:
+        conn.execute("DELETE FROM user_rollup")
+        conn.execute("DELETE FROM class_rollup")
+        conn.execute("DELETE FROM rollup_state WHERE name = 'answer_log'")
+    return catch_up()
+
+# === 讀取 ===
+def get_user_rollup(user_id, dimension):
+    """[(值, 作答數, 答對數)]，依值排序"""
+    return get_connection(USER_LOG).execute("""
+        SELECT value, attempts, correct FROM user_rollup
+        WHERE user_id = ? AND dimension = ?
+        ORDER BY value
+    """, (user_id, dimension)).fetchall()
+
+def get_class_rollup(class_name, dimension):
+    return get_connection(USER_LOG).execute("""
+        SELECT value, attempts, correct FROM class_rollup
+        WHERE class_name = ? AND dimension = ?
+        ORDER BY value
+    """, (class_name or UNASSIGNED_CLASS, dimension)).fetchall()
+
+def main(argv):
+    n = rebuild() if "--rebuild" in argv else catch_up()
+    print(f"已累計 {n:,} 筆作答紀錄")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
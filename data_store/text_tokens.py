@@ -0,0 +1,19 @@
+# 檔案路徑：learning_assistant/data_store/text_tokens.py
+
+# 題目相似度索引（data_store/question_similarity.py）與教材知識索引（rag_tools/knowledge_index.py、
+# knowledge_vectors.py）共用的字元正規化：兩邊切詞必須一致，修改時只改這裡。
+
+import numpy as np
+
+def char_codes(texts):
+    """多段文字接成一個 int64 字元碼陣列（各段後接 0），全形英數轉半形、英文轉小寫"""
+    joined = "\x00".join(t.replace("\x00", "") for t in texts) + "\x00"
+    cp = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    fullwidth = ((cp >= 0xFF10) & (cp <= 0xFF19)) | ((cp >= 0xFF21) & (cp <= 0xFF3A)) | ((cp >= 0xFF41) & (cp <= 0xFF5A))
+    cp = np.where(fullwidth, cp - 0xFEE0, cp)
+    return np.where((cp >= 65) & (cp <= 90), cp + 32, cp)
+
+def word_chars(cp):
+    """中日韓漢字與英數字；標點、空白、分隔符號不構成二元組"""
+    return (((cp >= 48) & (cp <= 57)) | ((cp >= 97) & (cp <= 122)) |
+            ((cp >= 0x3400) & (cp <= 0x9FFF)) | ((cp >= 0xF900) & (cp <= 0xFAFF)) | (cp >= 0x20000))
@@ -1,31 +1,30 @@
-import sqlite3
 import json
 from pathlib import Path
+from data_store.bank_cache import bump_bank_version
+from data_store.db import QUESTION_BANK, resolve_path, transaction
 
-def update_answers_from_json(json_path, sqlite_path="data_store/question_bank.sqlite"):
+def update_answers_from_json(json_path, sqlite_path=QUESTION_BANK):
     if not Path(json_path).exists():
         raise FileNotFoundError(f"找不到 JSON 檔案：{json_path}")
-    if not Path(sqlite_path).exists():
+    if not Path(resolve_path(sqlite_path)).exists():
         raise FileNotFoundError(f"找不到 SQLite 資料庫：{sqlite_path}")
 
     with open(json_path, "r", encoding="utf-8") as f:
         answer_dict = json.load(f)
 
-    conn = sqlite3.connect(sqlite_path)
-    cursor = conn.cursor()
-
     updated = 0
-    for num_str, answer in answer_dict.items():
-        try:
-            qnum = int(num_str)
-            qid = f"114國綜-{qnum}"
-            cursor.execute("UPDATE questions SET answer = ? WHERE id = ?", (answer, qid))
-            updated += cursor.rowcount
-        except Exception as e:
-            print(f"❗ 無法更新題號 {num_str}: {e}")
+    with transaction(sqlite_path) as conn:
+        cursor = conn.cursor()
+        for num_str, answer in answer_dict.items():
+            try:
+                qnum = int(num_str)
+                qid = f"114國綜-{qnum}"
+                cursor.execute("UPDATE questions SET answer = ? WHERE id = ?", (answer, qid))
+                updated += cursor.rowcount
+            except Exception as e:
+                print(f"❗ 無法更新題號 {num_str}: {e}")
 
-    conn.commit()
-    conn.close()
+    bump_bank_version()
     print(f"✅ 已成功更新 {updated} 題的正確答案。")
 
 # 範例用法：
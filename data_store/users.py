@@ -0,0 +1,23 @@
+# 檔案路徑：learning_assistant/data_store/users.py
+
+import threading
+from data_store.db import USER_LOG, get_connection
+
+# 帳號不會改名，username → user_id 查過一次即快取
+_user_ids = {}
+_lock = threading.Lock()
+
+def get_user_id(username):
+    if not username:
+        return None
+    with _lock:
+        if username in _user_ids:
+            return _user_ids[username]
+    c = get_connection(USER_LOG).cursor()
+    c.execute("SELECT id FROM users WHERE username = ?", (username,))
+    row = c.fetchone()
+    if not row:
+        return None
+    with _lock:
+        _user_ids[username] = row[0]
+    return row[0]
@@ -0,0 +1,108 @@
+# 檔案路徑：learning_assistant/data_store/wrongbook.py
+
+# 錯題本投影（user_log.wrongbook）：每位學生每題一列，記錄
+# 答錯次數、首次/最近答錯時間、最近答錯所選、最近一次作答，以及最近答錯後是否已答對（corrected）。
+#
+# - answer_log_writer 每批寫入作答紀錄時，於同一交易內呼叫 apply_answers() 增量更新
+# - 頁面讀取直接查本表（依 user_id, last_wrong_at 索引），不再對整段作答歷程 GROUP BY
+# - 時間與作答欄位依時間戳記取最新值，但 wrong_count 是累加的：同一批紀錄重複套用會重複計數，
+#   apply_answers() 不是冪等的。正確性靠與 answer_log 寫入同一交易（寫入器重試前整批已 rollback）；
+#   只有 rebuild()（由 answer_log 全量重建）是冪等的，投影與紀錄不一致時用它修復
+
+from data_store.db import USER_LOG, get_connection, transaction
+
+# 答錯：新增或累加
+_WRONG_SQL = """
+    INSERT INTO wrongbook (user_id, question_id, group_id, sub_id, wrong_count,
+                           first_wrong_at, last_wrong_at, last_wrong_answer, correct_answer,
+                           last_answer, last_answered_at, corrected)
+    VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?, 0)
+    ON CONFLICT(user_id, question_id) DO UPDATE SET
+        wrong_count = wrong_count + 1,
+        first_wrong_at = MIN(first_wrong_at, excluded.first_wrong_at),
+        last_wrong_at = MAX(last_wrong_at, excluded.last_wrong_at),
+        last_wrong_answer = CASE WHEN excluded.last_wrong_at >= last_wrong_at
+                                 THEN excluded.last_wrong_answer ELSE last_wrong_answer END,
+        correct_answer = CASE WHEN excluded.last_wrong_at >= last_wrong_at
+                              THEN excluded.correct_answer ELSE correct_answer END,
+        group_id = COALESCE(excluded.group_id, group_id),
+        sub_id = COALESCE(excluded.sub_id, sub_id),
+        last_answer = CASE WHEN excluded.last_answered_at >= last_answered_at
+                           THEN excluded.last_answer ELSE last_answer END,
+        last_answered_at = MAX(last_answered_at, excluded.last_answered_at),
+        corrected = CASE WHEN excluded.last_wrong_at >= last_answered_at THEN 0 ELSE corrected END
+"""
+
+# 答對：只更新已在錯題本中的題目
+_RIGHT_SQL = """
+    UPDATE wrongbook SET
+        corrected = CASE WHEN :ts > last_wrong_at THEN 1 ELSE corrected END,
+        last_answer = CASE WHEN :ts >= last_answered_at THEN :answer ELSE last_answer END,
+        last_answered_at = MAX(last_answered_at, :ts)
+    WHERE user_id = :user_id AND question_id = :qid
+"""
+
+COLUMNS = ("question_id, group_id, sub_id, last_wrong_answer, correct_answer, last_wrong_at, "
+           "wrong_count, corrected, last_answer")
+
+def apply_answers(conn, rows):
+    """
+    rows 格式同 answer_log_writer.INSERT_SQL：
+    (timestamp, user_id, question_id, student_answer, correct_answer, is_correct, group_id, sub_id)
+    呼叫端負責交易（與 answer_log 寫入同一交易）。
+    """
+    wrong, right = [], []
+    for ts, user_id, qid, student_ans, correct_ans, is_correct, group_id, sub_id in rows:
+        qid = str(qid)   # answer_log.question_id 為 TEXT
+        if is_correct:
+            right.append({"ts": ts, "answer": student_ans, "user_id": user_id, "qid": qid})
+        else:
+            wrong.append((user_id, qid, group_id, sub_id, ts, ts, student_ans, correct_ans, student_ans, ts))
+    # 先處理答錯（可能新增列），再處理答對（只更新既有列）
+    if wrong:
+        conn.executemany(_WRONG_SQL, wrong)
+    if right:
+        conn.executemany(_RIGHT_SQL, right)
+
+def rebuild(conn=None, batch_size=5000):
+    """由 answer_log 全量重建錯題本（migration 補算或資料修復用），回傳處理的作答筆數"""
+    if conn is None:
+        with transaction(USER_LOG, immediate=True) as conn:
+            return rebuild(conn, batch_size)
+    conn.execute("DELETE FROM wrongbook")
+    c = conn.execute("""
+        SELECT timestamp, user_id, question_id, student_answer, correct_answer, is_correct, group_id, sub_id
+        FROM answer_log
+        WHERE user_id IS NOT NULL AND question_id IS NOT NULL
+        ORDER BY id
+    """)
+    total = 0
+    while True:
+        rows = c.fetchmany(batch_size)
+        if not rows:
+            return total
+        apply_answers(conn, rows)
+        total += len(rows)
+
+# === 讀取 ===
+def get_wrong_entries(user_id, limit=None, include_corrected=True):
+    """
+    依最近答錯時間新到舊回傳錯題列：
+    (question_id, group_id, sub_id, last_wrong_answer, correct_answer, last_wrong_at, wrong_count, corrected, last_answer)
+    """
+    sql = f"SELECT {COLUMNS} FROM wrongbook WHERE user_id = ?"
+    params = [user_id]
+    if not include_corrected:
+        sql += " AND corrected = 0"
+    sql += " ORDER BY last_wrong_at DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return get_connection(USER_LOG).execute(sql, params).fetchall()
+
+def get_entry(user_id, question_id):
+    """單題錯題紀錄（以主鍵查詢），不在錯題本中回傳 None"""
+    return get_connection(USER_LOG).execute(
+        f"SELECT {COLUMNS} FROM wrongbook WHERE user_id = ? AND question_id = ?",
+        (user_id, str(question_id))
+    ).fetchone()
@@ -0,0 +1,311 @@
+# 檔案路徑：learning_assistant/database/migrations.py
+
+# 資料庫結構版本管理：以 PRAGMA user_version 記錄每個資料庫目前的版本，
+# 啟動時依序套用尚未執行的 migration，可對既有資料庫重複執行（冪等）。
+# data_store.db 第一次開啟 question_bank / user_log 時會自動呼叫 migrate()。
+#
+# 新增結構變更時，只能在清單尾端加上新版本，不要修改已發佈的版本內容。
+#
+# 手動執行：python -m database.migrations [--verify]
+
+import sys
+from data_store.db import QUESTION_BANK, USER_LOG, get_connection, get_log_connection
+
+def _add_column_if_missing(table, column, decl):
+    def step(conn):
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    return step
+
+def _backfill_wrongbook(conn):
+    from data_store.wrongbook import rebuild
+    rebuild(conn)
+
+# === 題庫（question_bank.sqlite）===
+QUESTION_BANK_MIGRATIONS = [
+    (1, "題組、題目、錯題本基本結構", [
+        '''CREATE TABLE IF NOT EXISTS question_groups (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               title TEXT,
+               reading_text TEXT,
+               category TEXT,
+               created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+           )''',
+        '''CREATE TABLE IF NOT EXISTS questions (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               group_id INTEGER,
+               content TEXT NOT NULL,
+               options TEXT,             -- 選項 (json)
+               answer TEXT,              -- 正解
+               explanation TEXT,         -- 詳細解析
+               topic TEXT,               -- 主題
+               difficulty INTEGER,       -- 難度
+               question_type TEXT,       -- 單選/複選/簡答...
+               paragraph TEXT,           -- 題目專屬閱讀素材
+               keywords TEXT,            -- AI產生關鍵詞
+               created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+               FOREIGN KEY(group_id) REFERENCES question_groups(id)
+           )''',
+        # 早期資料庫缺少的欄位（舊版 init_database.sql 建立的表）
+        _add_column_if_missing("questions", "options", "TEXT"),
+        _add_column_if_missing("questions", "paragraph", "TEXT"),
+        _add_column_if_missing("questions", "keywords", "TEXT"),
+        '''CREATE TABLE IF NOT EXISTS users (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               username TEXT NOT NULL UNIQUE,
+               password TEXT NOT NULL
+           )''',
+        '''CREATE TABLE IF NOT EXISTS wrongbook (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               user_id INTEGER,
+               question_id INTEGER,
+               note TEXT,
+               FOREIGN KEY(user_id) REFERENCES users(id),
+               FOREIGN KEY(question_id) REFERENCES questions(id)
+           )''',
+    ]),
+    (2, "題組載入與主題查詢索引", [
+        # 題組子題：WHERE group_id = ? ORDER BY id
+        "CREATE INDEX IF NOT EXISTS idx_questions_group_id ON questions(group_id, id)",
+        # 推薦/分類：WHERE topic = ?、GROUP BY topic，只需 topic 與 id 時為覆蓋索引
+        "CREATE INDEX IF NOT EXISTS idx_questions_topic ON questions(topic)",
+    ]),
+    (3, "批次匯入進度（中斷後續傳）", [
+        # source_key 為匯入檔內容的 SHA-1；items_done 與該批題目在同一交易內更新
+        '''CREATE TABLE IF NOT EXISTS import_progress (
+               source_key TEXT PRIMARY KEY,
+               source_name TEXT,
+               items_done INTEGER NOT NULL DEFAULT 0,
+               groups_done INTEGER NOT NULL DEFAULT 0,
+               questions_done INTEGER NOT NULL DEFAULT 0,
+               status TEXT NOT NULL DEFAULT 'running',   -- running / done
+               updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+           )''',
+    ]),
+]
+
+# === 作答紀錄（user_log.sqlite）===
+USER_LOG_MIGRATIONS = [
+    (1, "用戶與作答紀錄基本結構", [
+        '''CREATE TABLE IF NOT EXISTS users (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               username TEXT NOT NULL UNIQUE,
+               password_hash TEXT NOT NULL,
+               role TEXT NOT NULL
+           )''',
+        '''CREATE TABLE IF NOT EXISTS answer_log (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               timestamp TEXT,
+               user_id INTEGER,
+               question_id TEXT,
+               student_answer TEXT,
+               correct_answer TEXT,
+               is_correct INTEGER,
+               group_id INTEGER,
+               sub_id INTEGER
+           )''',
+    ]),
+    (2, "錯題查詢索引", [
+        # 錯題本、AI 診斷、教練最近錯題：WHERE user_id = ? AND is_correct = 0 ORDER BY timestamp
+        # 附帶 question_id，最近錯題清單可直接由索引取得
+        "CREATE INDEX IF NOT EXISTS idx_answer_log_user_wrong ON answer_log(user_id, is_correct, timestamp, question_id)",
+    ]),
+    (3, "錯題本投影（每人每題一列，寫入作答時增量更新）", [
+        '''CREATE TABLE IF NOT EXISTS wrongbook (
+               user_id INTEGER NOT NULL,
+               question_id TEXT NOT NULL,
+               group_id INTEGER,
+               sub_id INTEGER,
+               wrong_count INTEGER NOT NULL DEFAULT 0,
+               first_wrong_at TEXT,
+               last_wrong_at TEXT,
+               last_wrong_answer TEXT,      -- 最近一次答錯所選
+               correct_answer TEXT,
+               last_answer TEXT,            -- 最近一次作答所選（不論對錯）
+               last_answered_at TEXT,
+               corrected INTEGER NOT NULL DEFAULT 0,   -- 最近一次答錯之後已答對
+               PRIMARY KEY (user_id, question_id)
+           ) WITHOUT ROWID''',
+        "CREATE INDEX IF NOT EXISTS idx_wrongbook_user_recent ON wrongbook(user_id, last_wrong_at)",
+        _backfill_wrongbook,
+    ]),
+    (4, "個人作答紀錄索引", [
+        # StudentModel.refresh()：WHERE user_id = ? AND id > ? ORDER BY id（索引隱含 rowid 排序）
+        "CREATE INDEX IF NOT EXISTS idx_answer_log_user ON answer_log(user_id)",
+    ]),
+    (5, "班級欄位與作答統計彙總表", [
+        _add_column_if_missing("users", "class_name", "TEXT"),
+        # dimension：all / day / topic / keyword / difficulty / question_type，見 data_store/rollups.py
+        '''CREATE TABLE IF NOT EXISTS user_rollup (
+               user_id INTEGER NOT NULL,
+               dimension TEXT NOT NULL,
+               value TEXT NOT NULL,
+               attempts INTEGER NOT NULL DEFAULT 0,
+               correct INTEGER NOT NULL DEFAULT 0,
+               PRIMARY KEY (user_id, dimension, value)
+           ) WITHOUT ROWID''',
+        '''CREATE TABLE IF NOT EXISTS class_rollup (
+               class_name TEXT NOT NULL,
+               dimension TEXT NOT NULL,
+               value TEXT NOT NULL,
+               attempts INTEGER NOT NULL DEFAULT 0,
+               correct INTEGER NOT NULL DEFAULT 0,
+               PRIMARY KEY (class_name, dimension, value)
+           ) WITHOUT ROWID''',
+        # 各彙總/投影已處理到的 answer_log.id（水位）
+        '''CREATE TABLE IF NOT EXISTS rollup_state (
+               name TEXT PRIMARY KEY,
+               last_log_id INTEGER NOT NULL DEFAULT 0
+           )''',
+    ]),
+    (6, "班級學生索引", [
+        # 教師後台：WHERE class_name IS ?，再依 idx_answer_log_user 讀各生水位之後的作答
+        "CREATE INDEX IF NOT EXISTS idx_users_class ON users(class_name)",
+    ]),
+    (7, "題目難度校準（IRT）", [
+        # 見 data_store/calibration.py：refit() 全量重估，catch_up() 線上增量
+        '''CREATE TABLE IF NOT EXISTS item_params (
+               question_id INTEGER PRIMARY KEY,
+               difficulty REAL NOT NULL,            -- b
+               discrimination REAL NOT NULL DEFAULT 1.0,   -- a
+               attempts INTEGER NOT NULL DEFAULT 0,
+               correct INTEGER NOT NULL DEFAULT 0
+           )''',
+        '''CREATE TABLE IF NOT EXISTS student_ability (
+               user_id INTEGER PRIMARY KEY,
+               ability REAL NOT NULL,               -- θ
+               attempts INTEGER NOT NULL DEFAULT 0
+           )''',
+        '''CREATE TABLE IF NOT EXISTS calibration_state (
+               id INTEGER PRIMARY KEY CHECK (id = 1),
+               last_log_id INTEGER NOT NULL DEFAULT 0,   -- 已納入的最後一筆 answer_log.id
+               generation INTEGER NOT NULL DEFAULT 0,    -- 全量重估次數
+               refit_at TEXT
+           )''',
+    ]),
+    (8, "知識追蹤掌握度（BKT）", [
+        # 見 data_store/knowledge_tracing.py；水位記在 rollup_state 的 'knowledge_tracing' 列
+        '''CREATE TABLE IF NOT EXISTS mastery (
+               user_id INTEGER NOT NULL,
+               dimension TEXT NOT NULL,             -- topic / keyword
+               skill TEXT NOT NULL,
+               p_mastery REAL NOT NULL,
+               attempts INTEGER NOT NULL DEFAULT 0,
+               correct INTEGER NOT NULL DEFAULT 0,
+               last_log_id INTEGER NOT NULL DEFAULT 0,
+               PRIMARY KEY (user_id, dimension, skill)
+           ) WITHOUT ROWID''',
+    ]),
+]
+
+MIGRATIONS = {
+    QUESTION_BANK: QUESTION_BANK_MIGRATIONS,
+    USER_LOG: USER_LOG_MIGRATIONS,
+}
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn, db):
+    """把 conn 所在資料庫升級到最新版本，回傳升級後的版本號"""
+    steps = MIGRATIONS[db]
+    for version, description, statements in steps:
+        if schema_version(conn) >= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 取得寫入鎖後再確認一次，避免多個行程同時升級
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        print(f"[migration] {db} 已升級至第 {version} 版：{description}")
+    return schema_version(conn)
+
+# === 索引使用檢查（EXPLAIN QUERY PLAN）===
+# (資料庫, 說明, 查詢, 參數, 查詢計畫中必須出現的字串)
+QUERY_PLAN_CHECKS = [
+    (QUESTION_BANK, "題組子題載入",
+     "SELECT id, content, options, answer FROM questions WHERE group_id = ? ORDER BY id", (1,),
+     "USING INDEX idx_questions_group_id"),
+    (QUESTION_BANK, "依主題取題號",
+     "SELECT id FROM questions WHERE topic = ?", ("閱讀理解",),
+     "USING COVERING INDEX idx_questions_topic"),
+    (QUESTION_BANK, "主題分布統計",
+     "SELECT topic, COUNT(*) FROM questions GROUP BY topic", (),
+     "USING COVERING INDEX idx_questions_topic"),
+    (USER_LOG, "錯題本",
+     """SELECT question_id, group_id, sub_id, student_answer, correct_answer, MAX(timestamp)
+        FROM answer_log WHERE user_id = ? AND is_correct = 0
+        GROUP BY question_id, group_id, sub_id""", (1,),
+     "USING INDEX idx_answer_log_user_wrong"),
+    (USER_LOG, "教練最近錯題",
+     """SELECT DISTINCT question_id FROM answer_log
+        WHERE user_id = ? AND is_correct = 0 ORDER BY timestamp DESC LIMIT 10""", (1,),
+     "USING COVERING INDEX idx_answer_log_user_wrong"),
+    (USER_LOG, "錯題本投影（依最近答錯排序）",
+     "SELECT question_id, last_wrong_at FROM wrongbook WHERE user_id = ? ORDER BY last_wrong_at DESC", (1,),
+     "INDEX idx_wrongbook_user_recent (user_id=?)"),
+    (USER_LOG, "錯題本投影（單題）",
+     "SELECT last_answer, correct_answer FROM wrongbook WHERE user_id = ? AND question_id = ?", (1, "1"),
+     "USING PRIMARY KEY (user_id=? AND question_id=?)"),
+    (USER_LOG, "學生模型增量彙總",
+     """SELECT substr(coalesce(timestamp, ''), 1, 10) AS day, COUNT(*), SUM(coalesce(is_correct, 0) != 0)
+        FROM answer_log WHERE user_id = ? AND id > ? AND id <= ? GROUP BY day""", (1, 0, 100),
+     "USING INDEX idx_answer_log_user (user_id=? AND rowid>? AND rowid<?)"),
+    (USER_LOG, "學習歷程彙總圖表",
+     "SELECT value, attempts, correct FROM user_rollup WHERE user_id = ? AND dimension = ? ORDER BY value", (1, "day"),
+     "USING PRIMARY KEY (user_id=? AND dimension=?)"),
+    (USER_LOG, "學習歷程紀錄（JOIN 題庫）",
+     """SELECT a.timestamp, q.content FROM answer_log a
+        LEFT JOIN qb.questions q ON q.id = a.question_id WHERE a.user_id = ?""", (1,),
+     "SEARCH q USING INTEGER PRIMARY KEY (rowid=?)"),
+    (USER_LOG, "教師後台班級題目統計",
+     """SELECT a.question_id, a.student_answer, COUNT(*), SUM(a.is_correct)
+        FROM users u JOIN answer_log a ON a.user_id = u.id AND a.id > ? AND a.id <= ?
+        WHERE u.class_name IS ? GROUP BY a.question_id, a.student_answer""", (0, 100, "301"),
+     "USING INDEX idx_answer_log_user (user_id=? AND rowid>? AND rowid<?)"),
+    (USER_LOG, "學生掌握度",
+     "SELECT skill, p_mastery, attempts, correct FROM mastery WHERE user_id = ? AND dimension = ? ORDER BY p_mastery, skill",
+     (1, "topic"), "USING PRIMARY KEY (user_id=? AND dimension=?)"),
+]
+
+def explain(conn, sql, params=()):
+    return " | ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+def verify_query_plans(connections=None):
+    """
+    逐一檢查 QUERY_PLAN_CHECKS，回傳 [(說明, 查詢計畫, 是否通過)]。
+    connections 可傳入 {db: conn}，預設使用連線池（user_log 連線會 ATTACH 題庫）。
+    """
+    results = []
+    for db, label, sql, params, expected in QUERY_PLAN_CHECKS:
+        conn = (connections or {}).get(db) or (get_log_connection() if db == USER_LOG else get_connection(db))
+        plan = explain(conn, sql, params)
+        results.append((label, plan, expected in plan))
+    return results
+
+def main(argv):
+    for db in MIGRATIONS:
+        conn = get_connection(db)
+        print(f"{db}: 第 {schema_version(conn)} 版")
+    if "--verify" in argv:
+        failed = 0
+        for label, plan, ok in verify_query_plans():
+            print(f"[{'OK' if ok else 'FAIL'}] {label}: {plan}")
+            failed += not ok
+        if failed:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
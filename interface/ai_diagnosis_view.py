@@ -1,65 +1,25 @@
 # 檔案路徑：interface/ai_diagnosis_view.py
 
 import streamlit as st
-import sqlite3
-import pandas as pd
-import asyncio
-import json
-from agents import Runner
-from assistant_core.ai_diagnosis_agent import ai_diagnosis_agent
-
-LOG_DB_PATH = "data_store/user_log.sqlite"
-QBANK_DB_PATH = "data_store/question_bank.sqlite"
+from assistant_core import llm_client
+from assistant_core.ai_diagnosis_agent import build_diagnosis_context, get_ai_diagnosis_agent
+from data_store.question_loader import get_question_by_id
+from data_store.users import get_user_id
+from data_store.wrongbook import get_wrong_entries
+from data_store.answer_log_writer import AnswerLogError, flush as flush_answer_log
 
 def get_recent_wrong_questions(username, limit=5):
-    conn = sqlite3.connect(LOG_DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT id FROM users WHERE username = ?", (username,))
-    row = c.fetchone()
-    if not row:
+    # 錯題本投影：每題一列，依最近答錯時間排序
+    user_id = get_user_id(username)
+    if not user_id:
         return []
-    user_id = row[0]
-    df = pd.read_sql_query("""
-        SELECT question_id, student_answer, correct_answer, MAX(timestamp) as last_ts
-        FROM answer_log
-        WHERE user_id = ? AND is_correct = 0
-        GROUP BY question_id
-        ORDER BY last_ts DESC
-        LIMIT ?
-    """, conn, params=(user_id, limit))
-    conn.close()
-    return df.to_dict(orient="records")
+    return [
+        {"question_id": qid, "student_answer": wrong_ans, "correct_answer": correct_ans, "last_ts": last_ts}
+        for qid, _, _, wrong_ans, correct_ans, last_ts, *_ in get_wrong_entries(user_id, limit=limit)
+    ]
 
 def get_question_detail(qid):
-    conn = sqlite3.connect(QBANK_DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        SELECT q.id, q.content, q.options, q.answer, q.explanation, q.topic, q.keywords, g.reading_text, g.title, g.category
-        FROM questions q
-        LEFT JOIN question_groups g ON q.group_id = g.id
-        WHERE q.id = ?
-    """, (qid,))
-    row = c.fetchone()
-    conn.close()
-    if not row:
-        return {}
-    options = {}
-    try:
-        options = json.loads(row[2]) if row[2] else {}
-    except Exception:
-        options = {}
-    return {
-        "題號": row[0],
-        "題幹": row[1],
-        "選項": options,
-        "正解": row[3],
-        "解析": row[4],
-        "主題": row[5],
-        "關鍵詞": row[6],
-        "閱讀文本": row[7],
-        "題組標題": row[8],
-        "分類": row[9]
-    }
+    return get_question_by_id(qid)
 
 def run_ai_diagnosis_view():
     st.title("AI 智能診斷與個人化建議")
@@ -70,6 +30,10 @@ def run_ai_diagnosis_view():
         return
 
     # 取得最近錯題
+    try:
+        flush_answer_log()
+    except AnswerLogError as e:
+        st.warning(f"⚠️ {e}")
     wrong_list = get_recent_wrong_questions(username)
     if not wrong_list:
         st.info("目前沒有可診斷的錯題。")
@@ -79,37 +43,30 @@ def run_ai_diagnosis_view():
     choice = st.selectbox("請選擇要診斷的錯題", options, index=0)
     qinfo = wrong_list[options.index(choice)]
     q_detail = get_question_detail(qinfo['question_id'])
+    if q_detail is None:
+        st.warning("題庫中找不到此題，可能已被刪除。")
+        return
 
-    st.markdown(f"**題目：** {q_detail.get('題幹','')}")
-    if q_detail.get("閱讀文本"):
+    st.markdown(f"**題目：** {q_detail.content or ''}")
+    if q_detail.reading_text:
         with st.expander("（點此展開閱讀文本）"):
-            st.markdown(q_detail["閱讀文本"])
+            st.markdown(q_detail.reading_text)
     st.markdown("**選項：**")
-    for k, v in q_detail.get("選項", {}).items():
+    for k, v in q_detail.options.items():
         st.markdown(f"({k}) {v}")
     st.markdown(f"**你的答案：** {qinfo['student_answer']}  \n**正確答案：** {qinfo['correct_answer']}")
-    st.markdown(f"**主題：** {q_detail.get('主題','未分類')}")
-    st.markdown(f"**關鍵詞：** {q_detail.get('關鍵詞','無')}")
-    st.markdown(f"**所屬題組：** {q_detail.get('題組標題','') or '（單題）'} / 分類：{q_detail.get('分類','')}")
+    st.markdown(f"**主題：** {q_detail.topic or '未分類'}")
+    st.markdown(f"**關鍵詞：** {q_detail.keywords or '無'}")
+    st.markdown(f"**所屬題組：** {q_detail.group_title or '（單題）'} / 分類：{q_detail.category or ''}")
 
     if st.button("產生 AI 智能診斷與回饋"):
-        prompt = {
-            "題號": q_detail.get('題號'),
-            "閱讀文本": q_detail.get('閱讀文本'),
-            "題幹": q_detail.get('題幹'),
-            "選項": q_detail.get('選項'),
-            "學生答案": qinfo['student_answer'],
-            "正確答案": qinfo['correct_answer'],
-            "主題": q_detail.get('主題'),
-            "關鍵詞": q_detail.get('關鍵詞'),
-            "解析": q_detail.get('解析'),
-            "題組標題": q_detail.get('題組標題'),
-            "分類": q_detail.get('分類')
-        }
+        context = build_diagnosis_context(q_detail, qinfo['student_answer'], qinfo['correct_answer'])
+        st.caption(context.report())
         st.info("AI 診斷中，請稍候...")
-        ai_prompt = json.dumps(prompt, ensure_ascii=False, indent=2)
+        ai_prompt = context.text
         try:
-            result = asyncio.run(Runner.run(ai_diagnosis_agent, input=ai_prompt))
+            from agents import Runner
+            result = llm_client.run(Runner.run(get_ai_diagnosis_agent(), input=ai_prompt))
             st.success("AI 診斷完成：")
             st.markdown(result.final_output)
         except Exception as e:
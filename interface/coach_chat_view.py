@@ -1,80 +1,49 @@
 # 檔案路徑：interface/coach_chat_view.py
 
 import streamlit as st
-import sqlite3
 import json
 import asyncio
-from models.student_model import StudentModel
-from assistant_core.coach_agent import run_coach_dialogue
+from models.student_model import get_session_model
+from data_store.db import USER_LOG, get_connection
+from data_store.question_loader import get_question_by_id, get_questions_by_ids
+from data_store.question_similarity import similar_questions
+from data_store.answer_log_writer import AnswerLogError, flush as flush_answer_log
+from data_store.users import get_user_id
+from data_store.wrongbook import get_entry, get_wrong_entries
+from assistant_core.coach_agent import build_context, run_coach_dialogue
 
 # === 取得題目完整內容（含閱讀素材、選項）===
 def get_question_info_by_id(qid):
-    conn = sqlite3.connect("data_store/question_bank.sqlite")
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT q.id, q.content, q.options, q.answer, q.paragraph, g.reading_text, g.title
-        FROM questions q
-        LEFT JOIN question_groups g ON q.group_id = g.id
-        WHERE q.id = ?
-    """, (qid,))
-    row = cursor.fetchone()
-    conn.close()
-    if not row:
-        return None
-    qid, content, options_json, answer, paragraph, reading_text, group_title = row
-    try:
-        options = json.loads(options_json) if options_json else {}
-    except Exception:
-        options = {}
-    return {
-        "題號": qid,
-        "題幹": content,
-        "選項": options,
-        "正解": answer,
-        "閱讀素材": reading_text or paragraph or "",
-        "題組名稱": group_title or ""
-    }
+    # Question 同時支援屬性與舊鍵名（題幹、選項、正解、閱讀素材、題組名稱）讀取
+    return get_question_by_id(qid)
 
 # === 取得最近錯題題號 ===
 def get_recent_wrong_qids(limit=10, username=None):
-    conn = sqlite3.connect("data_store/user_log.sqlite")
-    cursor = conn.cursor()
-    if username:
-        cursor.execute("""
-            SELECT DISTINCT question_id FROM answer_log
-            JOIN users ON users.id = answer_log.user_id
-            WHERE is_correct = 0 AND users.username = ?
-            ORDER BY timestamp DESC LIMIT ?
-        """, (username, limit))
-    else:
-        cursor.execute("""
-            SELECT DISTINCT question_id FROM answer_log
-            WHERE is_correct = 0
-            ORDER BY timestamp DESC LIMIT ?
-        """, (limit,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [str(row[0]) for row in rows]
+    user_id = get_user_id(username) if username else None
+    if user_id:
+        return [str(row[0]) for row in get_wrong_entries(user_id, limit=limit)]
+    # 未登入：全體學生最近答錯的題目
+    cursor = get_connection(USER_LOG).cursor()
+    cursor.execute("""
+        SELECT question_id FROM wrongbook
+        GROUP BY question_id
+        ORDER BY MAX(last_wrong_at) DESC LIMIT ?
+    """, (limit,))
+    return [str(row[0]) for row in cursor.fetchall()]
 
 # === 取得該題的學生作答與正解 ===
 def get_student_answer_and_truth(qid, username=None):
-    conn = sqlite3.connect("data_store/user_log.sqlite")
-    cursor = conn.cursor()
-    if username:
-        cursor.execute("""
-            SELECT student_answer, correct_answer FROM answer_log
-            JOIN users ON users.id = answer_log.user_id
-            WHERE question_id = ? AND users.username = ?
-            ORDER BY timestamp DESC LIMIT 1
-        """, (qid, username))
-    else:
-        cursor.execute("""
-            SELECT student_answer, correct_answer FROM answer_log
-            WHERE question_id = ?
-            ORDER BY timestamp DESC LIMIT 1
-        """, (qid,))
+    user_id = get_user_id(username) if username else None
+    if user_id:
+        entry = get_entry(user_id, qid)
+        return (entry[8], entry[4]) if entry else (None, None)
+    cursor = get_connection(USER_LOG).cursor()
+    cursor.execute("""
+        SELECT student_answer, correct_answer FROM answer_log
+        WHERE question_id = ?
+        ORDER BY timestamp DESC LIMIT 1
+    """, (qid,))
     row = cursor.fetchone()
-    conn.close()
     return row if row else (None, None)
 
 # === 主 coach chat 互動介面 ===
@@ -91,6 +60,10 @@ def run_coach_chat_view():
     username = st.session_state.get("username", None)
 
     # 選題（可帶出最近錯題）
+    try:
+        flush_answer_log()
+    except AnswerLogError as e:
+        st.warning(f"⚠️ {e}")
     recent_wrong_qids = get_recent_wrong_qids(username=username)
     options = [""] + recent_wrong_qids
     selected_qid = st.selectbox("（可選）從最近錯題選擇題號：", options=options)
@@ -106,16 +79,18 @@ def run_coach_chat_view():
 
         # 顯示題目內容
         with st.expander("題目內容（含閱讀素材）", expanded=True):
-            if question_info.get("閱讀素材"):
-                st.markdown(f"**閱讀素材/題組說明：**\n{question_info['閱讀素材']}")
-            st.markdown(f"**題幹：** {question_info['題幹']}")
-            options_dict = question_info.get("選項", {})
-            for k, v in options_dict.items():
-                st.markdown(f"({k}) {v}")
+            if question_info is None:
+                st.warning("題庫中找不到此題，可能已被刪除。")
+            else:
+                if question_info.material:
+                    st.markdown(f"**閱讀素材/題組說明：**\n{question_info.material}")
+                st.markdown(f"**題幹：** {question_info.content}")
+                for k, v in question_info.options.items():
+                    st.markdown(f"({k}) {v}")
             if correct_ans:
                 st.caption(f"本題正確答案：{correct_ans}")
-            elif question_info.get("正解"):
-                st.caption(f"本題正確答案：{question_info['正解']}")
+            elif question_info is not None and question_info.answer:
+                st.caption(f"本題正確答案：{question_info.answer}")
             if student_ans:
                 st.caption(f"你上次作答答案：{student_ans}")
 
@@ -130,11 +105,12 @@ def run_coach_chat_view():
         chat_round = st.session_state.coach_chat_round + 1
 
         # 學生歷程摘要
-        summary = StudentModel().export_summary()
+        model = get_session_model(st.session_state, username) if username else None
+        summary = model.export_summary() if model else {}
         summary_text = json.dumps(summary, ensure_ascii=False, indent=2)
 
-        # 組完整 prompt 並送給 coach_agent
-        full_answer = run_coach_dialogue(
+        # 組完整 prompt（依 token 預算打包，附相關教材）並送給 coach_agent
+        context = build_context(
             question_info=question_info or st.session_state.coach_last_qinfo,
             chat_history=chat_history,
             user_input=prompt,
@@ -143,6 +119,10 @@ def run_coach_chat_view():
             correct_ans=correct_ans,
             summary=summary_text
         )
+        st.session_state.coach_last_context_report = context.report()
+        full_answer = run_coach_dialogue(
+            question_info=None, chat_history=chat_history, user_input=prompt, context=context
+        )
 
         st.session_state.coach_chat_history.append(("你", prompt))
         st.session_state.coach_chat_history.append(("AI 教練", full_answer))
@@ -152,9 +132,20 @@ def run_coach_chat_view():
     for speaker, msg in st.session_state.coach_chat_history:
         with st.chat_message("user" if speaker == "你" else "assistant"):
             st.markdown(msg)
+    if st.session_state.get("coach_last_context_report"):
+        st.caption(st.session_state.coach_last_context_report)
 
     if st.session_state.coach_chat_round >= 3:
         st.success("已達三輪討論，自動結束此次互動，請重新開始新的提問！")
+        # 延伸練習：與討論題目最相似的題目
+        if selected_qid:
+            similar = similar_questions(selected_qid, k=3)
+            questions = get_questions_by_ids([sid for sid, _ in similar])
+            if questions:
+                st.markdown("**延伸練習（類似題）：**")
+                for sid, _ in similar:
+                    if sid in questions:
+                        st.markdown(f"- 題號 {sid}【{questions[sid].topic or '未分類'}】{(questions[sid].content or '')[:40]}")
         if st.button("重新開始新的互動"):
             st.session_state.coach_chat_history = []
             st.session_state.coach_chat_round = 0
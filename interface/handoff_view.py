@@ -1,6 +1,6 @@
 import streamlit as st
 from assistant_core.strategies.handoff_workflow import run_handoff_workflow
-import asyncio
+from assistant_core import llm_client
 
 def run_handoff_view():
     st.title("AI 學習診斷與回饋分流")
@@ -20,7 +20,7 @@ def run_handoff_view():
 
     if st.button("執行 AI 分析與分流回饋"):
         with st.spinner("AI 診斷中..."):
-            result = asyncio.run(run_handoff_workflow(prompt))
+            result = llm_client.run(run_handoff_workflow(prompt))
         st.success("完成分析")
         for title, content in result.items():
             st.subheader(title)
@@ -1,13 +1,11 @@
 import streamlit as st
-import sqlite3
 import bcrypt
+from data_store.db import USER_LOG, get_connection
 
 def load_users():
-    conn = sqlite3.connect("data_store/user_log.sqlite")
-    cursor = conn.cursor()
+    cursor = get_connection(USER_LOG).cursor()
     cursor.execute("SELECT username, password_hash, role FROM users")
     users = cursor.fetchall()
-    conn.close()
 
     users_dict = {}
     for username, password_hash, role in users:
@@ -1,7 +1,11 @@
 import streamlit as st
 from data_store.question_group_loader import get_all_groups, import_from_json
+from data_store import bulk_importer
 from assistant_core.llm_generate_questions import generate_questions_with_llm
 import json
+import os
+import shutil
+import tempfile
 
 def render_options(options):
     if not isinstance(options, dict) or not options:
@@ -125,6 +129,28 @@ def run_question_bank_maintain_view():
 
     # ========== 批次匯入 ========== #
     with tab2:
+        st.markdown("**上傳題庫檔（大量匯入）**：支援 JSON 陣列或 JSONL（每行一個題組/單題），逐段讀取、分批寫入；"
+                    "匯入中斷後重新上傳同一檔案會自動續傳。")
+        uploaded = st.file_uploader("題庫檔", type=["json", "jsonl"])
+        if uploaded is not None and st.button("開始匯入檔案"):
+            status = st.empty()
+            suffix = os.path.splitext(uploaded.name)[1]
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+                shutil.copyfileobj(uploaded, tmp)
+            try:
+                stats = bulk_importer.import_file(
+                    tmp.name, progress=lambda s: status.info(f"匯入中：{bulk_importer.format_stats(s)}")
+                )
+                if stats["already_done"]:
+                    status.warning("此檔案先前已完整匯入，未重複匯入。")
+                else:
+                    status.success(f"匯入完成：{bulk_importer.format_stats(stats)}")
+            except Exception as e:
+                status.error(f"匯入中斷（已完成的部分已保留，重新上傳同一檔案可續傳）：{e}")
+            finally:
+                os.remove(tmp.name)
+
+        st.divider()
         st.markdown("請貼上題組/單題 JSON 格式（同一組可混合多組題組）")
         json_text = st.text_area("JSON 輸入區")
         if st.button("批量匯入"):
@@ -1,5 +1,4 @@
 import streamlit as st
-import sqlite3
 import pandas as pd
 import plotly.express as px
 
@@ -8,12 +7,13 @@ from assistant_core.populate_paragraphs import populate_paragraphs
 from assistant_core.populate_keywords import populate_keywords
 from assistant_core.populate_explanations import populate_explanations
 from assistant_core.populate_difficulty import populate_difficulty
+from data_store.db import QUESTION_BANK, get_connection
 
 # === 題庫增補工具 ===
 def run_question_enrich_view():
     st.header("題庫增補工具（AI 輔助段落、關鍵詞、解析、難度）")
 
-    conn = sqlite3.connect("data_store/question_bank.sqlite")
+    conn = get_connection(QUESTION_BANK)
     cursor = conn.cursor()
 
     # 統計各欄位缺漏狀態
@@ -60,7 +60,6 @@ def run_question_enrich_view():
     st.markdown("---")
     st.subheader("🔍 關鍵詞分布統計圖（依頻率）")
     df = pd.read_sql_query("SELECT keywords FROM questions WHERE keywords IS NOT NULL AND keywords != ''", conn)
-    conn.close()
 
     from collections import Counter
     all_keywords = []
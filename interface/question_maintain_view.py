@@ -1,15 +1,13 @@
 import streamlit as st
-import sqlite3
 import json
-
-DB_PATH = "data_store/question_bank.sqlite"
+from data_store.bank_cache import bump_bank_version
+from data_store.db import QUESTION_BANK, get_connection, transaction
 
 st.title('題庫維護管理介面')
 
 # ----------- 工具函式 --------------
 def get_questions(keyword=None):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    c = get_connection(QUESTION_BANK).cursor()
     if keyword:
         rows = c.execute(
             "SELECT id, passage, text, options, answer, analysis, difficulty, tags FROM questions WHERE text LIKE ? ORDER BY id DESC", ('%' + keyword + '%',)
@@ -18,33 +16,28 @@ def get_questions(keyword=None):
         rows = c.execute(
             "SELECT id, passage, text, options, answer, analysis, difficulty, tags FROM questions ORDER BY id DESC"
         ).fetchall()
-    conn.close()
     return rows
 
 def update_question(qid, field, value):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(f"UPDATE questions SET {field}=? WHERE id=?", (value, qid))
-    conn.commit()
-    conn.close()
+    with transaction(QUESTION_BANK) as conn:
+        conn.execute(f"UPDATE questions SET {field}=? WHERE id=?", (value, qid))
+    bump_bank_version()
 
 def add_question(**kwargs):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO questions (passage, text, options, answer, analysis, difficulty, tags) VALUES (?, ?, ?, ?, ?, ?, ?)",
-        (
-            kwargs.get("passage", ""),
-            kwargs["text"],
-            json.dumps(kwargs.get("options", [])),
-            kwargs["answer"],
-            kwargs.get("analysis", ""),
-            kwargs.get("difficulty", ""),
-            json.dumps(kwargs.get("tags", [])),
-        ),
-    )
-    conn.commit()
-    conn.close()
+    with transaction(QUESTION_BANK) as conn:
+        conn.execute(
+            "INSERT INTO questions (passage, text, options, answer, analysis, difficulty, tags) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                kwargs.get("passage", ""),
+                kwargs["text"],
+                json.dumps(kwargs.get("options", [])),
+                kwargs["answer"],
+                kwargs.get("analysis", ""),
+                kwargs.get("difficulty", ""),
+                json.dumps(kwargs.get("tags", [])),
+            ),
+        )
+    bump_bank_version()
 
 # ----------- Streamlit UI --------------
 
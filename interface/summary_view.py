@@ -1,50 +1,31 @@
 # 檔案路徑：interface/summary_view.py
 
 import streamlit as st
-import sqlite3
 import pandas as pd
 import plotly.express as px
-from models.student_model import StudentModel
+from models.student_model import get_session_model
 import json
-import asyncio
-from assistant_core.learning_summary_agent import summary_agent
-from agents import Runner
+from assistant_core import llm_client
+from assistant_core.learning_summary_agent import get_summary_agent
+from data_store.answer_history import HISTORY_COLUMNS, get_user_history
+from data_store.answer_log_writer import AnswerLogError, flush as flush_answer_log
+from data_store.knowledge_tracing import MASTERED, catch_up as catch_up_mastery, get_mastery, weakest_skills
+from data_store.rollups import catch_up as catch_up_rollups, get_user_rollup
+from data_store.users import get_user_id
 
-LOG_DB_PATH = "data_store/user_log.sqlite"
-QB_DB_PATH = "data_store/question_bank.sqlite"
-
-# 取得完整合併紀錄（answer_log join questions join question_groups）
+# 取得該生作答紀錄並附上題目欄位（在 SQLite 內 JOIN 題庫，只取回該生的紀錄）
 def get_joined_logs():
-    conn_log = sqlite3.connect(LOG_DB_PATH)
-    conn_qb = sqlite3.connect(QB_DB_PATH)
-    cursor = conn_log.cursor()
-    cursor.execute("SELECT id FROM users WHERE username = ?", (st.session_state.username,))
-    row = cursor.fetchone()
-    if not row:
-        conn_log.close()
-        conn_qb.close()
+    user_id = get_user_id(st.session_state.username)
+    if not user_id:
         return pd.DataFrame()
-    user_id = row[0]
-    log_df = pd.read_sql_query("SELECT * FROM answer_log WHERE user_id = ? ORDER BY timestamp DESC", conn_log, params=(user_id,))
-    if log_df.empty:
-        conn_log.close()
-        conn_qb.close()
-        return log_df
-    # 讀 questions
-    q_df = pd.read_sql_query("SELECT * FROM questions", conn_qb)
-    # 讀 group
-    g_df = pd.read_sql_query("SELECT id as group_id, title, reading_text, category FROM question_groups", conn_qb)
-    conn_log.close()
-    conn_qb.close()
-    # 型別對齊（確保 question_id 為 int）
-    log_df['question_id'] = log_df['question_id'].astype(str)
-    q_df['id'] = q_df['id'].astype(str)
-    merged = pd.merge(log_df, q_df, left_on='question_id', right_on='id', how='left', suffixes=('', '_q'))
-    merged = pd.merge(merged, g_df, left_on='group_id', right_on='group_id', how='left', suffixes=('', '_g'))
-    return merged
+    return pd.DataFrame(get_user_history(user_id), columns=HISTORY_COLUMNS)
 
 def run_summary_view():
     st.header("學習歷程紀錄")
+    try:
+        flush_answer_log()
+    except AnswerLogError as e:
+        st.warning(f"⚠️ {e}")
 
     df = get_joined_logs()
     if df.empty:
@@ -73,46 +54,58 @@ def run_summary_view():
     st.subheader("作答紀錄")
     st.dataframe(disp_df, use_container_width=True)
 
+    # 以下圖表直接讀取作答統計彙總表（data_store/rollups.py），不再對整段紀錄 groupby
+    catch_up_rollups()
+    user_id = get_user_id(st.session_state.username)
+
     # 每日正確率趨勢
     st.subheader("每日正確率趨勢")
-    df_chart = df.copy()
-    df_chart['date'] = df_chart['timestamp'].dt.date
-    trend = df_chart.groupby('date')['is_correct'].apply(lambda x: (x == '正確').mean()).reset_index()
-    trend.columns = ['日期', '正確率']
+    trend = pd.DataFrame(
+        [(day, correct / attempts) for day, attempts, correct in get_user_rollup(user_id, "day")],
+        columns=['日期', '正確率']
+    )
     fig = px.line(trend, x='日期', y='正確率', markers=True)
     fig.update_layout(yaxis_tickformat=".0%", height=400)
     st.plotly_chart(fig, use_container_width=True)
 
     # 作答結果分布
     st.subheader("作答結果分布")
-    pie_data = df['is_correct'].value_counts().reset_index()
-    pie_data.columns = ['結果', '數量']
+    total = get_user_rollup(user_id, "all")
+    attempts, correct = (total[0][1], total[0][2]) if total else (0, 0)
+    pie_data = pd.DataFrame([('正確', correct), ('錯誤', attempts - correct)], columns=['結果', '數量'])
     fig2 = px.pie(pie_data, values='數量', names='結果', hole=0.4)
     st.plotly_chart(fig2, use_container_width=True)
 
-    # 主題/關鍵詞/難度弱點分布
+    # 主題/關鍵詞/難度/題型弱點分布
     st.subheader("主題/關鍵詞/難度弱點分析（僅統計錯題）")
-    for col, label in [('topic', '主題'), ('keywords', '關鍵詞'), ('difficulty', '難度')]:
-        err_df = df[df['is_correct'] == '錯誤']
-        if not err_df.empty and col in err_df.columns:
-            if col == 'keywords':
-                from collections import Counter
-                all_keywords = []
-                for kws in err_df['keywords'].dropna():
-                    all_keywords.extend([k.strip() for k in str(kws).split(",") if k.strip()])
-                stats = Counter(all_keywords)
-                chart_df = pd.DataFrame(stats.items(), columns=[label, '錯題數']).sort_values('錯題數', ascending=False)
-            else:
-                stats = err_df[col].value_counts()
-                chart_df = pd.DataFrame({label: stats.index, '錯題數': stats.values})
-            if not chart_df.empty:
-                fig_kw = px.bar(chart_df, x=label, y='錯題數', title=f"錯題{label}分布")
-                st.plotly_chart(fig_kw, use_container_width=True)
+    for dimension, label in [('topic', '主題'), ('keyword', '關鍵詞'), ('difficulty', '難度'), ('question_type', '題型')]:
+        chart_df = pd.DataFrame(
+            [(value, attempts - correct) for value, attempts, correct in get_user_rollup(user_id, dimension)
+             if attempts > correct],
+            columns=[label, '錯題數']
+        ).sort_values('錯題數', ascending=False)
+        if not chart_df.empty:
+            fig_kw = px.bar(chart_df, x=label, y='錯題數', title=f"錯題{label}分布")
+            st.plotly_chart(fig_kw, use_container_width=True)
+
+    # 主題掌握度（知識追蹤，data_store/knowledge_tracing.py）
+    st.subheader("各主題掌握度")
+    catch_up_mastery()
+    mastery_df = pd.DataFrame(
+        [(skill, p, attempts) for skill, p, attempts, _ in get_mastery(user_id, "topic")],
+        columns=['主題', '掌握度', '作答數']
+    )
+    if not mastery_df.empty:
+        fig_m = px.bar(mastery_df, x='主題', y='掌握度', hover_data=['作答數'])
+        fig_m.add_hline(y=MASTERED, line_dash="dot")
+        fig_m.update_layout(yaxis_tickformat=".0%", yaxis_range=[0, 1])
+        st.plotly_chart(fig_m, use_container_width=True)
 
     # 顯示個人學習摘要
     st.subheader("個人學習摘要")
-    model = StudentModel()
-    summary = model.export_summary()
+    # 學生模型存於 session，重新整理頁面時只讀取新作答紀錄
+    model = get_session_model(st.session_state, st.session_state.username)
+    summary = model.export_summary() if model else {}
     st.json(summary)
 
     # AI 總結建議
@@ -124,16 +117,17 @@ def run_summary_view():
             disp_df_json['作答時間'] = disp_df_json['作答時間'].astype(str)
         prompt = json.dumps({
             "學習摘要": summary,
+            "待加強主題（掌握度）": {skill: f"{p:.0%}" for skill, p, _ in weakest_skills(user_id, "topic")},
+            "待加強關鍵詞（掌握度）": {skill: f"{p:.0%}" for skill, p, _ in weakest_skills(user_id, "keyword")},
             "近30筆作答資料": disp_df_json.head(30).to_dict(orient="records")
         }, ensure_ascii=False, indent=2)
         try:
-            result = asyncio.run(Runner.run(summary_agent, input=prompt))
+            from agents import Runner
+            result = llm_client.run(Runner.run(get_summary_agent(), input=prompt))
             st.success(result.final_output)
         except Exception as e:
             st.warning(f"[AI 回饋失敗] {e}")
 
-    model.close()
-
 # 若直接執行
 if __name__ == "__main__":
     run_summary_view()
@@ -0,0 +1,74 @@
+# 檔案路徑：interface/teacher_dashboard_view.py
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from data_store.answer_log_writer import AnswerLogError, flush as flush_answer_log
+from data_store.question_loader import get_questions_by_ids
+from models import cohort_analytics
+
+ALL_LABEL = "全校"
+
+def run_teacher_dashboard_view():
+    st.header("教師後台：班級學習分析")
+    try:
+        flush_answer_log()
+    except AnswerLogError as e:
+        st.warning(f"⚠️ {e}")
+
+    options = [ALL_LABEL] + cohort_analytics.list_classes()
+    choice = st.selectbox("選擇班級", options)
+    class_name = cohort_analytics.ALL_CLASSES if choice == ALL_LABEL else choice
+
+    # 班級題目統計存於行程快取，只累加上次之後的新作答
+    stats = cohort_analytics.get_cohort_stats(class_name)
+    attempts, correct = stats.total()
+    if not attempts:
+        st.info("此班級尚未有任何作答紀錄。")
+        return
+
+    students = cohort_analytics.student_accuracy(class_name)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("學生數", len(students))
+    col2.metric("作答總數", f"{attempts:,}")
+    col3.metric("整體正確率", f"{correct / attempts:.1%}")
+
+    # 每日正確率趨勢
+    st.subheader("全班每日正確率趨勢")
+    trend = pd.DataFrame(cohort_analytics.accuracy_trend(class_name), columns=['日期', '正確率', '作答數'])
+    fig = px.line(trend, x='日期', y='正確率', markers=True, hover_data=['作答數'])
+    fig.update_layout(yaxis_tickformat=".0%", height=400)
+    st.plotly_chart(fig, use_container_width=True)
+
+    # 最弱主題
+    st.subheader("最弱主題（正確率最低）")
+    topics = pd.DataFrame(cohort_analytics.weakest_topics(class_name), columns=['主題', '正確率', '作答數'])
+    if not topics.empty:
+        fig2 = px.bar(topics, x='主題', y='正確率', hover_data=['作答數'])
+        fig2.update_layout(yaxis_tickformat=".0%")
+        st.plotly_chart(fig2, use_container_width=True)
+
+    # 各題答對率（p 值）
+    st.subheader("各題答對率（由難到易）")
+    p_values = stats.p_values()[:50]
+    questions = get_questions_by_ids([qid for qid, _, _ in p_values])
+    p_df = pd.DataFrame([
+        (qid, p, n, questions[qid].content[:40] if qid in questions else "（題目已刪除）")
+        for qid, p, n in p_values
+    ], columns=['題號', '答對率', '作答數', '題幹'])
+    st.dataframe(p_df, use_container_width=True)
+
+    # 選項（誘答）分布
+    if not p_df.empty:
+        qid = st.selectbox("查看選項分布", p_df['題號'].tolist())
+        q = questions.get(qid)
+        dist = pd.DataFrame(list(stats.distractors(qid).items()), columns=['選項', '人次'])
+        if q is not None:
+            dist['是否正解'] = dist['選項'].map(lambda opt: '正解' if opt == q.answer else '誘答')
+            st.markdown(f"**題幹：** {q.content}")
+        fig3 = px.bar(dist, x='選項', y='人次', color='是否正解' if q is not None else None)
+        st.plotly_chart(fig3, use_container_width=True)
+
+    # 學生正確率
+    st.subheader("學生正確率（由低到高）")
+    st.dataframe(pd.DataFrame(students, columns=['帳號', '作答數', '正確率']), use_container_width=True)
@@ -1,27 +1,15 @@
 # 檔案路徑：interface/topic_classify_view.py
 
 import streamlit as st
-import sqlite3
 import json
-import os
 import time
-from dotenv import load_dotenv
-from agents import Agent, OpenAIChatCompletionsModel, AsyncOpenAI, Runner
 import asyncio
-
-# === 初始化 Gemini 模型 ===
-load_dotenv()
-client = AsyncOpenAI(
-    base_url=os.getenv("GOOGLE_GEMINI_ENDPOINT"),
-    api_key=os.getenv("GOOGLE_GEMINI_API_KEY")
-)
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=client
-)
+from assistant_core.llm_client import lazy_agent
+from data_store.bank_cache import bump_bank_version
+from data_store.db import QUESTION_BANK, get_connection, transaction
 
 # === 建立分類用 Agent ===
-classifier = Agent(
+get_classifier = lazy_agent(
     name="TopicClassifier",
     instructions="""
 你是一位台灣高中國文素養導向命題專家，負責為學測國文題目標記最適合的主題類別。
@@ -37,12 +25,11 @@ classifier = Agent(
 
 請**僅回傳分類名稱**，不要解釋或加任何其他內容。
 """,
-    model=model
 )
 
-def classify_and_update_questions(db_path="data_store/question_bank.sqlite"):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+def classify_and_update_questions(db_path=QUESTION_BANK):
+    from agents import Runner
+    cursor = get_connection(db_path).cursor()
     # 取出題目 & 其對應 group_id
     cursor.execute("SELECT id, group_id, content, options FROM questions WHERE topic IS NULL OR topic = '' OR topic = '待分類'")
     rows = cursor.fetchall()
@@ -93,12 +80,14 @@ def classify_and_update_questions(db_path="data_store/question_bank.sqlite"):
             result = None
             for attempt in range(2):  # 最多重試一次
                 try:
-                    out = Runner.run_sync(classifier, input=prompt)
+                    out = Runner.run_sync(get_classifier(), input=prompt)
                     topic = out.final_output.strip().replace("：", "").replace(":", "")
                     topic = topic.split()[0]
                     valid_topics = {"閱讀理解", "文意推論", "修辭判斷", "語用語境", "語詞詞義", "篇章結構", "文學常識", "其他"}
                     if topic in valid_topics:
-                        cursor.execute("UPDATE questions SET topic = ? WHERE id = ?", (topic, qid))
+                        # 每題各自提交，避免整批 LLM 呼叫期間長時間持有寫入鎖
+                        with transaction(db_path) as conn:
+                            conn.execute("UPDATE questions SET topic = ? WHERE id = ?", (topic, qid))
                         classified += 1
                         break
                     time.sleep(4.0)
@@ -113,15 +102,14 @@ def classify_and_update_questions(db_path="data_store/question_bank.sqlite"):
             print(f"未預期錯誤（題號 {qid}）：{e}")
             failed += 1
 
-    conn.commit()
-    conn.close()
+    bump_bank_version()
     return classified, failed
 
 # === Streamlit UI ===
 def run_topic_classify_view():
     st.header("題目主題分類工具（AI 協助）")
 
-    conn = sqlite3.connect("data_store/question_bank.sqlite")
+    conn = get_connection(QUESTION_BANK)
     cursor = conn.cursor()
 
     # 題目分類統計圖表
@@ -142,5 +130,3 @@ def run_topic_classify_view():
         with st.spinner("AI 分類進行中，請稍候..."):
             classified, failed = classify_and_update_questions()
         st.success(f"已完成 {classified} 題分類，失敗 {failed} 題")
-
-    conn.close()
@@ -1,61 +1,43 @@
 # 檔案路徑：interface/wrongbook_view.py
 
 import streamlit as st
-import sqlite3
-from data_store.question_loader import get_question_by_id
+from data_store.question_loader import get_questions_by_ids
+from data_store.question_similarity import similar_questions
+from data_store.wrongbook import get_wrong_entries
+from data_store.answer_log_writer import AnswerLogError, flush as flush_answer_log
+from data_store.users import get_user_id
 import pandas as pd
 from collections import Counter
 import datetime
 
-LOG_DB_PATH = "data_store/user_log.sqlite"
-QUESTION_DB_PATH = "data_store/question_bank.sqlite"
+def get_wrong_log(user_id):
+    # 直接讀錯題本投影：(question_id, group_id, sub_id, 最近答錯所選, 正解, 最近答錯時間, 答錯次數, 已訂正, 最近作答)
+    return get_wrong_entries(user_id)
 
-def get_user_id(username):
-    conn = sqlite3.connect(LOG_DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT id FROM users WHERE username = ?", (username,))
-    user_row = c.fetchone()
-    conn.close()
-    return user_row[0] if user_row else None
+def get_wrong_questions(wrong_logs):
+    # 所有錯題的題目、題組、主題/關鍵詞一次查回：{question_id: Question}
+    return get_questions_by_ids(row[0] for row in wrong_logs)
 
-def get_wrong_log(user_id):
-    conn = sqlite3.connect(LOG_DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        SELECT question_id, group_id, sub_id, student_answer, correct_answer, MAX(timestamp)
-        FROM answer_log
-        WHERE user_id = ? AND is_correct = 0
-        GROUP BY question_id, group_id, sub_id
-        ORDER BY MAX(timestamp) DESC
-    """, (user_id,))
-    rows = c.fetchall()
-    conn.close()
-    return rows
-
-def get_question_topic(qid):
-    conn = sqlite3.connect(QUESTION_DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT topic, keywords FROM questions WHERE id = ?", (qid,))
-    row = c.fetchone()
-    conn.close()
-    return (row[0], row[1]) if row else ("未分類", "")
-
-def get_all_wrong_topics(wrong_logs):
+def get_question_topic(qid, questions):
+    q = questions.get(qid)
+    return (q.topic, q.keywords) if q else ("未分類", "")
+
+def get_all_wrong_topics(wrong_logs, questions):
     topics = []
     keywords = []
     for row in wrong_logs:
         qid = row[0]
-        topic, kws = get_question_topic(qid)
+        topic, kws = get_question_topic(qid, questions)
         if topic: topics.append(topic)
         if kws: keywords += [k.strip() for k in kws.split(",") if k.strip()]
     return topics, keywords
 
-def summarize_error_patterns(wrong_logs):
+def summarize_error_patterns(wrong_logs, questions):
     # 以簡單規則產生摘要
     if not wrong_logs:
         return ""
     last_5 = wrong_logs[:5]
-    topic_count = Counter([get_question_topic(row[0])[0] for row in last_5])
+    topic_count = Counter([get_question_topic(row[0], questions)[0] for row in last_5])
     if topic_count:
         top_topic = topic_count.most_common(1)[0][0]
         return f"你最近的錯題多屬於「{top_topic}」類型，建議加強該主題練習。"
@@ -66,12 +48,28 @@ def get_weekly_review_recommendation(wrong_logs):
     week_ago = (datetime.datetime.now() - datetime.timedelta(days=7)).isoformat()
     week_ids = []
     for row in wrong_logs:
-        if row[-1] > week_ago:
+        if row[5] > week_ago:
             week_ids.append(row[0])
     if week_ids:
         return f"本週推薦回顧題目：{', '.join([str(i) for i in week_ids[:5]])}"
     return "本週沒有新錯題，建議複習舊錯題。"
 
+def show_similar_questions(qid, exclude):
+    # 相似度索引找出同類題目，點選後切換到作答任務頁練習
+    similar = similar_questions(qid, k=3, exclude=exclude)
+    if not similar:
+        st.caption("題庫中找不到類似題目。")
+        return
+    questions = get_questions_by_ids([sid for sid, _ in similar])
+    for sid, score in similar:
+        q = questions.get(sid)
+        if not q:
+            continue
+        st.markdown(f"- 題號 {sid}【{q.topic or '未分類'}】{(q.content or '')[:40]}（相似度 {score:.2f}）")
+        if st.button("練習這題", key=f"similar_{qid}_{sid}"):
+            st.session_state["from_wrongbook"] = sid
+            st.info("請切換至『作答任務』功能頁作答！")
+
 def render_options(options, my_ans=None, correct_ans=None):
     res = []
     for k, v in options.items():
@@ -95,17 +93,25 @@ def run_wrongbook_view():
         st.error("查無此帳號")
         return
 
+    # 確保剛提交的作答已寫入
+    try:
+        flush_answer_log()
+    except AnswerLogError as e:
+        st.warning(f"⚠️ {e}")
+
     wrong_logs = get_wrong_log(user_id)
     if not wrong_logs:
         st.info("目前沒有錯題紀錄，請繼續努力學習！")
         return
 
+    questions = get_wrong_questions(wrong_logs)
+
     # === AI 高頻錯因摘要 ===
     st.subheader("AI 錯題重點提醒")
-    st.info(summarize_error_patterns(wrong_logs))
+    st.info(summarize_error_patterns(wrong_logs, questions))
 
     # === 主題分類統計圖 ===
-    topics, keywords = get_all_wrong_topics(wrong_logs)
+    topics, keywords = get_all_wrong_topics(wrong_logs, questions)
     if topics:
         topic_count = Counter(topics)
         df_topic = pd.DataFrame(topic_count.items(), columns=["主題", "錯題數"])
@@ -120,30 +126,32 @@ def run_wrongbook_view():
 
     # === 分組顯示所有錯題 ===
     st.subheader("我的錯題列表")
+    wrong_qids = {row[0] for row in wrong_logs}
     for row in wrong_logs:
-        qid, group_id, sub_id, my_ans, correct_ans, last_ts = row
-        q = get_question_by_id(qid)
+        qid, group_id, sub_id, my_ans, correct_ans, last_ts, wrong_count, corrected, last_answer = row
+        q = questions.get(qid)
         if not q:
             continue
 
-        qid_disp = q.get('題號') or q.get('sub_id') or q.get('id')
-        topic, kws = get_question_topic(qid)
-        expander_label = f"【{topic}】題號：{qid_disp} | 最近作答：{last_ts}"
+        qid_disp = q.id
+        topic, kws = get_question_topic(qid, questions)
+        status = "✅ 已訂正" if corrected else f"❌ 錯 {wrong_count} 次"
+        expander_label = f"【{topic}】題號：{qid_disp} | {status} | 最近答錯：{last_ts}"
         with st.expander(expander_label):
             # 主題/關鍵詞標籤
             if kws:
                 st.caption(f"關鍵詞：{kws}")
 
             # 閱讀素材/題目/選項
-            if q.get("type") in ("group_sub",):
-                st.markdown(f"**閱讀文本：**\n{q.get('reading_text', '')}")
-            st.markdown(f"**題目：** {q.get('題幹', '')}")
-            st.markdown(f"**選項：**\n{render_options(q.get('選項', {}), my_ans, correct_ans)}")
+            if q.kind == "group_sub":
+                st.markdown(f"**閱讀文本：**\n{q.reading_text or ''}")
+            st.markdown(f"**題目：** {q.content or ''}")
+            st.markdown(f"**選項：**\n{render_options(q.options, my_ans, correct_ans)}")
             st.markdown(f"**我的答案：** {my_ans}")
             st.markdown(f"**正解：** {correct_ans}")
 
             # 標準解析
-            explanation = q.get("解析") or q.get("explanation")
+            explanation = q.explanation
             showexp = st.checkbox("顯示解析", key=f"showexp_{qid_disp}")
             if explanation and explanation.strip() and showexp:
                 st.markdown(explanation)
@@ -157,3 +165,9 @@ def run_wrongbook_view():
                 st.session_state["diagnosis_entry_qid"] = qid
                 st.info("請切換至『AI 智能診斷』功能頁進行診斷！")
 
+            # 再練類似題（排除已在錯題本中的題目）
+            if st.button("再練類似題", key=f"similar_btn_{qid_disp}"):
+                st.session_state[f"show_similar_{qid_disp}"] = True
+            if st.session_state.get(f"show_similar_{qid_disp}"):
+                show_similar_questions(qid, wrong_qids)
+
@@ -11,6 +11,11 @@ from interface.question_enrich_view import run_question_enrich_view
 from interface.login_view import run_login_view
 from interface.question_bank_maintain_view import run_question_bank_maintain_view
 from interface.ai_diagnosis_view import run_ai_diagnosis_view  # << 新增
+from interface.teacher_dashboard_view import run_teacher_dashboard_view
+from rag_tools import knowledge_store
+
+# 教材知識索引在背景建立／檢查更新，不在第一次教練或診斷請求中才建
+knowledge_store.refresh_in_background()
 
 # 檢查是否登入
 if 'username' not in st.session_state or 'role' not in st.session_state:
@@ -28,7 +33,7 @@ else:
         ])
     elif role == 'teacher':
         menu = st.sidebar.radio("功能選擇", [
-            "教師後台 (開發中)",
+            "教師後台",
             "AI 教練互動模式",
             "AI 智能診斷"   # << 新功能
         ])
@@ -39,6 +44,7 @@ else:
             "我的錯題本",
             "AI 教練互動模式",
             "AI 智能診斷",  # << 新功能
+            "教師後台",
             "題目主題分類",
             "題庫增補工具",
             "題庫維護"
@@ -64,6 +70,6 @@ else:
         run_question_enrich_view()
     elif menu == "題庫維護":
         run_question_bank_maintain_view()
-    elif menu == "教師後台 (開發中)":
-        st.info("教師後台功能開發中...")
+    elif menu == "教師後台":
+        run_teacher_dashboard_view()
 
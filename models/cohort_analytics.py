@@ -0,0 +1,150 @@
+# 檔案路徑：learning_assistant/models/cohort_analytics.py
+
+# 教師後台的班級分析：全班每日正確率、各題答對率（p 值）、選項（誘答）分布、最弱主題、學生正確率。
+#
+# - 每日趨勢、主題：直接讀 class_rollup（data_store/rollups.py 已依班級累計）
+# - 各題答對率與選項分布：由 SQLite 以 GROUP BY (題號, 學生選項) 分批聚合，
+#   Python 端只保存「題數 × 選項數」大小的計數，記憶體與作答筆數無關
+# - 每個班級的結果快取在行程內，以 answer_log 最大 id 為水位：
+#   沒有新作答時直接回傳快取；有新作答時只聚合水位之後的紀錄並累加（不重算全部）
+#
+# class_name 為 None 時表示全校。
+
+import threading
+from collections import Counter
+from data_store.db import USER_LOG, get_connection
+from data_store.rollups import UNASSIGNED_CLASS, catch_up as catch_up_rollups
+
+ALL_CLASSES = None
+MIN_ATTEMPTS = 5        # 答對率、弱點主題至少需要的作答數
+
+_CLASS_DELTA_SQL = """
+    SELECT a.question_id, a.student_answer, COUNT(*), SUM(a.is_correct)
+    FROM users u
+    JOIN answer_log a ON a.user_id = u.id AND a.id > ? AND a.id <= ?
+    WHERE u.class_name IS ?
+    GROUP BY a.question_id, a.student_answer
+"""
+_SCHOOL_DELTA_SQL = """
+    SELECT question_id, student_answer, COUNT(*), SUM(is_correct)
+    FROM answer_log
+    WHERE id > ? AND id <= ?
+    GROUP BY question_id, student_answer
+"""
+
+class CohortStats:
+    """單一班級（或全校）的題目層級累計統計"""
+
+    def __init__(self, class_name=ALL_CLASSES):
+        self.class_name = class_name
+        self.watermark = 0          # 已納入統計的最後一筆 answer_log.id
+        self.questions = {}         # 題號 → [作答數, 答對數]
+        self.choices = {}           # 題號 → Counter(學生選項 → 次數)
+        self.lock = threading.Lock()
+
+    def refresh(self, conn=None):
+        """納入水位之後的新作答（不論哪一班寫入都只推進水位），回傳新納入的作答數"""
+        conn = conn or get_connection(USER_LOG)
+        with self.lock:
+            latest = conn.execute("SELECT MAX(id) FROM answer_log").fetchone()[0] or 0
+            if latest <= self.watermark:
+                return 0
+            if self.class_name is ALL_CLASSES:
+                cursor = conn.execute(_SCHOOL_DELTA_SQL, (self.watermark, latest))
+            else:
+                # 未分班學生的 class_name 為 NULL；IS ? 同時涵蓋 NULL 與一般字串
+                class_name = None if self.class_name == UNASSIGNED_CLASS else self.class_name
+                cursor = conn.execute(_CLASS_DELTA_SQL, (self.watermark, latest, class_name))
+            added = 0
+            for qid, answer, n, right in cursor:
+                counts = self.questions.get(qid)
+                if counts is None:
+                    counts = self.questions[qid] = [0, 0]
+                    self.choices[qid] = Counter()
+                counts[0] += n
+                counts[1] += right or 0
+                self.choices[qid][answer or ""] += n
+                added += n
+            self.watermark = latest
+            return added
+
+    def total(self):
+        attempts = sum(c[0] for c in self.questions.values())
+        correct = sum(c[1] for c in self.questions.values())
+        return attempts, correct
+
+    def p_values(self, min_attempts=MIN_ATTEMPTS):
+        """[(題號, 答對率, 作答數)]，由難到易"""
+        rows = [(qid, right / n, n) for qid, (n, right) in self.questions.items() if n >= min_attempts]
+        rows.sort(key=lambda r: (r[1], -r[2], r[0]))
+        return rows
+
+    def distractors(self, qid):
+        """{選項: 次數}，依次數由多到少"""
+        return dict(self.choices.get(str(qid), Counter()).most_common())
+
+
+# === 行程內快取 ===
+_cache = {}
+_cache_lock = threading.Lock()
+
+def get_cohort_stats(class_name=ALL_CLASSES):
+    """取得班級統計；有新作答時只累加新紀錄"""
+    with _cache_lock:
+        stats = _cache.get(class_name)
+        if stats is None:
+            stats = _cache[class_name] = CohortStats(class_name)
+    stats.refresh()
+    return stats
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+# === 班級彙總（class_rollup）===
+def list_classes():
+    rows = get_connection(USER_LOG).execute(
+        "SELECT DISTINCT class_name FROM users WHERE role = 'student' ORDER BY class_name"
+    ).fetchall()
+    return [row[0] or UNASSIGNED_CLASS for row in rows]
+
+def _rollup(class_name, dimension):
+    catch_up_rollups()
+    conn = get_connection(USER_LOG)
+    if class_name is ALL_CLASSES:
+        return conn.execute("""
+            SELECT value, SUM(attempts), SUM(correct) FROM class_rollup
+            WHERE dimension = ? GROUP BY value ORDER BY value
+        """, (dimension,)).fetchall()
+    return conn.execute("""
+        SELECT value, attempts, correct FROM class_rollup
+        WHERE class_name = ? AND dimension = ? ORDER BY value
+    """, (class_name, dimension)).fetchall()
+
+def accuracy_trend(class_name=ALL_CLASSES):
+    """[(日期, 正確率, 作答數)]"""
+    return [(day, right / n, n) for day, n, right in _rollup(class_name, "day") if n]
+
+def weakest_topics(class_name=ALL_CLASSES, topn=10, min_attempts=MIN_ATTEMPTS):
+    """[(主題, 正確率, 作答數)]，正確率由低到高"""
+    rows = [(topic, right / n, n) for topic, n, right in _rollup(class_name, "topic") if n >= min_attempts]
+    rows.sort(key=lambda r: (r[1], -r[2]))
+    return rows[:topn]
+
+def student_accuracy(class_name=ALL_CLASSES):
+    """[(帳號, 作答數, 正確率)]，正確率由低到高（取自 user_rollup 總計列）"""
+    catch_up_rollups()
+    sql = """
+        SELECT u.username, r.attempts, r.correct
+        FROM users u
+        JOIN user_rollup r ON r.user_id = u.id AND r.dimension = 'all' AND r.value = ''
+        WHERE u.role = 'student'
+    """
+    params = ()
+    if class_name is not ALL_CLASSES:
+        sql += " AND u.class_name IS ?"
+        params = (None if class_name == UNASSIGNED_CLASS else class_name,)
+    rows = get_connection(USER_LOG).execute(sql, params).fetchall()
+    result = [(name, n, right / n) for name, n, right in rows if n]
+    result.sort(key=lambda r: r[2])
+    return result
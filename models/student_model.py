@@ -1,70 +1,157 @@
-import sqlite3
-import pandas as pd
+import heapq
 from collections import Counter
-from datetime import datetime
+from data_store.db import USER_LOG, get_connection
+from data_store import answer_history
+from data_store.users import get_user_id
 
-DB_PATH_LOG = "data_store/user_log.sqlite"
-DB_PATH_QUESTIONS = "data_store/question_bank.sqlite"
+# 單一學生的學習模型：只讀取該生的作答紀錄，統計量以增量方式維護。
+# - refresh() 只彙總上次水位（最後一筆 answer_log.id）之後的新紀錄；建立時即為從 0 開始彙總
+# - 每日作答數/答對數與各題答錯次數在 SQLite 內 GROUP BY，只讀回彙總後的列（天數、題數），
+#   不把每筆作答轉成 Python 物件再逐列累計（逐列讀取本身就是主要成本）
+# - 狀態大小只與該生作答過的題數、天數有關，與全體作答紀錄筆數無關
+# - from_export() 改由離線匯出檔（data_store/log_export.py）建立，不讀正式資料庫
 
-# 初始化學生模型
 class StudentModel:
-    def __init__(self):
-        self.conn = sqlite3.connect(DB_PATH_LOG)
-        self.df = pd.read_sql_query("SELECT * FROM answer_log ORDER BY timestamp DESC", self.conn)
-        self.df['timestamp'] = pd.to_datetime(self.df['timestamp'])
-        self.df['date'] = self.df['timestamp'].dt.date
+    def __init__(self, user_id, refresh=True):
+        self.user_id = user_id
+        self.watermark = 0          # 已納入統計的最後一筆 answer_log.id
+        self.attempts = 0
+        self.correct = 0
+        self.by_date = {}           # 日期字串 → [作答數, 答對數]
+        self.wrong_counts = Counter()
+        if refresh:
+            self.refresh()
 
-        # 額外開啟題庫連線（用於錯題主題分析）
-        self.q_conn = sqlite3.connect(DB_PATH_QUESTIONS)
+    @classmethod
+    def for_username(cls, username):
+        user_id = get_user_id(username)
+        return cls(user_id) if user_id else None
+
+    @classmethod
+    def from_export(cls, user_id, export_dir=None):
+        """
+        由離線匯出檔（data_store/log_export.py）建立，不連線正式資料庫；
+        水位設為匯出的最後一筆，之後呼叫 refresh() 會從這裡接續讀取正式資料庫。
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        from data_store import log_export
+        table = log_export.read_answers(export_dir or log_export.EXPORT_DIR, user_ids=[user_id],
+                                        columns=["log_id", "timestamp", "question_id", "is_correct"])
+        model = cls(user_id, refresh=False)
+        if table.num_rows:
+            # 與 refresh() 相同的彙總，改由 Arrow 的 group_by 在欄式資料上完成
+            correct = table["is_correct"].fill_null(False)
+            by_day = pa.table({
+                "day": pc.utf8_slice_codeunits(table["timestamp"], 0, 10).fill_null(""),
+                "right": pc.cast(correct, pa.int64()),
+            }).group_by("day").aggregate([("right", "count"), ("right", "sum")])
+            wrong = pa.table({
+                "qid": pc.filter(table["question_id"].fill_null("None"), pc.invert(correct)),
+            }).group_by("qid").aggregate([("qid", "count")])
+            model._apply_rollups(
+                zip(by_day["day"].to_pylist(), by_day["right_count"].to_pylist(), by_day["right_sum"].to_pylist()),
+                zip(wrong["qid"].to_pylist(), wrong["qid_count"].to_pylist()))
+            model.watermark = pc.max(table["log_id"]).as_py()
+        return model
+
+    def refresh(self):
+        """納入水位之後的新作答紀錄，回傳新增筆數"""
+        c = get_connection(USER_LOG).cursor()
+        high = c.execute("SELECT MAX(id) FROM answer_log WHERE user_id = ? AND id > ?",
+                         (self.user_id, self.watermark)).fetchone()[0]
+        if high is None:
+            return 0
+        # 兩個彙總查詢都限定在 (水位, high]，之間新寫入的紀錄留給下次 refresh()
+        params = (self.user_id, self.watermark, high)
+        by_day = c.execute("""
+            SELECT substr(coalesce(timestamp, ''), 1, 10) AS day, COUNT(*), SUM(coalesce(is_correct, 0) != 0)
+            FROM answer_log
+            WHERE user_id = ? AND id > ? AND id <= ?
+            GROUP BY day
+        """, params).fetchall()
+        wrong = c.execute("""
+            SELECT coalesce(CAST(question_id AS TEXT), 'None') AS qid, COUNT(*)
+            FROM answer_log
+            WHERE user_id = ? AND id > ? AND id <= ? AND coalesce(is_correct, 0) = 0
+            GROUP BY qid
+        """, params).fetchall()
+        added = self._apply_rollups(by_day, wrong)
+        self.watermark = high
+        return added
+
+    def _apply_rollups(self, by_day, wrong):
+        """累計彙總結果：by_day 為 (日期, 作答數, 答對數)、wrong 為 (題號字串, 答錯次數)，回傳作答數"""
+        added = 0
+        for day, total, right in by_day:
+            counts = self.by_date.setdefault(day, [0, 0])
+            counts[0] += total
+            counts[1] += right
+            added += total
+            self.correct += right
+        self.attempts += added
+        for qid, n in wrong:
+            self.wrong_counts[qid] += n
+        return added
 
     def total_attempts(self):
-        return len(self.df)
+        return self.attempts
 
     def accuracy_rate(self):
-        if self.df.empty:
+        if not self.attempts:
             return 0
-        return (self.df['student_answer'] == self.df['correct_answer']).mean()
+        return self.correct / self.attempts
 
     def accuracy_by_date(self):
-        return self.df.groupby('date').apply(
-            lambda x: (x['student_answer'] == x['correct_answer']).mean()
-        ).reset_index(name='accuracy')
+        """[{'date': 'YYYY-MM-DD', 'accuracy': 0~1}]，依日期排序"""
+        return [{"date": day, "accuracy": right / total}
+                for day, (total, right) in sorted(self.by_date.items())]
 
     def most_wrong_questions(self, topn=5):
-        wrong = self.df[self.df['student_answer'] != self.df['correct_answer']]
-        return wrong['question_id'].value_counts().head(topn).reset_index().rename(columns={
-            'index': 'question_id',
-            'question_id': 'times_wrong'
-        })
+        # 同錯誤次數時依題號排序，結果與紀錄的讀取順序無關（正式資料庫與匯出檔建立的模型一致）
+        top = heapq.nsmallest(topn, self.wrong_counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [{"question_id": qid, "times_wrong": n} for qid, n in top]
 
     def get_wrong_topic_distribution(self):
-        """統計錯題主題（需對照題庫資料）"""
-        wrong_ids = self.df[self.df['student_answer'] != self.df['correct_answer']]['question_id'].tolist()
-        if not wrong_ids:
+        """統計錯題主題（每道答錯過的題目計一次，主題取自題庫；於 SQL 內 JOIN 題庫）"""
+        if not self.wrong_counts:
             return {}
-
-        # 把題號帶入題庫查詢主題
-        q_cursor = self.q_conn.cursor()
-        format_ids = ",".join([f"'{qid}'" for qid in wrong_ids])
-        q_cursor.execute(f"SELECT topic FROM questions WHERE id IN ({format_ids})")
-        topics = [row[0] for row in q_cursor.fetchall() if row[0]]
-        return dict(Counter(topics))
+        return answer_history.get_wrong_topic_distribution(self.user_id)
 
     def export_summary(self):
         return {
             "答題總數": self.total_attempts(),
             "整體正確率": round(self.accuracy_rate() * 100, 1),
-            "常錯題前幾名": self.most_wrong_questions().to_dict(orient="records")
+            "常錯題前幾名": self.most_wrong_questions()
         }
 
     def close(self):
-        self.conn.close()
-        self.q_conn.close()
+        # 連線由 data_store.db 連線池管理，保留此方法以相容既有呼叫端
+        pass
+
+
+def get_session_model(state, username):
+    """
+    取得存放在 state（如 st.session_state）中的學生模型：
+    同一學生重複取用時只 refresh() 新紀錄，換人登入才重新建立。
+    """
+    user_id = get_user_id(username)
+    if not user_id:
+        return None
+    model = state.get("student_model")
+    if model is None or model.user_id != user_id:
+        model = state["student_model"] = StudentModel(user_id)
+    else:
+        model.refresh()
+    return model
 
 
 # 範例使用
 if __name__ == "__main__":
-    model = StudentModel()
-    print(model.export_summary())
-    print(model.get_wrong_topic_distribution())
-    model.close()
+    import sys
+    model = StudentModel.for_username(sys.argv[1] if len(sys.argv) > 1 else "student1")
+    if model is None:
+        print("查無此帳號")
+    else:
+        print(model.export_summary())
+        print(model.get_wrong_topic_distribution())
@@ -0,0 +1,246 @@
+# 檔案路徑：learning_assistant/rag_tools/context_packer.py
+
+# prompt 內容打包：題目、檢索到的教材片段（knowledge_store）、對話歷程等各段，
+# 在固定的 token 預算內挑出最相關的內容，重複的片段只放一次。
+#
+# - 必要段落（題幹、選項、答案、學生本輪輸入）一定放入；其餘段落依宣告順序分配預算，
+#   每段最多用 share × 可用預算，沒用完的額度留給後面的段落；最後剩下的預算再補給被截短的段落
+# - 閱讀文本：超出額度時依與題幹/選項的二元組重疊程度挑段落（長段落改挑句子），
+#   仍照原文順序排列，省略處標「……」
+# - 教材片段：依檢索排名放入，與已放入內容高度重疊（DEDUP_RATIO）的略過
+# - 對話歷程：由最近一輪往前放，放不下的較早對話整段省略
+# - 截斷一律取開頭、盡量停在句末，同樣輸入永遠得到同樣輸出
+#
+# token 數以字元估算（中日韓字元約 1 token、其他約 4 字元 1 token），不依賴特定模型的 tokenizer。
+# 每次打包回傳 PackedContext，含實際 token 數與「全部內容不刪減」時的 token 數（即節省量）。
+
+import math
+import re
+
+DEDUP_RATIO = 0.8          # 片段的二元組有此比例已出現在先前內容時視為重複
+MIN_PIECE_TOKENS = 24      # 剩餘額度低於此值時不再截斷放入片段
+ELLIPSIS = "……"
+
+_CJK_RE = re.compile(r"[㐀-鿿豈-﫿　-〿＀-￯]")
+_SENTENCE_END = "。！？；!?\n"
+
+# === token 估算與截斷 ===
+def estimate_tokens(text):
+    """中日韓字元（含全形標點）每字 1 token，其餘非空白字元每 4 字 1 token"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    other = len(text) - cjk - text.count(" ") - text.count("\n")
+    return cjk + math.ceil(max(other, 0) / 4)
+
+def truncate(text, max_tokens):
+    """取開頭不超過 max_tokens 的部分，盡量停在句末，截斷時結尾加「……」"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max_tokens - estimate_tokens(ELLIPSIS)
+    if limit <= 0:
+        return ""
+    # 二分搜尋最長的前綴（estimate_tokens 對前綴長度單調遞增）
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= limit:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+    end = max(cut.rfind(ch) for ch in _SENTENCE_END)
+    if end >= len(cut) // 2:
+        cut = cut[:end + 1]
+    return cut.rstrip() + ELLIPSIS
+
+def _bigrams(text):
+    chars = [c for c in text if c.isalnum()]
+    return {a + b for a, b in zip(chars, chars[1:])}
+
+# === 段落 ===
+class Section:
+    """
+    prompt 的一段。kind：
+      "fixed"    必要內容，一定放入（items 為單一字串）
+      "passage"  長文，依與 query 的相關度挑段落（items 為單一字串）
+      "snippets" 依排名排列的片段 list，去除重複
+      "history"  對話 list（舊到新），由新往舊放
+    """
+    __slots__ = ("title", "kind", "items", "share", "query")
+
+    def __init__(self, title, kind, items, share=1.0, query=""):
+        self.title = title
+        self.kind = kind
+        self.items = items
+        self.share = share
+        self.query = query
+
+    def full_text(self):
+        if self.kind in ("fixed", "passage"):
+            return self.items or ""
+        return "\n".join(self.items)
+
+def fixed(title, text):
+    return Section(title, "fixed", text or "")
+
+def passage(title, text, query="", share=0.35):
+    return Section(title, "passage", text or "", share, query)
+
+def snippets(title, texts, share=0.3):
+    return Section(title, "snippets", [t for t in texts if t], share)
+
+def history(title, turns, share=0.4):
+    return Section(title, "history", [t for t in turns if t], share)
+
+class PackedContext:
+    __slots__ = ("text", "tokens", "full_tokens", "budget", "sections")
+
+    def __init__(self, text, tokens, full_tokens, budget, sections):
+        self.text = text
+        self.tokens = tokens
+        self.full_tokens = full_tokens
+        self.budget = budget
+        self.sections = sections      # [(標題, 放入的 token 數, 原本的 token 數)]
+
+    @property
+    def saved(self):
+        return max(self.full_tokens - self.tokens, 0)
+
+    def report(self):
+        return (f"prompt 約 {self.tokens:,} tokens（預算 {self.budget:,}，"
+                f"未打包 {self.full_tokens:,}，節省 {self.saved:,}）")
+
+    def __repr__(self):
+        return f"PackedContext(tokens={self.tokens}, full_tokens={self.full_tokens}, saved={self.saved})"
+
+# === 各種段落的挑選 ===
+def _pack_passage(section, allowance):
+    text = section.items
+    if estimate_tokens(text) <= allowance:
+        return text
+    # 單位為段落；超過額度一半的長段落再切成句子，避免最相關的段落整段放不下
+    paragraphs = []
+    for para in re.split(r"\n+", text):
+        para = para.strip()
+        if estimate_tokens(para) > allowance // 2:
+            paragraphs += [s for s in re.split(r"(?<=[。！？])", para) if s.strip()]
+        elif para:
+            paragraphs.append(para)
+    query = _bigrams(section.query)
+
+    def relevance(i):
+        grams = _bigrams(paragraphs[i])
+        return len(grams & query) / math.sqrt(len(grams) + 1)
+    ranked = sorted(range(len(paragraphs)), key=lambda i: (-relevance(i), i))
+    chosen, used = set(), 0
+    for i in ranked:
+        cost = estimate_tokens(paragraphs[i]) + estimate_tokens(ELLIPSIS)
+        if used + cost <= allowance:
+            chosen.add(i)
+            used += cost
+    if not chosen:
+        return truncate(paragraphs[ranked[0]], allowance)
+    parts, last = [], -1
+    for i in sorted(chosen):
+        if i != last + 1:
+            parts.append(ELLIPSIS)
+        parts.append(paragraphs[i])
+        last = i
+    if last != len(paragraphs) - 1:
+        parts.append(ELLIPSIS)
+    return "\n".join(parts)
+
+def _pack_snippets(section, allowance, seen):
+    picked, used = [], 0
+    for text in section.items:
+        grams = _bigrams(text)
+        if grams and len(grams & seen) >= DEDUP_RATIO * len(grams):
+            continue
+        cost = estimate_tokens(text)
+        if used + cost > allowance:
+            if allowance - used >= MIN_PIECE_TOKENS:
+                picked.append(truncate(text, allowance - used))
+            break
+        picked.append(text)
+        used += cost
+        seen |= grams
+    return "\n".join(picked)
+
+def _pack_history(section, allowance):
+    if estimate_tokens(section.full_text()) <= allowance:
+        return section.full_text()
+    allowance -= estimate_tokens("（省略較早的 00 則對話）")
+    kept, used = [], 0
+    for turn in reversed(section.items):
+        cost = estimate_tokens(turn)
+        if used + cost > allowance:
+            if not kept and allowance >= MIN_PIECE_TOKENS:
+                kept.append(truncate(turn, allowance))
+            break
+        kept.append(turn)
+        used += cost
+    dropped = len(section.items) - len(kept)
+    lines = ([f"（省略較早的 {dropped} 則對話）"] if dropped else []) + kept[::-1]
+    return "\n".join(lines)
+
+# === 打包 ===
+def pack(sections, budget):
+    """
+    依預算打包各段，回傳 PackedContext；輸出順序同 sections。
+    必要段落合計已超過預算時，由最長的必要段落開始截斷。
+    """
+    header_cost = sum(estimate_tokens(s.title) + 1 for s in sections)
+    full = {id(s): s.full_text() for s in sections}
+    out = {}
+    required = [s for s in sections if s.kind == "fixed"]
+    for s in required:
+        out[id(s)] = s.items
+    over = sum(estimate_tokens(t) for t in out.values()) + header_cost - budget
+    for s in sorted(required, key=lambda s: -estimate_tokens(s.items)):
+        if over <= 0:
+            break
+        tokens = estimate_tokens(out[id(s)])
+        out[id(s)] = truncate(out[id(s)], max(tokens - over, 0))
+        over -= tokens - estimate_tokens(out[id(s)])
+
+    available = max(budget - header_cost - sum(estimate_tokens(out[id(s)]) for s in required), 0)
+    remaining, seen = available, set()
+    for s in required:
+        seen |= _bigrams(out[id(s)])
+    carry = 0
+    for s in sections:
+        if s.kind == "fixed":
+            continue
+        allowance = min(int(available * s.share) + carry, remaining)
+        if s.kind == "passage":
+            text = _pack_passage(s, allowance)
+            seen |= _bigrams(text)      # 教材片段與已放入的閱讀文本重複時不再放入
+        elif s.kind == "snippets":
+            text = _pack_snippets(s, allowance, seen)
+        else:
+            text = _pack_history(s, allowance)
+        used = estimate_tokens(text)
+        carry = allowance - used
+        remaining -= used
+        out[id(s)] = text
+    # 後面的段落沒用完的預算，依序補給前面被截短的閱讀文本與對話
+    for s in sections:
+        if remaining <= 0:
+            break
+        if s.kind in ("passage", "history") and out[id(s)] != full[id(s)]:
+            used = estimate_tokens(out[id(s)])
+            pack_fn = _pack_passage if s.kind == "passage" else _pack_history
+            text = pack_fn(s, used + remaining)
+            remaining -= estimate_tokens(text) - used
+            out[id(s)] = text
+
+    blocks, stats = [], []
+    for s in sections:
+        text = out[id(s)]
+        stats.append((s.title, estimate_tokens(text), estimate_tokens(full[id(s)])))
+        if text:
+            blocks.append(f"{s.title}\n{text}" if s.title else text)
+    text = "\n".join(blocks)
+    full_text = "\n".join(f"{s.title}\n{full[id(s)]}" for s in sections if full[id(s)])
+    return PackedContext(text, estimate_tokens(text), estimate_tokens(full_text), budget, stats)
@@ -0,0 +1,134 @@
+# 檔案路徑：learning_assistant/rag_tools/knowledge_index.py
+
+# 教材知識索引：knowledge_base/*.json 的標題、詞語、內容、釋義、例句與重點，
+# 切成中日韓字元二元組（bigram）建立倒排索引，以 BM25 排序回傳最相關的 k 筆。
+#
+# - 索引的持久化（記憶體映射開啟、依來源檔增量重建）與行程內快取見 knowledge_store.py
+# - 倒排串列以 numpy CSR 陣列存放；查詢只累加查詢詞的倒排串列，以 bincount 算分
+# - 查詢只有單一字元時改用單字（unigram）索引
+
+import numpy as np
+
+from data_store.text_tokens import char_codes, word_chars
+
+K1 = 1.2
+B = 0.75
+TITLE_BOOST = 2           # 標題/詞語重複計入的次數
+TEXT_FIELDS = ("title", "term", "content", "definition", "example", "points")
+TF_MAX = 65535            # 詞頻以 uint16 存放
+
+_BIGRAM = 1 << 42
+
+# === 切詞 ===
+def tokenize(texts):
+    """
+    多篇一次切詞，回傳 (文件索引, 詞 key, 詞頻, 每篇二元組數)；
+    同時產生二元組與單字 key，(文件, 詞) 不重複且依此排序。
+    """
+    cp = char_codes(texts)
+    sep = cp == 0
+    doc_of_char = np.cumsum(sep) - sep
+    valid = word_chars(cp)
+    pair = valid[:-1] & valid[1:]
+    docs = np.concatenate([doc_of_char[:-1][pair], doc_of_char[valid]])
+    keys = np.concatenate([_BIGRAM | (cp[:-1][pair] << 21) | cp[1:][pair], cp[valid]])
+    lengths = np.bincount(doc_of_char[:-1][pair], minlength=len(texts))
+    if not len(keys):
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64), lengths
+    vocab, term = np.unique(keys, return_inverse=True)
+    pairs, tf = np.unique(docs * len(vocab) + term, return_counts=True)
+    return pairs // len(vocab), vocab[pairs % len(vocab)], tf, lengths
+
+def query_terms(query):
+    """查詢詞：各連續字串的二元組；只有單一字元的片段改用單字"""
+    cp = char_codes([query or ""])
+    valid = word_chars(cp)
+    pair = valid[:-1] & valid[1:]
+    keys = _BIGRAM | (cp[:-1][pair] << 21) | cp[1:][pair]
+    # 前後都不是文字的單一字元
+    prev = np.concatenate([[False], valid[:-1]])
+    nxt = np.concatenate([valid[1:], [False]])
+    single = cp[valid & ~prev & ~nxt]
+    return np.unique(np.concatenate([keys, single]))
+
+def entry_text(item):
+    """教材條目的索引文字；標題/詞語重複 TITLE_BOOST 次以提高權重"""
+    parts = []
+    for field in TEXT_FIELDS:
+        value = item.get(field)
+        if not value:
+            continue
+        if isinstance(value, list):
+            value = "\n".join(str(v) for v in value)
+        parts += [str(value)] * (TITLE_BOOST if field in ("title", "term") else 1)
+    return "\n".join(parts)
+
+# === 索引 ===
+ARRAYS = ("terms", "term_ptr", "post_docs", "post_tf", "idf", "length_norm")
+
+def build_postings(docs, keys, tf, lengths):
+    """
+    由 tokenize() 的結果（同一詞的 docs 需遞增）建立 BM25 倒排陣列，回傳 {名稱: 陣列}：
+    詞表 terms 與 term_ptr 為 CSR 索引，post_docs / post_tf 為倒排串列，詞頻以 uint16 存放。
+    """
+    order = np.argsort(keys, kind="stable")
+    terms, starts, df = np.unique(keys[order], return_index=True, return_counts=True)
+    n = len(lengths)
+    avgdl = lengths.mean() if n else 1.0
+    return {
+        "terms": terms,
+        "term_ptr": np.append(starts, len(order)).astype(np.int64),
+        "post_docs": docs[order].astype(np.int32),
+        "post_tf": np.minimum(tf[order], TF_MAX).astype(np.uint16),
+        "idf": np.log(1.0 + (n - df + 0.5) / (df + 0.5)),
+        # BM25 分母中與文件長度有關的部分：k1 * (1 - b + b * dl / avgdl)
+        "length_norm": (K1 * (1 - B + B * lengths / max(avgdl, 1e-9))).astype(np.float32),
+    }
+
+class KnowledgeIndex:
+    """
+    BM25 倒排索引；entries 為教材條目 dict 的 list。
+    arrays 為 build_postings() 的結果（可為記憶體映射陣列，見 knowledge_store），
+    此時 entries 只需支援 len() 與索引存取。
+    """
+
+    def __init__(self, entries, arrays=None):
+        if arrays is None:
+            entries = list(entries)
+            arrays = build_postings(*tokenize([entry_text(item) for item in entries]))
+        self.entries = entries
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, query, k=3):
+        """[(BM25 分數, 條目)]，分數由高到低"""
+        return [(score, self.entries[i]) for score, i in self.scored_ids(query, k)]
+
+    def search_ids(self, query, k=3):
+        """前 k 名的文件編號，分數由高到低"""
+        return [i for _, i in self.scored_ids(query, k)]
+
+    def scored_ids(self, query, k=3):
+        """[(BM25 分數, 文件編號)]，分數由高到低"""
+        keys = query_terms(query)
+        if not len(keys) or not len(self.terms) or not len(self.entries):
+            return []
+        pos = np.minimum(np.searchsorted(self.terms, keys), len(self.terms) - 1)
+        found = pos[self.terms[pos] == keys]
+        if not len(found):
+            return []
+        docs, contrib = [], []
+        for p in found.tolist():
+            start, end = self.term_ptr[p], self.term_ptr[p + 1]
+            d, tf = self.post_docs[start:end], self.post_tf[start:end]
+            docs.append(d)
+            contrib.append(self.idf[p] * tf * (K1 + 1) / (tf + self.length_norm[d]))
+        scores = np.bincount(np.concatenate(docs), np.concatenate(contrib), len(self.entries))
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = sorted(hits.tolist(), key=lambda i: (-scores[i], i))
+        return [(float(scores[i]), i) for i in hits]
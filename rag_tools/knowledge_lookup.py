@@ -1,25 +1,30 @@
-import json
+import logging
 
-# === 簡易知識查詢工具（查詢教材資料） ===
-def load_knowledge_data(filepath="教材庫/材論資料庫.json"):
-    with open(filepath, "r", encoding="utf-8") as f:
-        return json.load(f)
+from rag_tools.knowledge_store import search
+
+logger = logging.getLogger(__name__)
 
-def lookup_knowledge(query, data=None):
-    if data is None:
-        data = load_knowledge_data()
-    results = []
-    for item in data:
-        text = json.dumps(item, ensure_ascii=False)
-        if query in text:
-            results.append(item)
-    return results[:3]  # 限制最多回傳 3 筆
+# === 簡易知識查詢工具（查詢教材資料） ===
+# 查詢改由 knowledge_index 的 BM25 倒排索引處理（索引存於磁碟、以記憶體映射開啟，見 knowledge_store），不再每次重讀 JSON 逐筆比對
+def lookup_knowledge(query, k=3):
+    """
+    回傳最相關的 k 筆教材條目（BM25 與向量相似度融合排序），查詢 knowledge_base 與 data/ 的全部教材。
+    索引尚未建好或查詢失敗時回傳空 list（記錄錯誤），教練與診斷 prompt 照常送出，只是沒有教材段落。
+    """
+    try:
+        return [item for _, item in search(query, k)]
+    except Exception:
+        logger.exception("教材知識查詢失敗：%s", query)
+        return []
 
 # === Tool 包裝（可供 Agent 呼叫） ===
 def knowledge_tool(query):
     hits = lookup_knowledge(query)
     if not hits:
         return "找不到相關教材資料。"
-    return "\n\n".join([
-        f"【{h.get('type', '教材')}】{h.get('title') or h.get('term')}\n{h.get('content') or h.get('definition')}" for h in hits
-    ])
+    return "\n\n".join(format_entry(h) for h in hits)
+
+def format_entry(h):
+    """教材條目轉成「【類型】標題 + 內容」文字（Agent 工具與 prompt 打包共用）"""
+    return (f"【{h.get('type', '教材')}】{h.get('title') or h.get('term')}\n"
+            f"{h.get('content') or h.get('definition') or chr(10).join(h.get('points', []))}")
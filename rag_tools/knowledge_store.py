@@ -0,0 +1,459 @@
+# 檔案路徑：learning_assistant/rag_tools/knowledge_store.py
+
+# 教材知識索引的磁碟格式：來源檔（knowledge_base/*.json、*.txt 與 data/ 內的純文字課文）
+# 建成 knowledge_index.KnowledgeIndex，序列化到 INDEX_DIR，之後以記憶體映射開啟，不必每次啟動重建。
+#
+#   INDEX_DIR/manifest.json              來源檔清單（大小、修改時間、SHA-1）與目前的索引世代
+#   INDEX_DIR/segments/<sha1>-v2.npz|.jsonl 每個來源檔的切詞結果、向量與條目（依內容雜湊命名）
+#   INDEX_DIR/gen-000001/*.npy           合併後的倒排陣列（terms、term_ptr、post_docs ...）
+#   INDEX_DIR/gen-000001/vectors.npy     雜湊 n-gram 向量矩陣（float32，見 knowledge_vectors）
+#   INDEX_DIR/gen-000001/docs.jsonl      文件表：每行一筆條目 JSON，doc_offsets.npy 為各行位移
+#
+# - 增量重建：大小與修改時間不變的來源檔直接沿用；有變動的才計算 SHA-1，內容真的改變
+#   才重新切詞。BM25 的 idf 與平均長度取決於全部文件，所以合併步驟（排序倒排串列）每次重做，
+#   但只是 numpy 排序，成本遠低於切詞
+# - 寫入新世代目錄後才更新 manifest.json（原子替換），中斷時舊索引仍可使用
+# - 建立時持有 INDEX_DIR/build.lock 檔案鎖：多個 Streamlit 行程同時發現來源變動時，
+#   後到的行程等前一個建完，再讀到新的 manifest 直接沿用，不會同時寫同一個世代目錄
+# - 行程內換到新世代時關閉舊索引的檔案與記憶體映射（長時間執行的行程不累積）
+# - 查詢（search）不在請求中建立索引：只用目前已開啟的索引，檢查來源檔與重建交給背景執行緒；
+#   main.py 啟動時即在背景建立（refresh_in_background），部署時也可先以 CLI build
+# - 開啟時陣列以 np.load(mmap_mode="r") 映射、條目在查詢命中時才解碼；
+#   查詢為 BM25 與向量相似度的融合排名（knowledge_vectors.HybridIndex）
+# - 同一目錄下有同名 .json 的 .txt（如 cailun.txt）視為 JSON 的純文字版，不重複索引
+#
+# 手動執行：python -m rag_tools.knowledge_store build [--force] | verify | search 查詢字串
+
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+
+import numpy as np
+
+from rag_tools.knowledge_index import ARRAYS, TF_MAX, KnowledgeIndex, build_postings, entry_text, tokenize
+from rag_tools.knowledge_vectors import DIM, HybridIndex, embed
+
+logger = logging.getLogger(__name__)
+
+SOURCE_DIRS = ("knowledge_base", "data")
+INDEX_DIR = "data_store/knowledge_index"
+FORMAT_VERSION = 2
+JSON_SUFFIXES = (".json",)
+TEXT_SUFFIXES = ("", ".txt")     # data/ 內的課文為無副檔名的 UTF-8 純文字
+CHECK_INTERVAL = 2.0             # 查詢時最多每隔幾秒檢查一次來源檔是否變動
+MANIFEST = "manifest.json"
+BUILD_LOCK = "build.lock"
+
+_HEADER_RE = re.compile(r"^【(.+?)】(.*)$")
+
+# === 來源檔 ===
+def list_sources(source_dirs=SOURCE_DIRS):
+    """索引的來源檔路徑；有同名 .json 的純文字檔略過"""
+    paths = []
+    for directory in source_dirs:
+        for path in glob.glob(os.path.join(directory, "*")):
+            stem, suffix = os.path.splitext(path)
+            if not os.path.isfile(path) or suffix.lower() not in JSON_SUFFIXES + TEXT_SUFFIXES:
+                continue
+            if suffix.lower() in TEXT_SUFFIXES and os.path.exists(stem + ".json"):
+                continue
+            paths.append(path)
+    return sorted(paths)
+
+def parse_text(text, path):
+    """
+    純文字來源轉成條目：有【類型】標題 標頭的檔案（如 cailun.txt）每個標頭為一筆；
+    其餘視為課文，第一行為篇名，之後每段一筆。
+    """
+    lines = [line.strip() for line in text.splitlines()]
+    entries = []
+    if any(_HEADER_RE.match(line) for line in lines):
+        for line in lines:
+            match = _HEADER_RE.match(line)
+            if match:
+                entries.append({"type": match.group(1), "title": match.group(2).strip(), "content": []})
+            elif line and entries:
+                entries[-1]["content"].append(line)
+        for item in entries:
+            item["content"] = "\n".join(item["content"])
+    else:
+        paragraphs = [line for line in lines if line]
+        title = paragraphs[0] if paragraphs else os.path.basename(path)
+        entries = [{"type": "課文", "title": f"{title}（第 {n} 段）", "content": para}
+                   for n, para in enumerate(paragraphs[1:], start=1)]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for n, item in enumerate(entries, start=1):
+        item["id"] = f"{stem}-{n:03d}"
+    return entries
+
+def load_source(path):
+    """來源檔的條目 list；無法以 UTF-8 解碼的檔案（PDF 等）視為沒有條目"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return []
+    if os.path.splitext(path)[1].lower() in JSON_SUFFIXES:
+        data = json.loads(text)
+        return [item for item in (data if isinstance(data, list) else [data]) if isinstance(item, dict)]
+    return parse_text(text, path)
+
+def _sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# === 建立 ===
+def read_manifest(index_dir=INDEX_DIR):
+    try:
+        with open(os.path.join(index_dir, MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == FORMAT_VERSION else None
+
+def _segment_base(index_dir, digest):
+    """分段檔名含格式版本：格式改變時舊分段不會被沿用"""
+    return os.path.join(index_dir, "segments", f"{digest}-v{FORMAT_VERSION}")
+
+def _write_segment(index_dir, digest, entries):
+    """分段：切詞結果（依詞排序、壓縮）與條目的 JSON 行，合併時直接串接"""
+    base = _segment_base(index_dir, digest)
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    texts = [entry_text(item) for item in entries]
+    docs, keys, tf, lengths = tokenize(texts)
+    # 分段內先依詞排序：合併時各分段是已排序的連續區段，穩定排序（timsort）只需歸併；
+    # 詞只存一次（vocab + 每詞筆數），不必每筆倒排都存 8 bytes 的詞 key
+    order = np.argsort(keys, kind="stable")
+    vocab, counts = np.unique(keys, return_counts=True)
+    lines = [json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n" for item in entries]
+    np.savez(base + ".npz", vectors=embed(texts),
+             docs=docs[order].astype(np.int32), vocab=vocab, counts=counts.astype(np.int32),
+             tf=np.minimum(tf[order], TF_MAX).astype(np.uint16), lengths=lengths.astype(np.int32),
+             line_lengths=np.array([len(line) for line in lines], dtype=np.int64))
+    with open(base + ".jsonl", "wb") as f:
+        f.writelines(lines)
+
+def _read_segment(index_dir, digest):
+    base = _segment_base(index_dir, digest)
+    with np.load(base + ".npz") as seg:
+        arrays = {name: seg[name] for name in seg.files}
+    with open(base + ".jsonl", "rb") as f:
+        return f.read(), arrays
+
+class _FileLock:
+    """跨行程的互斥鎖（INDEX_DIR/build.lock），阻塞到取得為止"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "a+b")
+        if os.name == "nt":
+            import msvcrt
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:      # LK_LOCK 約 10 秒後放棄，繼續等
+                    pass
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if os.name == "nt":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+
+def build(source_dirs=SOURCE_DIRS, index_dir=INDEX_DIR, force=False):
+    """
+    增量建立索引，回傳 {"sources", "tokenized", "docs", "generation"}；
+    來源檔都沒變動時不寫入任何檔案（tokenized 為 0、generation 不變）。
+    建立期間持有跨行程的檔案鎖，manifest 在取得鎖之後才讀取。
+    """
+    with _FileLock(os.path.join(index_dir, BUILD_LOCK)):
+        return _build(source_dirs, index_dir, force)
+
+def _build(source_dirs, index_dir, force):
+    old = None if force else read_manifest(index_dir)
+    old_sources = old["sources"] if old else {}
+    sources, tokenized = {}, 0
+    for path in list_sources(source_dirs):
+        st = os.stat(path)
+        prev = old_sources.get(path)
+        if prev and (prev["size"], prev["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            sources[path] = prev
+            continue
+        digest = _sha1(path)
+        if force or not os.path.exists(_segment_base(index_dir, digest) + ".npz"):
+            _write_segment(index_dir, digest, load_source(path))
+            tokenized += 1
+        sources[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": digest}
+
+    digests = [info["sha1"] for info in sources.values()]
+    if old and tokenized == 0 and digests == [info["sha1"] for info in old_sources.values()]:
+        if sources != old_sources:   # 只有修改時間變動：更新 manifest，不重建
+            old["sources"] = sources
+            _write_json(os.path.join(index_dir, MANIFEST), old)
+        return {"sources": len(sources), "tokenized": 0, "docs": old["docs"], "generation": old["generation"]}
+
+    generation = (old["generation"] if old else _last_generation(index_dir)) + 1
+    docs = _merge(index_dir, digests, os.path.join(index_dir, f"gen-{generation:06d}"))
+    _write_json(os.path.join(index_dir, MANIFEST),
+                {"format": FORMAT_VERSION, "generation": generation, "docs": docs, "sources": sources})
+    _prune(index_dir, generation, set(digests))
+    return {"sources": len(sources), "tokenized": tokenized, "docs": docs, "generation": generation}
+
+def _merge(index_dir, digests, gen_dir):
+    """各來源檔的分段依序接起來（文件編號加上位移），寫成一個世代目錄，回傳文件數"""
+    os.makedirs(gen_dir, exist_ok=True)
+    sizes = []
+    for digest in digests:
+        with np.load(_segment_base(index_dir, digest) + ".npz") as seg:
+            sizes.append(len(seg["lengths"]))
+    # 向量矩陣直接寫入記憶體映射檔，合併時不必整個放在記憶體
+    vectors = np.lib.format.open_memmap(os.path.join(gen_dir, "vectors.npy"), mode="w+",
+                                        dtype=np.float32, shape=(sum(sizes), DIM))
+    parts, line_lengths, n = [], [], 0
+    with open(os.path.join(gen_dir, "docs.jsonl"), "wb") as f:
+        for digest in digests:
+            lines, seg = _read_segment(index_dir, digest)
+            f.write(lines)
+            vectors[n:n + len(seg["lengths"])] = seg["vectors"]
+            keys = np.repeat(seg["vocab"], seg["counts"])
+            parts.append((seg["docs"].astype(np.int64) + n, keys, seg["tf"], seg["lengths"]))
+            line_lengths.append(seg["line_lengths"])
+            n += len(seg["lengths"])
+    if parts:
+        docs, keys, tf, lengths = (np.concatenate(cols) for cols in zip(*parts))
+    else:
+        docs, keys, tf, lengths = (np.empty(0, np.int64) for _ in range(4))
+    arrays = build_postings(docs, keys, tf, lengths)
+    for name in ARRAYS:
+        np.save(os.path.join(gen_dir, f"{name}.npy"), arrays[name])
+    offsets = np.concatenate([[0]] + line_lengths).astype(np.int64).cumsum()
+    np.save(os.path.join(gen_dir, "doc_offsets.npy"), offsets)
+    vectors.flush()
+    del vectors
+    return n
+
+def _write_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+def _last_generation(index_dir):
+    gens = [int(name[4:]) for name in os.listdir(index_dir) if name.startswith("gen-")] \
+        if os.path.isdir(index_dir) else []
+    return max(gens, default=0)
+
+def _prune(index_dir, generation, digests):
+    """刪除舊世代與不再使用的分段；仍被其他行程映射中的檔案（Windows）留待下次"""
+    for name in os.listdir(index_dir):
+        if name.startswith("gen-") and name != f"gen-{generation:06d}":
+            shutil.rmtree(os.path.join(index_dir, name), ignore_errors=True)
+    seg_dir = os.path.join(index_dir, "segments")
+    keep = {os.path.basename(_segment_base(index_dir, digest)) for digest in digests}
+    for name in os.listdir(seg_dir) if os.path.isdir(seg_dir) else []:
+        if name.rsplit(".", 1)[0] not in keep:
+            try:
+                os.remove(os.path.join(seg_dir, name))
+            except OSError:
+                pass
+
+# === 開啟 ===
+class DocTable:
+    """docs.jsonl 的記憶體映射；條目在存取時才解碼"""
+
+    def __init__(self, path, offsets):
+        self.offsets = offsets
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return json.loads(self._map[self.offsets[i]:self.offsets[i + 1]])
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+def open_index(index_dir=INDEX_DIR):
+    """以記憶體映射開啟目前世代的索引；尚未建立時回傳 None"""
+    manifest = read_manifest(index_dir)
+    if manifest is None:
+        return None
+    gen_dir = os.path.join(index_dir, f"gen-{manifest['generation']:06d}")
+    arrays = {name: np.load(os.path.join(gen_dir, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+    offsets = np.load(os.path.join(gen_dir, "doc_offsets.npy"), mmap_mode="r")
+    lexical = KnowledgeIndex(DocTable(os.path.join(gen_dir, "docs.jsonl"), offsets), arrays)
+    return HybridIndex(lexical, np.load(os.path.join(gen_dir, "vectors.npy"), mmap_mode="r"))
+
+def close_index(index):
+    """關閉 open_index() 開啟的文件表，並放掉陣列的記憶體映射；之後不可再查詢"""
+    index.entries.close()
+    for name in ARRAYS:
+        setattr(index.lexical, name, None)
+    index.dense.vectors = None
+
+def verify(source_dirs=SOURCE_DIRS, index_dir=INDEX_DIR):
+    """檢查索引與來源檔一致，回傳問題描述的 list（空 list 表示正常）"""
+    manifest = read_manifest(index_dir)
+    if manifest is None:
+        return ["尚未建立索引"]
+    problems = []
+    sources = list_sources(source_dirs)
+    if sorted(sources) != sorted(manifest["sources"]):
+        problems.append("來源檔清單與索引不同")
+    for path in sources:
+        info = manifest["sources"].get(path)
+        if info and _sha1(path) != info["sha1"]:
+            problems.append(f"來源檔已變動：{path}")
+    index = open_index(index_dir)
+    n = len(index)
+    if n != manifest["docs"]:
+        problems.append(f"文件數 {n} 與 manifest 記錄的 {manifest['docs']} 不同")
+    lexical = index.lexical
+    if len(lexical.term_ptr) != len(lexical.terms) + 1 or lexical.term_ptr[-1] != len(lexical.post_docs):
+        problems.append("倒排索引陣列長度不一致")
+    if len(lexical.post_docs) and (lexical.post_docs.min() < 0 or lexical.post_docs.max() >= n):
+        problems.append("倒排串列含有超出範圍的文件編號")
+    if len(lexical.length_norm) != n:
+        problems.append("文件長度表與文件數不同")
+    if index.dense.vectors.shape != (n, DIM):
+        problems.append("向量矩陣大小與文件數不同")
+    # 與由相同條目在記憶體中重建的索引比對查詢結果與向量
+    entries = [index.entries[i] for i in range(n)]
+    fresh = KnowledgeIndex(entries)
+    sample = list(range(0, n, max(1, n // 20)))
+    for i in sample:
+        query = entries[i].get("term") or entries[i].get("title") or ""
+        got = [(round(s, 4), e.get("id")) for s, e in lexical.search(query, 5)]
+        want = [(round(s, 4), e.get("id")) for s, e in fresh.search(query, 5)]
+        if got != want:
+            problems.append(f"查詢「{query}」的結果與重建索引不同")
+            break
+    if sample and not np.allclose(index.dense.vectors[sample], embed([entry_text(entries[i]) for i in sample]), atol=1e-6):
+        problems.append("向量與重新計算的結果不同")
+    close_index(index)
+    return problems
+
+# === 行程內快取 ===
+# 查詢與替換索引都持有 _lock：舊索引換下後立即關閉，不會有查詢還在讀它；
+# 建立索引（可能數秒）只持有 _build_lock，不擋住其他執行緒查詢目前的索引
+_state = {"index": None, "checked": 0.0, "generation": None}
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+def get_index(source_dirs=SOURCE_DIRS, index_dir=INDEX_DIR):
+    """
+    目前的索引：第一次呼叫時增量建立並映射開啟，之後最多每 CHECK_INTERVAL 秒
+    檢查一次來源檔，有變動才重建並重新開啟。
+    回傳的索引在換到新世代時會被關閉，行程內查詢請用 search()。
+    """
+    with _lock:
+        if _state["index"] is not None and time.monotonic() - _state["checked"] < CHECK_INTERVAL:
+            return _state["index"]
+    with _build_lock:
+        result = build(source_dirs, index_dir)
+        with _lock:
+            old = _state["index"]
+            if old is None or result["generation"] != _state["generation"]:
+                _state.update(index=open_index(index_dir), generation=result["generation"])
+                if old is not None:
+                    close_index(old)
+            _state["checked"] = time.monotonic()
+            return _state["index"]
+
+def clear_cache():
+    with _lock:
+        old = _state["index"]
+        _state.update(index=None, checked=0.0, generation=None)
+        if old is not None:
+            close_index(old)
+
+_refresh_thread = None
+_refresh_lock = threading.Lock()
+
+def refresh_in_background(source_dirs=SOURCE_DIRS, index_dir=INDEX_DIR):
+    """在背景執行緒建立或更新索引（get_index）；已有背景工作在跑時不重複啟動"""
+    global _refresh_thread
+    with _refresh_lock:
+        if _refresh_thread is None or not _refresh_thread.is_alive():
+            _refresh_thread = threading.Thread(target=_refresh, args=(source_dirs, index_dir),
+                                               name="knowledge-index", daemon=True)
+            _refresh_thread.start()
+        return _refresh_thread
+
+def _refresh(source_dirs, index_dir):
+    try:
+        get_index(source_dirs, index_dir)
+    except Exception:
+        logger.exception("教材知識索引建立失敗")
+
+def search(query, k=3):
+    """
+    查詢目前已開啟的索引；索引尚未建立（回傳空 list）或超過 CHECK_INTERVAL 未檢查來源檔時，
+    交給背景執行緒處理，不在呼叫端的請求中建立
+    """
+    with _lock:
+        index = _state["index"]
+        if index is None or time.monotonic() - _state["checked"] >= CHECK_INTERVAL:
+            refresh_in_background()
+        return index.search(query, k) if index is not None else []
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="教材知識索引")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="增量建立索引")
+    build_cmd.add_argument("--force", action="store_true", help="忽略既有分段，全部重新切詞")
+    sub.add_parser("verify", help="檢查索引與來源檔一致")
+    search_cmd = sub.add_parser("search", help="查詢")
+    search_cmd.add_argument("query")
+    search_cmd.add_argument("-k", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        result = build(force=args.force)
+        print(f"來源檔 {result['sources']} 個（重新切詞 {result['tokenized']} 個），"
+              f"條目 {result['docs']} 筆，世代 {result['generation']}，{time.perf_counter() - start:.2f} s")
+    elif args.command == "verify":
+        problems = verify()
+        for problem in problems:
+            print(f"✗ {problem}")
+        if problems:
+            sys.exit(1)
+        print("✓ 索引與來源檔一致")
+    else:
+        for score, item in get_index().search(args.query, args.k):
+            print(f"{score:6.2f}  {item.get('title') or item.get('term')}")
+
+if __name__ == "__main__":
+    main()
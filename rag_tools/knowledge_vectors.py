@@ -0,0 +1,140 @@
+# 檔案路徑：learning_assistant/rag_tools/knowledge_vectors.py
+
+# 教材條目的雜湊字元 n-gram 向量：不需網路、GPU 或外部模型，補足 BM25 對改寫說法的召回。
+#
+# - 單字、二元組、三元組以乘法雜湊對應到 DIM 維（另一位元決定正負號，降低碰撞偏差），
+#   詞頻取 log(1 + tf) 後 L2 正規化；向量與語料無關，可依來源檔分段計算、直接串接
+# - 向量存成 float32 矩陣（knowledge_store 的 vectors.npy，以記憶體映射開啟），
+#   查詢以分塊矩陣乘法算餘弦相似度，argpartition 取前 k 名
+# - HybridIndex 以加權倒數排名融合（RRF）合併 BM25 與向量的排名；向量結果須高於
+#   「不相干文字的最高相似度」（noise_floor）才參與，避免大語料中的雜湊碰撞擠掉 BM25 結果
+#
+# 記憶體預算（DIM = 256）：每筆 1 KiB，100 萬筆的矩陣為 1 GiB，放在磁碟上以記憶體映射開啟；
+# 查詢一次只讀入 CHUNK_ROWS 列（64 MiB）與 100 萬個分數（4 MiB），常駐記憶體不隨語料成長。
+# 建立時每批 EMBED_BATCH 篇計算，暫存陣列約 EMBED_BATCH × DIM × 8 bytes（40 MiB）。
+
+import math
+
+import numpy as np
+
+from data_store.text_tokens import char_codes, word_chars
+
+DIM = 256
+NGRAM_WEIGHTS = {1: 0.5, 2: 1.0, 3: 1.0}   # 單字權重較低：常用字幾乎每篇都有
+CHUNK_ROWS = 65_536
+EMBED_BATCH = 20_000
+RRF_K = 60                # 倒數排名融合的平滑常數
+FUSE_DEPTH = 50           # 各自取前幾名參與融合
+DENSE_WEIGHT = 0.25       # 融合時向量排名的權重（BM25 為 1）；向量較 BM25 粗糙，只用來補充與微調
+MIN_SIMILARITY = 0.12     # 向量結果參與融合的最低相似度，另見 noise_floor()
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_SHIFT = np.uint64(64 - int(np.log2(DIM)))
+
+def _ngram_keys(cp, valid, n):
+    """長度 n 的連續文字片段的 key 與所在位置（片段第一個字元的索引）"""
+    ok = valid[:len(valid) - n + 1].copy()
+    key = cp[:len(cp) - n + 1].copy()
+    for j in range(1, n):
+        ok &= valid[j:len(valid) - n + 1 + j]
+        key = key * 0x110000 + cp[j:len(cp) - n + 1 + j]
+    return (key[ok] * 4 + n).astype(np.uint64), np.flatnonzero(ok)
+
+def embed(texts):
+    """texts 的向量，float32 (len(texts), DIM)，每列 L2 正規化（沒有文字的列為 0）"""
+    out = np.zeros((len(texts), DIM), dtype=np.float32)
+    for start in range(0, len(texts), EMBED_BATCH):
+        batch = texts[start:start + EMBED_BATCH]
+        cp = char_codes(batch)
+        sep = cp == 0
+        doc_of_char = np.cumsum(sep) - sep
+        valid = word_chars(cp)
+        docs, hashes, weights = [], [], []
+        for n, weight in NGRAM_WEIGHTS.items():
+            keys, pos = _ngram_keys(cp, valid, n)
+            docs.append(doc_of_char[pos])
+            hashes.append(keys * _GOLDEN)
+            weights.append(np.full(len(pos), weight))
+        docs, hashes, weights = np.concatenate(docs), np.concatenate(hashes), np.concatenate(weights)
+        # 同一篇的同一 n-gram 合併計數，權重乘上 log(1 + tf)
+        order = np.lexsort((hashes, docs))
+        docs, hashes, weights = docs[order], hashes[order], weights[order]
+        first = np.ones(len(docs), dtype=bool)
+        first[1:] = (docs[1:] != docs[:-1]) | (hashes[1:] != hashes[:-1])
+        starts = np.flatnonzero(first)
+        tf = np.diff(np.append(starts, len(docs)))
+        docs, hashes, weights = docs[starts], hashes[starts], weights[starts] * np.log1p(tf)
+        signs = np.where((hashes >> np.uint64(20)) & np.uint64(1), 1.0, -1.0)
+        cells = docs * DIM + (hashes >> _SHIFT).astype(np.int64)
+        matrix = np.bincount(cells, signs * weights, len(batch) * DIM).reshape(len(batch), DIM)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        out[start:start + len(batch)] = matrix / np.where(norms > 0, norms, 1.0)
+    return out
+
+class VectorIndex:
+    """float32 向量矩陣（可為記憶體映射）上的餘弦相似度 top-k"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def search_batch(self, queries, k=10):
+        """多個查詢一次掃描矩陣，回傳每個查詢的 [(相似度, 列號)]，由高到低"""
+        q = embed(list(queries))
+        n = len(self.vectors)
+        k = min(k, n)
+        if not k:
+            return [[] for _ in queries]
+        best_scores = np.full((len(q), 0), -np.inf, dtype=np.float32)
+        best_ids = np.empty((len(q), 0), dtype=np.int64)
+        for start in range(0, n, CHUNK_ROWS):
+            block = np.asarray(self.vectors[start:start + CHUNK_ROWS])
+            scores = np.concatenate([best_scores, q @ block.T], axis=1)
+            ids = np.concatenate([best_ids, np.broadcast_to(np.arange(start, start + len(block)), (len(q), len(block)))], axis=1)
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores, ids = np.take_along_axis(scores, top, 1), np.take_along_axis(ids, top, 1)
+            best_scores, best_ids = scores, ids
+        results = []
+        for scores, ids in zip(best_scores, best_ids):
+            order = np.lexsort((ids, -scores))
+            results.append([(float(scores[i]), int(ids[i])) for i in order if scores[i] > 0])
+        return results
+
+    def search(self, query, k=10):
+        return self.search_batch([query], k)[0]
+
+def noise_floor(n):
+    """
+    n 篇不相干文字中最高相似度的約略值：雜湊向量的隨機相似度標準差約 1/sqrt(DIM)，
+    n 個取最大約為 sqrt(2 ln n) 倍。低於此值的向量結果多半只是碰撞，不參與融合。
+    """
+    return math.sqrt(2 * math.log(max(n, 2)) / DIM)
+
+def fuse(rankings, k=3, weights=None, rrf_k=RRF_K):
+    """倒數排名融合：rankings 為多個由高到低的 id list，回傳 [(融合分數, id)]"""
+    scores = {}
+    for ranking, weight in zip(rankings, weights or [1.0] * len(rankings)):
+        for rank, doc in enumerate(ranking):
+            scores[doc] = scores.get(doc, 0.0) + weight / (rrf_k + rank + 1)
+    return sorted(((s, doc) for doc, s in scores.items()), key=lambda x: (-x[0], x[1]))[:k]
+
+class HybridIndex:
+    """BM25（KnowledgeIndex）與雜湊向量的融合查詢；entries 與 KnowledgeIndex 共用"""
+
+    def __init__(self, lexical, vectors):
+        self.lexical = lexical
+        self.dense = VectorIndex(vectors)
+        self.entries = lexical.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, query, k=3):
+        """[(融合分數, 條目)]，分數由高到低"""
+        lexical = self.lexical.search_ids(query, FUSE_DEPTH)
+        floor = max(MIN_SIMILARITY, noise_floor(len(self.entries)))
+        dense = [i for score, i in self.dense.search(query, FUSE_DEPTH) if score >= floor]
+        return [(score, self.entries[i]) for score, i in fuse([lexical, dense], k, [1.0, DENSE_WEIGHT])]
@@ -0,0 +1,24 @@
+# 檔案路徑：learning_assistant/tests/conftest.py
+# 執行方式（於專案根目錄）：python -m pytest tests
+# 效能測試使用 pytest-benchmark 的 benchmark fixture；未安裝時改為只執行一次、不計時。
+
+import pytest
+
+from data_store import bank_cache, db
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    @pytest.fixture
+    def benchmark():
+        return lambda fn, *args, **kwargs: fn(*args, **kwargs)
+
+@pytest.fixture
+def temp_dbs(tmp_path, monkeypatch):
+    """題庫與用戶資料庫改用暫存檔；第一次連線時由 database/migrations.py 建立並升級至最新版"""
+    monkeypatch.setitem(db.DB_PATHS, db.QUESTION_BANK, str(tmp_path / "question_bank.sqlite"))
+    monkeypatch.setitem(db.DB_PATHS, db.USER_LOG, str(tmp_path / "user_log.sqlite"))
+    bank_cache.clear_cache()
+    yield tmp_path
+    db.close_connections()
+    bank_cache.clear_cache()
@@ -0,0 +1,59 @@
+# 檔案路徑：learning_assistant/tests/test_answer_log_writer.py
+
+# 寫入失敗的作答紀錄不丟棄：重試仍失敗時暫存於 journal，flush() 丟出 AnswerLogError，
+# 資料庫恢復後下一次 flush() 重放寫入；中斷行程留下的認領檔逾時後由其他行程接手。
+
+import json
+import os
+import sqlite3
+
+import pytest
+
+from data_store import answer_log_writer as writer, db
+
+@pytest.fixture
+def log_writer(temp_dbs, monkeypatch):
+    monkeypatch.setattr(writer, "JOURNAL_PATH", str(temp_dbs / "answer_log_journal.jsonl"))
+    yield writer
+    writer.shutdown()
+
+def logged_rows():
+    return db.get_connection(db.USER_LOG).execute(
+        "SELECT user_id, question_id, student_answer FROM answer_log ORDER BY id").fetchall()
+
+def test_failed_batch_is_journaled_and_replayed(log_writer, monkeypatch):
+    real_transaction = writer.transaction
+
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(writer, "transaction", locked)
+    for i in range(3):
+        log_writer.log_answer(1, str(i), "A", "B")
+    with pytest.raises(writer.AnswerLogError):
+        log_writer.flush()
+    assert logged_rows() == []
+    assert writer._journal_rows() == 3
+
+    monkeypatch.setattr(writer, "transaction", real_transaction)
+    log_writer.log_answer(1, "9", "C", "C")
+    log_writer.flush()
+    assert sorted(logged_rows()) == [(1, "0", "A"), (1, "1", "A"), (1, "2", "A"), (1, "9", "C")]
+    assert writer._journal_files() == []
+    wrong = db.get_connection(db.USER_LOG).execute("SELECT COUNT(*) FROM wrongbook WHERE user_id = 1").fetchone()[0]
+    assert wrong == 3
+
+def test_stale_claim_is_taken_over(log_writer):
+    row = ["2025-03-01T08:00:00", 2, "5", "B", "A", 0, None, None]
+    orphan = f"{writer.JOURNAL_PATH}.99999.0"
+    with open(orphan, "w", encoding="utf-8") as f:
+        f.write(json.dumps(row) + "\n")
+    with pytest.raises(writer.AnswerLogError):
+        log_writer.flush()                   # 認領檔還新：視為其他行程重放中，不接手
+    assert logged_rows() == []
+
+    old = os.path.getmtime(orphan) - writer.STALE_CLAIM - 1
+    os.utime(orphan, (old, old))
+    log_writer.flush()
+    assert logged_rows() == [(2, "5", "B")]
+    assert writer._journal_files() == []
@@ -0,0 +1,17 @@
+# 檔案路徑：learning_assistant/tests/test_migrations.py
+
+# 全新資料庫經 database/migrations.py 升級至最新版後，QUERY_PLAN_CHECKS 的每一項查詢都須走到預期的索引
+# （與 python -m database.migrations --verify 相同的檢查）。
+
+from data_store import db
+from database import migrations
+
+def test_fresh_databases_reach_latest_version(temp_dbs):
+    for name, steps in migrations.MIGRATIONS.items():
+        assert migrations.schema_version(db.get_connection(name)) == steps[-1][0]
+
+def test_query_plans_use_indexes(temp_dbs):
+    results = migrations.verify_query_plans()
+    assert [label for label, _, _ in results] == [check[1] for check in migrations.QUERY_PLAN_CHECKS]
+    failed = [f"{label}: {plan}" for label, plan, ok in results if not ok]
+    assert not failed, "\n".join(failed)
@@ -0,0 +1,37 @@
+# 檔案路徑：learning_assistant/tests/test_question_loader.py
+
+# 依 id 取題由快取的 id 索引提供：回傳的是 singles / groups 清單中的同一份物件，
+# 重複查詢不會在 bank_cache 中累積逐題項目；題庫寫入後索引隨版本失效。
+
+from data_store import bank_cache, db, question_loader
+
+def fill_bank():
+    with db.transaction(db.QUESTION_BANK) as conn:
+        conn.execute("INSERT INTO question_groups (id, title, reading_text, category) VALUES (1, '題組1', '文本', '閱讀')")
+        conn.executemany("INSERT INTO questions (id, group_id, content, answer) VALUES (?, ?, ?, 'A')",
+                         [(1, None, "單題1"), (2, None, "單題2"), (3, 1, "小題1"), (4, 1, "小題2")])
+    bank_cache.bump_bank_version()
+
+def test_lookups_share_cached_lists(temp_dbs):
+    fill_bank()
+    singles = question_loader.get_all_single_questions()
+    groups = question_loader.get_all_question_groups()
+    assert question_loader.get_item("single", 2) is singles[1]
+    assert question_loader.get_item("group", 1) is groups[0]
+    assert question_loader.get_item("single", 3) is None
+    assert question_loader.get_question_by_id("4") is groups[0].questions[1]
+    assert question_loader.get_question_by_id(99) is None
+
+    entries = len(bank_cache._entries)
+    for qid in range(200):
+        question_loader.get_question_by_id(qid)
+        question_loader.get_item("single", qid)
+        question_loader.get_item("group", qid)
+    assert len(bank_cache._entries) == entries
+
+def test_index_follows_bank_version(temp_dbs):
+    fill_bank()
+    assert question_loader.get_question_by_id(5) is None
+    with db.transaction(db.QUESTION_BANK) as conn:
+        conn.execute("INSERT INTO questions (id, content, answer) VALUES (5, '單題5', 'B')")
+    assert question_loader.get_question_by_id(5).content == "單題5"
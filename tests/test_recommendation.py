@@ -0,0 +1,25 @@
+# 檔案路徑：learning_assistant/tests/test_recommendation.py
+
+# 練習卷依校準難度由易到難排列：已校準的題目以校準難度 b 為準（題庫的 LLM 難度不影響），
+# 未校準的題目才沿用題庫的 difficulty。
+
+import random
+
+from assistant_core.recommendation import recommend_next_question as rec
+from data_store import bank_cache, calibration, db
+
+# 題號 → (題庫難度, 校準難度 b；None 表示未校準)
+BANK = {1: (3, -2.0), 2: (1, 1.5), 3: (2, None), 4: (1, None), 5: (2, 0.1), 6: (3, -1.5), 7: (None, None)}
+
+def test_practice_set_orders_by_calibrated_difficulty(temp_dbs, monkeypatch):
+    with db.transaction(db.QUESTION_BANK) as conn:
+        conn.executemany("INSERT INTO questions (id, content, answer, topic, difficulty) VALUES (?, ?, 'A', '文法', ?)",
+                         [(qid, f"題{qid}", d) for qid, (d, _) in BANK.items()])
+    bank_cache.bump_bank_version()
+    difficulties = {qid: b for qid, (_, b) in BANK.items() if b is not None}
+    monkeypatch.setattr(calibration, "item_difficulties", lambda: difficulties)
+    rec.clear_profiles()
+
+    items = rec.build_practice_set(1, size=len(BANK), rng=random.Random(0), explore_ratio=0)
+    # 等級 1：b=-2.0、b=-1.5、未校準的 4；等級 2：b=0.1、未校準的 3；等級 3：b=1.5；未標難度排最後
+    assert [q.id for q, _ in items] == [1, 6, 4, 5, 3, 2, 7]
@@ -0,0 +1,117 @@
+# 檔案路徑：learning_assistant/tests/test_student_model.py
+
+# StudentModel 的統計（每日正確率、常錯題、整體正確率）：
+# - refresh() 在 SQLite 內彙總，結果須與逐列累計完全相同，且只納入水位之後的新紀錄
+# - 效能測試（pytest-benchmark，group 依筆數分組）：合成 ROW_COUNTS 筆作答，比較
+#   改寫前的 pandas 做法（讀出全部紀錄、逐列比對答案字串、groupby(...).apply(lambda ...)）
+#   與 StudentModel；另以 MIN_SPEEDUP 防止效能退化
+
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from data_store import db
+from data_store.answer_log_writer import INSERT_SQL
+from models.student_model import StudentModel
+
+pd = pytest.importorskip("pandas")
+
+ROW_COUNTS = (10_000, 100_000)
+MIN_SPEEDUP = 3
+
+def fill_log(rows, user_id=1, seed=0, start=datetime(2025, 3, 1)):
+    rng = random.Random(seed)
+    with db.transaction(db.USER_LOG) as conn:
+        data = []
+        for i in range(rows):
+            correct = rng.random() < 0.7
+            data.append(((start + timedelta(minutes=37 * i)).isoformat(), user_id, str(rng.randint(1, 3000)),
+                         "A" if correct else "B", "A", int(correct), None, None))
+        conn.executemany(INSERT_SQL, data)
+
+def row_by_row(user_id):
+    """逐列累計：(每日 [作答數, 答對數], 各題答錯次數, 作答數, 答對數)"""
+    by_date, wrong, attempts, correct = {}, Counter(), 0, 0
+    for timestamp, question_id, is_correct in db.get_connection(db.USER_LOG).execute(
+            "SELECT timestamp, question_id, is_correct FROM answer_log WHERE user_id = ? ORDER BY id", (user_id,)):
+        attempts += 1
+        counts = by_date.setdefault((timestamp or "")[:10], [0, 0])
+        counts[0] += 1
+        if is_correct:
+            correct += 1
+            counts[1] += 1
+        else:
+            wrong[str(question_id)] += 1
+    return by_date, wrong, attempts, correct
+
+def legacy_pandas(user_id):
+    """改寫前的做法"""
+    df = pd.read_sql_query("SELECT * FROM answer_log WHERE user_id = ?", db.get_connection(db.USER_LOG),
+                           params=(user_id,))
+    df["date"] = df["timestamp"].str[:10]
+    by_date = df.groupby("date").apply(lambda x: (x["student_answer"] == x["correct_answer"]).mean())
+    wrong = df[df["student_answer"] != df["correct_answer"]]
+    top = wrong["question_id"].value_counts().head(5)
+    overall = (df["student_answer"] == df["correct_answer"]).mean()
+    return by_date, top, overall
+
+def model_stats(user_id):
+    model = StudentModel(user_id)
+    return model.accuracy_by_date(), model.most_wrong_questions(5), model.accuracy_rate()
+
+def best_time(fn, *args, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def test_refresh_matches_row_by_row(temp_dbs):
+    fill_log(5017)
+    with db.transaction(db.USER_LOG) as conn:   # 缺漏欄位與數字型題號
+        conn.executemany(INSERT_SQL, [(None, 1, "7", "B", "A", 0, None, None),
+                                      ("2025-04-01T08:00:00", 1, None, "B", "A", None, None, None),
+                                      ("2025-04-01T09:00:00", 1, 42, "B", "A", 0, None, None)])
+    fill_log(500, user_id=2, seed=1)
+    model = StudentModel(1)
+    assert (model.by_date, model.wrong_counts, model.attempts, model.correct) == row_by_row(1)
+
+def test_refresh_is_incremental(temp_dbs):
+    fill_log(3000)
+    model = StudentModel(1)
+    fill_log(1234, seed=2, start=datetime(2025, 9, 1))
+    assert model.refresh() == 1234
+    assert model.refresh() == 0
+    assert (model.by_date, model.wrong_counts, model.attempts, model.correct) == row_by_row(1)
+
+def test_matches_legacy_pandas(temp_dbs):
+    fill_log(20_000)
+    by_date, top, overall = legacy_pandas(1)
+    k_by_date, k_top, k_overall = model_stats(1)
+    assert [row["date"] for row in k_by_date] == by_date.index.tolist()
+    assert [row["accuracy"] for row in k_by_date] == pytest.approx(by_date.tolist())
+    assert k_overall == pytest.approx(overall)
+    # value_counts 同數時順序不固定，只比對次數
+    assert [row["times_wrong"] for row in k_top] == top.tolist()
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_benchmark_student_model(temp_dbs, benchmark, rows):
+    fill_log(rows)
+    benchmark.group = f"student_model_{rows}"
+    accuracy_by_date, _, _ = benchmark(model_stats, 1)
+    assert accuracy_by_date
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_benchmark_legacy_pandas(temp_dbs, benchmark, rows):
+    fill_log(rows)
+    benchmark.group = f"student_model_{rows}"
+    benchmark(legacy_pandas, 1)
+
+def test_speedup_over_legacy(temp_dbs):
+    fill_log(ROW_COUNTS[-1])
+    legacy, current = best_time(legacy_pandas, 1), best_time(model_stats, 1)
+    assert legacy / current >= MIN_SPEEDUP, f"StudentModel {current * 1000:.1f} ms，pandas {legacy * 1000:.1f} ms"